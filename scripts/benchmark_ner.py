@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark des backends de détection d'entités nommées
+Fichier: scripts/benchmark_ner.py
+
+Compare le débit (commentaires/seconde) de chaque backend de ner.py sur
+data/cleaned_training_sample.csv, ainsi que le rappel et la précision du
+masquage par rapport au backend de référence (NLTK par défaut) : une entité
+de référence est retrouvée si le même texte (insensible à la casse) est
+masqué dans le même commentaire.
+
+Usage:
+    python scripts/benchmark_ner.py
+    python scripts/benchmark_ner.py --limit 2000 --backends nltk gazetteer
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Ajouter src au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from ner import NER_BACKENDS, get_named_entity_masker  # noqa: E402
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "cleaned_training_sample.csv"
+
+
+def run_backend(masker, texts):
+    """Retourne (entités par commentaire, durée en secondes)"""
+    start = time.perf_counter()
+    found = [masker.find_entities(text) for text in texts]
+    return found, time.perf_counter() - start
+
+
+def entity_sets(found):
+    """Ensembles (texte en minuscules) des entités de chaque commentaire"""
+    return [{ent.lower() for ent, _ in entities} for entities in found]
+
+
+def recall_precision(reference, candidate):
+    """Rappel et précision de `candidate` par rapport à `reference`"""
+    ref_total = sum(len(ref) for ref in reference)
+    cand_total = sum(len(cand) for cand in candidate)
+    common = sum(len(ref & cand) for ref, cand in zip(reference, candidate))
+    recall = common / ref_total if ref_total else 1.0
+    precision = common / cand_total if cand_total else 1.0
+    return recall, precision
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des backends NER")
+    parser.add_argument("--csv", type=Path, default=SAMPLE_CSV)
+    parser.add_argument("--column", default="anonymized_comment")
+    parser.add_argument(
+        "--limit", type=int, default=None, help="Nombre de commentaires"
+    )
+    parser.add_argument("--backends", nargs="+", default=list(NER_BACKENDS))
+    parser.add_argument("--reference", default="nltk", help="Backend de référence")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.csv)[args.column].dropna().astype(str).tolist()
+    if args.limit:
+        texts = texts[: args.limit]
+    print(f"📊 {len(texts)} commentaires ({args.csv.name})\n")
+
+    results = {}
+    for backend in args.backends:
+        masker = get_named_entity_masker(backend)
+        if not masker.is_available():
+            print(f"⚠️  {backend}: données manquantes, backend ignoré")
+            continue
+        found, elapsed = run_backend(masker, texts)
+        results[backend] = entity_sets(found)
+        entities = sum(len(entities) for entities in found)
+        print(
+            f"⏱️  {backend:<10} {len(texts) / elapsed:>10.0f} commentaires/s "
+            f"({elapsed:.2f}s, {entities} entités)"
+        )
+
+    if args.reference not in results:
+        print(
+            f"\n⚠️  Backend de référence '{args.reference}' indisponible: "
+            "rappel non calculé"
+        )
+        return 0
+
+    print(f"\n🎯 Rappel / précision par rapport à '{args.reference}'")
+    for backend, sets in results.items():
+        if backend == args.reference:
+            continue
+        recall, precision = recall_precision(results[args.reference], sets)
+        print(f"  {backend:<10} rappel {recall:6.1%}  précision {precision:6.1%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
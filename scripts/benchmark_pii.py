@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Benchmark du masquage des PII (scanners linéaires vs regex re)
+Fichier: scripts/benchmark_pii.py
+
+Mesure le temps par caractère de mask_regex_pii sur des entrées
+pathologiques de taille croissante (longues suites d'espaces, de chiffres,
+de séparateurs) et sur l'échantillon d'entraînement, puis vérifie que les
+deux moteurs produisent le même texte.
+
+Usage:
+    python scripts/benchmark_pii.py
+    python scripts/benchmark_pii.py --sizes 1000 10000 100000 --regex-max-size 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Ajouter src au PYTHONPATH
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from pii import PIIMasker  # noqa: E402
+
+SAMPLE_CSV = Path(__file__).parent.parent / "data" / "cleaned_training_sample.csv"
+
+# Générateurs d'entrées pathologiques (n = longueur approximative)
+PATHOLOGICAL_INPUTS = {
+    "chiffre + espaces": lambda n: "1" + " " * n,
+    "chiffres et espaces": lambda n: "1 " * (n // 2),
+    "adresse sans suffixe": lambda n: "12345 " + "ab " * (n // 3),
+    "téléphone répété": lambda n: "+1 (12) " * (n // 8),
+    "séparateurs": lambda n: "-" * n,
+    "chiffres": lambda n: "1" * n,
+}
+
+
+def time_per_char(masker, text):
+    """Retourne (résultat, microsecondes par caractère)"""
+    start = time.perf_counter()
+    result = masker.mask(text)
+    elapsed = time.perf_counter() - start
+    return result, elapsed * 1e6 / max(1, len(text))
+
+
+def benchmark_pathological(linear, regex, sizes, regex_max_size):
+    """Compare les deux moteurs sur les entrées pathologiques"""
+    print("📏 Entrées pathologiques (µs/caractère)")
+    print(f"{'entrée':<24} {'taille':>8} {'linéaire':>10} {'regex':>10}")
+    mismatches = 0
+    for name, make in PATHOLOGICAL_INPUTS.items():
+        for size in sizes:
+            text = make(size)
+            result, linear_cost = time_per_char(linear, text)
+            regex_cost = "-"
+            if size <= regex_max_size:
+                expected, cost = time_per_char(regex, text)
+                regex_cost = f"{cost:.2f}"
+                if result != expected:
+                    mismatches += 1
+            print(f"{name:<24} {size:>8} {linear_cost:>10.2f} {regex_cost:>10}")
+    return mismatches
+
+
+def benchmark_sample(linear, regex):
+    """Compare les deux moteurs sur l'échantillon d'entraînement"""
+    print(f"\n📊 Échantillon: {SAMPLE_CSV.name}")
+    texts = pd.read_csv(SAMPLE_CSV)["anonymized_comment"].dropna().tolist()
+    timings = {}
+    outputs = {}
+    for name, masker in (("linéaire", linear), ("regex", regex)):
+        start = time.perf_counter()
+        outputs[name] = [masker.mask(t) for t in texts]
+        timings[name] = time.perf_counter() - start
+        print(f"  {name:<10} {timings[name]:.3f}s pour {len(texts)} commentaires")
+    return sum(1 for a, b in zip(outputs["linéaire"], outputs["regex"]) if a != b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du masquage des PII")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument(
+        "--regex-max-size",
+        type=int,
+        default=2000,
+        help="Taille maximale testée avec les regex (coût quadratique au-delà)",
+    )
+    args = parser.parse_args()
+
+    linear = PIIMasker()
+    regex = PIIMasker(linear=False)
+
+    mismatches = benchmark_pathological(linear, regex, args.sizes, args.regex_max_size)
+    if SAMPLE_CSV.exists():
+        mismatches += benchmark_sample(linear, regex)
+
+    if mismatches:
+        print(f"\n❌ {mismatches} résultats différents entre les deux moteurs")
+        return 1
+    print("\n✅ Résultats identiques")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,88 @@
-import os
 import re
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
 
-import joblib
 import nltk
 
 # Indique à NLTK où chercher les données téléchargées dans le Dockerfile
 nltk.data.path.append("/usr/share/nltk_data")
-from fastapi import FastAPI
-from nltk import ne_chunk, pos_tag
+from fastapi import FastAPI, HTTPException, Response
 from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
-# Configuration centralisée
+# Configuration centralisée et composants de scoring partagés
+from artifacts import load_artifacts
+from batching import MicroBatcher
 from config import config
+from executor import BoundedExecutor, ExecutorFull
+from lemmatizer import cached_lemmatizer, load_serving_lemmatizer, warm_lemmatizer
+from linear_scorer import LinearScorer
+from model_watch import ModelFileWatcher
+from ner import get_named_entity_masker
+from pii import pii_masker
+from preprocessing import WARMUP_TEXT
+from result_cache import ResultCache
+from scoring import ScoringResult
+from startup import StartupState
+from worker_pool import ProcessScoringPool
 
 # --- 1. Chargement du Modèle et du Vectoriseur ---
 
-MODEL_PATH = config.get_model_path()
-VECTORIZER_PATH = config.get_vectorizer_path()
 
-try:
-    # Charger le modèle et le vectoriseur
-    model = joblib.load(MODEL_PATH)
-    vectorizer = joblib.load(VECTORIZER_PATH)
-    print("Modèle et vectoriseur chargés avec succès.")
-except FileNotFoundError:
-    print(
-        f"Erreur: Fichiers de modèle ({MODEL_PATH} ou {VECTORIZER_PATH}) non trouvés. L'API démarrera mais ne pourra pas inférer."
+def model_paths() -> Tuple:
+    """Chemins servis (modèle, vectoriseur, table de lemmes)."""
+    return (
+        config.get_model_path(),
+        config.get_vectorizer_path(),
+        config.get_lemma_table_path(),
     )
-    model = None
-    vectorizer = None
+
+
+MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH = model_paths()
+
+# Durée de chaque étape de démarrage et état de préparation (voir /ready)
+startup = StartupState()
+
+
+def load_model():
+    """Charge le modèle, le vectoriseur et le scoreur exporté du modèle."""
+    try:
+        # Charger le modèle et le vectoriseur (artefact binaire projeté en
+        # mémoire s'il existe, sinon fichiers joblib)
+        model, vectorizer = load_artifacts(MODEL_PATH, VECTORIZER_PATH)
+        print("Modèle et vectoriseur chargés avec succès.")
+    except FileNotFoundError:
+        print(
+            f"Erreur: Fichiers de modèle ({MODEL_PATH} ou {VECTORIZER_PATH}) non trouvés. L'API démarrera mais ne pourra pas inférer."
+        )
+        return None, None, None
+
+    # Scoreur exporté du modèle : vectorisation directe des tokens nettoyés et
+    # sigmoïde du produit creux, sans la validation de sklearn (voir linear_scorer.py)
+    return model, vectorizer, LinearScorer.from_model(model, vectorizer)
+
+
+with startup.stage("model"):
+    model, vectorizer, scorer = load_model()
+
+
+def model_version() -> str:
+    """Empreinte du modèle chargé (vide sans modèle)."""
+    return scorer.version if scorer is not None else ""
+
+
+# Résultats déjà calculés, par texte brut et version du modèle (voir result_cache.py)
+result_cache = (
+    ResultCache(
+        max_bytes=config.RESULT_CACHE_MAX_MB * 1024 * 1024,
+        ttl=config.CACHE_TTL,
+        model_version=model_version(),
+        sizeof=lambda result: result.nbytes,
+    )
+    if config.USE_CACHE
+    else None
+)
 
 # --- 2. Fonctions de Traitement (Copie de train.py) ---
 
@@ -45,43 +96,18 @@ ADDRESS_RE = config.ADDRESS_RE
 
 
 def mask_regex_pii(text):
-    s = text
-    s = EMAIL_RE.sub("<EMAIL>", s)
-    s = CREDIT_RE.sub("<CREDIT_CARD>", s)
-    s = PHONE_RE.sub(
-        lambda m: (
-            "<PHONE>" if len(re.sub(r"[^\d]", "", m.group(0))) >= 6 else m.group(0)
-        ),
-        s,
-    )
-    s = DATE_RE.sub("<DATE>", s)
-    s = AGE_RE.sub("<AGE>", s)
-    s = ADDRESS_RE.sub("<ADDRESS>", s)
-    return s
+    # Équivalent aux re.sub successifs (EMAIL, CREDIT_CARD, PHONE, DATE, AGE,
+    # ADDRESS) mais sans chaîne intermédiaire : voir pii.PIIMasker
+    return pii_masker.mask(text)
+
+
+ner_masker = get_named_entity_masker(labels=config.NAMED_ENTITY_LABELS)
 
 
 def mask_named_entities(text):
-    try:
-        tokens = word_tokenize(text)
-        tags = pos_tag(tokens)
-        tree = ne_chunk(tags, binary=False)
-    except Exception:
-        return text
-
-    for subtree in tree:
-        if hasattr(subtree, "label"):
-            label = subtree.label()
-            ent = " ".join([tok for tok, pos in subtree.leaves()])
-            if label in config.NAMED_ENTITY_LABELS:
-                try:
-                    pattern = re.compile(
-                        r"\b" + re.escape(ent) + r"\b", flags=re.IGNORECASE
-                    )
-                    tag = f"<{label}>" if label != "PERSON" else "<PERSON>"
-                    text = pattern.sub(tag, text)
-                except re.error:
-                    pass
-    return text
+    # Backend choisi par config.NER_BACKEND (voir ner.NamedEntityMasker)
+    masked, _ = ner_masker.mask(text)
+    return masked
 
 
 def anonymize_text(text):
@@ -92,12 +118,15 @@ def anonymize_text(text):
     return s
 
 
-# NLTK Cleaning
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words("english"))
+# NLTK Cleaning : table de lemmes compilée à l'entraînement, WordNet (cache
+# LRU) pour les tokens inconnus (voir lemmatizer.py)
+with startup.stage("lemma_table"):
+    lemmatizer = load_serving_lemmatizer(LEMMA_TABLE_PATH)
+with startup.stage("stopwords"):
+    stop_words = set(stopwords.words("english"))
 
 
-def clean_text_nltk(text):
+def clean_tokens_nltk(text):
     # 1. Mise en minuscule et suppression des caractères spéciaux
     text = re.sub(r"[^a-zA-Z\s]", "", text.lower())
 
@@ -105,17 +134,56 @@ def clean_text_nltk(text):
     tokens = word_tokenize(text)
 
     # 3. Suppression des stop words et lemmatisation
-    tokens = [lemmatizer.lemmatize(w) for w in tokens if w not in stop_words]
+    return lemmatizer.clean_tokens(tokens, stop_words)
 
-    return " ".join(tokens)
+
+def clean_text_nltk(text):
+    return " ".join(clean_tokens_nltk(text))
+
+
+def reload_model():
+    """
+    Recharge le modèle, le vectoriseur et la table de lemmes depuis le disque
+    (après un réentraînement). Les résultats en cache sont invalidés. En mode
+    "process", les processus de scoring gardent leur modèle : redémarrer l'API.
+    """
+    global MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH
+    global model, vectorizer, scorer, lemmatizer
+    MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH = model_paths()
+    model, vectorizer, scorer = load_model()
+    lemmatizer = load_serving_lemmatizer(LEMMA_TABLE_PATH)
+    warm_lemmatizer(lemmatizer, vectorizer)
+    if result_cache is not None:
+        result_cache.set_model_version(model_version())
 
 
 # --- 3. Définition de l'API FastAPI ---
 
+
+@asynccontextmanager
+async def lifespan(app):
+    # Préchauffage en arrière-plan : /health répond tout de suite, /ready
+    # seulement une fois les ressources chargées. Sans effet si le maître
+    # gunicorn a déjà préchauffé l'application avant le fork.
+    if scoring_uses_processes:
+        # Préchauffage complet avant le fork des processus de scoring, qui
+        # héritent ainsi des ressources chargées
+        startup.warm_up(warm_up_stages())
+        scoring_executor.start()
+    else:
+        startup.start_background(warm_up_stages())
+    yield
+    if scoring_uses_processes:
+        scoring_executor.shutdown()
+    else:
+        scoring_executor.shutdown(wait=False)
+
+
 app = FastAPI(
     title=config.API_CONFIG["title"],
     description=config.API_CONFIG["description"],
     version=config.API_CONFIG["version"],
+    lifespan=lifespan,
 )
 
 
@@ -123,39 +191,215 @@ class TextPayload(BaseModel):
     text: str
 
 
-def calculate_score(text: str) -> int:
-    if model is None or vectorizer is None:
-        # Retourne un score neutre si le modèle n'est pas chargé
-        return 50
+class BatchTextPayload(BaseModel):
+    texts: List[str] = Field(..., min_length=1, max_length=config.MAX_BATCH_SIZE)
+
 
+def prepare_text(text: str) -> ScoringResult:
+    """Anonymise puis nettoie un texte, une seule fois par requête."""
     # 1. Anonymisation (RGPD)
     anonymized_text = anonymize_text(text)
 
     # 2. Nettoyage NLTK
-    cleaned_text = clean_text_nltk(anonymized_text)
+    tokens = clean_tokens_nltk(anonymized_text)
+
+    return ScoringResult(
+        text=text,
+        anonymized_text=anonymized_text,
+        cleaned_text=" ".join(tokens),
+        tokens=tokens,
+    )
+
+
+def predict_toxicity_probas(token_lists: List[List[str]]) -> List[Optional[float]]:
+    """
+    Calcule la probabilité de toxicité de textes nettoyés (listes de tokens).
+    Une seule vectorisation et un seul predict_proba pour tout le lot.
+    """
+    if model is None or vectorizer is None:
+        # Pas de probabilité si le modèle n'est pas chargé (score neutre)
+        return [None] * len(token_lists)
+
+    # 3. Vectorisation (une matrice creuse pour tout le lot, sans
+    # re-tokenisation du texte nettoyé) et 4. Prédiction (probabilité de
+    # toxicité, identique à model.predict_proba(text_vec)[:, 1])
+    return scorer.predict_proba(token_lists).tolist()
+
+
+def score_results(results: List[ScoringResult]) -> List[ScoringResult]:
+    """Complète des résultats préparés avec leur probabilité de toxicité."""
+    probas = predict_toxicity_probas([result.tokens for result in results])
+    for result, prob_toxic in zip(results, probas):
+        result.prob_toxic = prob_toxic
+    return results
+
+
+# Regroupe les requêtes /score concurrentes en un seul predict_proba
+score_batcher = MicroBatcher(
+    predict_toxicity_probas,
+    max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=config.MICRO_BATCH_MAX_WAIT_MS,
+)
+
+
+def warm_up_stages():
+    """Étapes de préchauffage : une par ressource chargée paresseusement."""
+    return [
+        ("tokenizer", lambda: word_tokenize(WARMUP_TEXT)),
+        ("ne_chunk", ner_masker.warm_up),
+        ("lemmatize", lambda: cached_lemmatizer.lemmatize("warming")),
+        ("lemma_cache", lambda: warm_lemmatizer(lemmatizer, vectorizer)),
+        ("pipeline", lambda: score_results([prepare_text(WARMUP_TEXT)])),
+    ]
 
-    # 3. Vectorisation
-    text_vec = vectorizer.transform([cleaned_text])
 
-    # 4. Prédiction (probabilité de toxicité)
-    # model.predict_proba retourne [[Prob_Non_Toxique, Prob_Toxique]]
-    prob_toxic = model.predict_proba(text_vec)[:, 1][0]
+def warm_up() -> bool:
+    """
+    Charge les ressources paresseuses (punkt, tagger, chunker, WordNet) et
+    les pages du modèle, puis marque l'API comme prête. Appelé par le maître
+    gunicorn avant le fork (voir gunicorn_conf.py) ou au démarrage du worker.
+    """
+    return startup.warm_up(warm_up_stages())
+
+
+def init_scoring_process():
+    """Initialise un processus de scoring : préchauffe ses propres ressources."""
+    StartupState().warm_up(warm_up_stages())
+
+
+def score_text(text: str) -> Tuple[ScoringResult, float]:
+    """
+    Anonymise, nettoie et score un texte sans micro-batching (exécuté dans le
+    pool de threads). Retourne le résultat et un délai d'attente nul.
+    """
+    return score_results([prepare_text(text)])[0], 0.0
+
+
+def score_texts(texts: List[str]) -> List[ScoringResult]:
+    """Version par lot de score_text (une seule prédiction pour le lot)."""
+    return score_results([prepare_text(text) for text in texts])
+
+
+# Travail CPU des handlers asynchrones : pool de threads borné (voir
+# executor.py) ou processus préchauffés alimentés par micro-lots via des
+# pipes, qui occupent tous les cœurs (voir worker_pool.py)
+scoring_uses_processes = config.SCORING_EXECUTOR == "process"
+if scoring_uses_processes:
+    scoring_executor = ProcessScoringPool(
+        score_texts,
+        workers=config.SCORING_WORKERS,
+        max_queue=config.SCORING_MAX_QUEUE,
+        max_batch_size=config.MICRO_BATCH_MAX_SIZE,
+        initializer=init_scoring_process,
+        start_method=config.SCORING_START_METHOD,
+    )
+else:
+    scoring_executor = BoundedExecutor(
+        kind=config.SCORING_EXECUTOR,
+        workers=config.SCORING_WORKERS,
+        max_queue=config.SCORING_MAX_QUEUE,
+    )
+
+
+def _overloaded() -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Serveur saturé, réessayez plus tard.",
+        headers={"Retry-After": str(config.SCORING_RETRY_AFTER_SECONDS)},
+    )
 
+
+async def run_score(text: str) -> Tuple[ScoringResult, float]:
+    """
+    Score un texte dans le pool ; 503 + Retry-After si la file est pleine.
+
+    Avec le micro-batching, seule la préparation occupe un thread du pool :
+    la prédiction est attendue depuis la boucle d'événements, si bien qu'un
+    lot peut regrouper jusqu'à MICRO_BATCH_MAX_SIZE requêtes quel que soit
+    SCORING_WORKERS.
+    """
+    try:
+        if scoring_uses_processes:
+            return await scoring_executor.submit(text)
+        if not config.ENABLE_MICRO_BATCHING:
+            return await scoring_executor.run(score_text, text)
+        result = await scoring_executor.run(prepare_text, text)
+    except ExecutorFull:
+        raise _overloaded()
+    result.prob_toxic, queue_delay_ms = await score_batcher.submit_async(result.tokens)
+    return result, queue_delay_ms
+
+
+async def run_score_batch(texts: List[str]) -> List[ScoringResult]:
+    """Score un lot de textes dans le pool ; 503 + Retry-After si la file est pleine."""
+    try:
+        if scoring_uses_processes:
+            return await scoring_executor.submit_many(texts)
+        return await scoring_executor.run(score_texts, texts)
+    except ExecutorFull:
+        raise _overloaded()
+
+
+# Fichiers du modèle surveillés : un réentraînement est pris en compte par
+# chaque worker avant son prochain scoring (sans effet en mode "process")
+model_watcher = ModelFileWatcher(
+    model_paths,
+    interval=0 if scoring_uses_processes else config.MODEL_RELOAD_CHECK_SECONDS,
+)
+
+
+def reload_model_if_changed() -> bool:
+    """Recharge le modèle si ses fichiers ont été remplacés sur disque."""
+    if not model_watcher.changed():
+        return False
+    print("INFO: Fichiers du modèle modifiés, rechargement.")
+    reload_model()
+    return True
+
+
+async def score_cached(text: str) -> Tuple[ScoringResult, float]:
+    """run_score précédé d'une recherche dans le cache des résultats."""
+    reload_model_if_changed()
+    if result_cache is None:
+        return await run_score(text)
+    result = result_cache.get(text)
+    if result is not None:
+        return result, 0.0
+    result, queue_delay_ms = await run_score(text)
+    result_cache.put(text, result)
+    return result, queue_delay_ms
+
+
+async def score_batch_cached(texts: List[str]) -> List[ScoringResult]:
+    """run_score_batch limité aux textes absents du cache des résultats."""
+    reload_model_if_changed()
+    if result_cache is None:
+        return await run_score_batch(texts)
+    results: List[Optional[ScoringResult]] = [result_cache.get(text) for text in texts]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        scored = await run_score_batch([texts[i] for i in missing])
+        for i, result in zip(missing, scored):
+            results[i] = result
+            result_cache.put(texts[i], result)
+    return results
+
+
+def calculate_score(text: str) -> int:
     # 5. Conversion en score social (0 à 100)
     # Score = 100 * (1 - Probabilité de Toxicité)
     # Plus la probabilité de toxicité est faible, plus le score social est élevé.
-    social_score = int(100 * (1 - prob_toxic))
-
-    return max(0, min(100, social_score))  # Assurer que le score est entre 0 et 100
+    return score_results([prepare_text(text)])[0].social_score
 
 
 @app.post("/score")
-def get_social_score(payload: TextPayload):
+async def get_social_score(payload: TextPayload):
     """
     Calcule le score social (0-100) d'un texte en fonction de sa toxicité.
     Un score élevé signifie une faible toxicité.
     """
-    score = calculate_score(payload.text)
+    result, queue_delay_ms = await score_cached(payload.text)
+    score = result.social_score
 
     # Log de la transaction pour l'observabilité (Cloud Logging)
     print(
@@ -164,8 +408,36 @@ def get_social_score(payload: TextPayload):
 
     return {
         "text_received": payload.text,
-        "text_anonymized": anonymize_text(payload.text),
+        "text_anonymized": result.anonymized_text,
         "toxicity_score": score,
+        "queue_delay_ms": round(queue_delay_ms, 3),
+        "model_used": "LogisticRegression_TFIDF",
+        "rgpd_compliant": True,
+    }
+
+
+@app.post("/score/batch")
+async def get_social_scores_batch(payload: BatchTextPayload):
+    """
+    Calcule le score social (0-100) d'une liste de textes.
+    L'anonymisation et le nettoyage sont appliqués à tout le lot, puis la
+    vectorisation et la prédiction sont faites en un seul appel.
+    Chaque résultat est identique à celui de l'endpoint /score.
+    """
+    results = await score_batch_cached(payload.texts)
+
+    print(f"INFO: Batch processed. Size: {len(results)}")
+
+    return {
+        "results": [
+            {
+                "text_received": result.text,
+                "text_anonymized": result.anonymized_text,
+                "toxicity_score": result.social_score,
+            }
+            for result in results
+        ],
+        "count": len(results),
         "model_used": "LogisticRegression_TFIDF",
         "rgpd_compliant": True,
     }
@@ -179,3 +451,45 @@ def health_check():
         "model_loaded": model is not None,
         "vectorizer_loaded": vectorizer is not None,
     }
+
+
+@app.post("/reload_model")
+def reload_model_endpoint():
+    """Recharge immédiatement le modèle de ce worker (après un réentraînement)."""
+    if scoring_uses_processes:
+        raise HTTPException(
+            status_code=409,
+            detail="Mode process : redémarrer l'API pour charger le nouveau modèle.",
+        )
+    reload_model()
+    model_watcher.reset()
+    return {
+        "status": "success",
+        "model_loaded": model is not None,
+        "model_version": model_version(),
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    """Métriques du pool de scoring (profondeur de file, rejets...) et du cache."""
+    return {
+        "scoring_executor": scoring_executor.stats(),
+        "result_cache": result_cache.report() if result_cache is not None else None,
+    }
+
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """
+    Préparation de l'API : 200 une fois toutes les ressources préchauffées,
+    503 sinon. Inclut la durée de chaque étape de démarrage.
+    """
+    report = startup.report()
+    if scoring_uses_processes and scoring_executor.failed is not None:
+        # Processus de scoring impossibles à initialiser : aucun trafic
+        report["ready"] = False
+        report["scoring_executor_error"] = scoring_executor.failed
+    if not report["ready"]:
+        response.status_code = 503
+    return report
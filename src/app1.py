@@ -1,160 +1,180 @@
 import os
-import re
+from contextlib import asynccontextmanager
 from typing import Optional
 
-import joblib
-import nltk
-import numpy as np
 import pandas as pd
 from fastapi import FastAPI
-from nltk import ne_chunk, pos_tag
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.tokenize import word_tokenize
 from pydantic import BaseModel
 
+from artifacts import is_artifact_dir, load_artifacts
+from comment_preprocessing import CommentCleaner, anonymize_text, anonymize_texts
+from comment_store import UserAggregates, open_comment_store
+from comment_writer import CommentWriter
+from config import config
+from lemmatizer import warm_lemmatizer
+from linear_scorer import LinearScorer
+from model_watch import ModelFileWatcher
+from rescoring import RescoringReport, rescore_comments
+from result_cache import ResultCache
+from scoring import ScoringResult
+
 # --- 1. Configuration ---
 
-MODEL_PATH = "model.joblib"
-VECTORIZER_PATH = "vectorizer.joblib"
+# Artefact binaire projeté en mémoire (voir artifacts.py) s'il existe, sinon joblib
+ARTIFACT_DIR = "scorer"
+
+
+def model_paths():
+    """Chemins servis (modèle, vectoriseur, table de lemmes)."""
+    if is_artifact_dir(ARTIFACT_DIR):
+        return ARTIFACT_DIR, ARTIFACT_DIR, ARTIFACT_DIR
+    return "model.joblib", "vectorizer.joblib", "lemma_table.joblib"
+
+
+MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH = model_paths()
 PROD_CSV_PATH = "prod.csv"
+# Commentaires ajoutés depuis la dernière compaction dans prod.csv
+COMMENT_LOG_PATH = "prod.log.jsonl"
 
 # --- 2. Chargement du Modèle et du Vectoriseur ---
 
-try:
-    # Charger le modèle et le vectoriseur
-    model = joblib.load(MODEL_PATH)
-    vectorizer = joblib.load(VECTORIZER_PATH)
-    print("Modèle et vectoriseur chargés avec succès.")
-except FileNotFoundError:
-    print(
-        f"Erreur: Fichiers de modèle ({MODEL_PATH} ou {VECTORIZER_PATH}) non trouvés. L'API démarrera mais ne pourra pas inférer."
-    )
-    model = None
-    vectorizer = None
-
 
-# Charger ou initialiser prod.csv
-def load_prod_csv():
-    if os.path.exists(PROD_CSV_PATH):
-        return pd.read_csv(
-            PROD_CSV_PATH,
-            dtype={
-                "id": int,
-                "user_id": int,
-                "comment_text": str,
-                "toxicity_score": float,
-                "created_at": str,
-            },
-        )
-    else:
-        # Initialiser avec colonnes vides (structure complète actuelle)
-        columns = ["id", "user_id", "comment_text", "toxicity_score", "created_at"]
-        df = pd.DataFrame(columns=columns)
-        # Définir les types de données
-        df = df.astype(
-            {
-                "id": int,
-                "user_id": int,
-                "comment_text": str,
-                "toxicity_score": float,
-                "created_at": str,
-            }
+def load_model():
+    """Charge le modèle, le vectoriseur et le scoreur exporté du modèle."""
+    try:
+        # Charger le modèle et le vectoriseur
+        model, vectorizer = load_artifacts(MODEL_PATH, VECTORIZER_PATH)
+        print("Modèle et vectoriseur chargés avec succès.")
+    except FileNotFoundError:
+        print(
+            f"Erreur: Fichiers de modèle ({MODEL_PATH} ou {VECTORIZER_PATH}) non trouvés. L'API démarrera mais ne pourra pas inférer."
         )
-        return df
+        return None, None, None
 
+    # Scoreur exporté du modèle : vectorisation directe des tokens nettoyés et
+    # sigmoïde du produit creux, sans la validation de sklearn (voir linear_scorer.py)
+    return model, vectorizer, LinearScorer.from_model(model, vectorizer)
 
-# --- 3. Fonctions de Traitement et Anonymisation ---
 
-# Regex patterns for common PII (données sensibles)
-EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w{2,}\b", flags=re.IGNORECASE)
-PHONE_RE = re.compile(r"(?:\+?\d{1,3}[\s.-])?(?:\(?\d{2,4}\)?[\s.-])?[\d\s.-]{6,15}")
-CREDIT_RE = re.compile(r"\b(?:\d[ -]*?){13,16}\b")
-DATE_RE = re.compile(
-    r"\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{2,4})\b",
-    flags=re.IGNORECASE,
+model, vectorizer, scorer = load_model()
+
+
+def model_version() -> str:
+    """Empreinte du modèle chargé (vide sans modèle)."""
+    return scorer.version if scorer is not None else ""
+
+
+# Résultats déjà calculés, par texte brut et version du modèle (voir result_cache.py)
+result_cache = (
+    ResultCache(
+        max_bytes=config.RESULT_CACHE_MAX_MB * 1024 * 1024,
+        ttl=config.CACHE_TTL,
+        model_version=model_version(),
+        sizeof=lambda result: result.nbytes,
+    )
+    if config.USE_CACHE
+    else None
 )
-AGE_RE = re.compile(
-    r"\b(?:age\s*[:]?\s*\d{1,3}|\d{1,3}\s?(?:years?\sold|yo|y/o|yrs|ans))\b",
-    flags=re.IGNORECASE,
+
+
+# Commentaires : SQLite si DATABASE_URL est défini, sinon prod.csv + journal
+# en ajout seul (voir comment_store.py)
+comment_store = open_comment_store(
+    config.DATABASE_URL,
+    PROD_CSV_PATH,
+    COMMENT_LOG_PATH,
+    fsync_every=config.COMMENT_LOG_FSYNC_EVERY,
+    fsync_interval=config.COMMENT_LOG_FSYNC_INTERVAL,
+    compact_every=config.COMMENT_LOG_COMPACT_EVERY,
 )
-ADDRESS_RE = re.compile(
-    r"\b\d{1,5}\s+(?:[\w\s]{1,60}?)\s+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Way|Court|Ct|Square|Sq)\b",
-    flags=re.IGNORECASE,
+# Toutes les écritures passent par un thread unique qui les regroupe par lots
+comment_writer = CommentWriter(
+    comment_store, max_batch_size=config.COMMENT_WRITER_MAX_BATCH
 )
 
 
-def mask_regex_pii(text):
-    s = text
-    s = EMAIL_RE.sub("<EMAIL>", s)
-    s = CREDIT_RE.sub("<CREDIT_CARD>", s)
-    s = PHONE_RE.sub(
-        lambda m: (
-            "<PHONE>" if len(re.sub(r"[^\d]", "", m.group(0))) >= 6 else m.group(0)
-        ),
-        s,
-    )
-    s = DATE_RE.sub("<DATE>", s)
-    s = AGE_RE.sub("<AGE>", s)
-    s = ADDRESS_RE.sub("<ADDRESS>", s)
-    return s
+# Tous les commentaires, avec le schéma de prod.csv (DataFrame vide typé sinon)
+def load_prod_csv():
+    return comment_store.load_dataframe()
 
 
-def mask_named_entities(text):
-    try:
-        tokens = word_tokenize(text)
-        tags = pos_tag(tokens)
-        tree = ne_chunk(tags, binary=False)
-    except Exception:
-        return text, []
-
-    found = []
-    for subtree in tree:
-        if hasattr(subtree, "label"):
-            label = subtree.label()
-            ent = " ".join([tok for tok, pos in subtree.leaves()])
-            if label in ("PERSON", "GPE", "LOCATION", "ORGANIZATION"):
-                try:
-                    pattern = re.compile(
-                        r"\b" + re.escape(ent) + r"\b", flags=re.IGNORECASE
-                    )
-                    tag = f"<{label}>"
-                    text = pattern.sub(tag, text)
-                    found.append((ent, label))
-                except re.error:
-                    pass
-    return text, found
-
-
-def anonymize_text(text):
-    if not isinstance(text, str):
-        return "", []
-    s = mask_regex_pii(text)
-    s, entities = mask_named_entities(s)
-    return s, entities
-
-
-# NLTK Cleaning
-lemmatizer = WordNetLemmatizer()
-stop_words = set(stopwords.words("english"))
+# --- 3. Fonctions de Traitement et Anonymisation ---
+
+# NLTK Cleaning : table de lemmes compilée à l'entraînement, WordNet (cache
+# LRU) pour les tokens inconnus (voir comment_preprocessing.CommentCleaner)
+cleaner = CommentCleaner(LEMMA_TABLE_PATH)
+cleaner.load()
+warm_lemmatizer(cleaner.lemmatizer, vectorizer)
+
+
+def clean_tokens_nltk(text):
+    return cleaner.clean_tokens(text)
 
 
 def clean_text_nltk(text):
-    # 1. Mise en minuscule et suppression des caractères spéciaux
-    text = re.sub(r"[^a-zA-Z\s]", "", text.lower())
+    return cleaner(text)
 
-    # 2. Tokenisation
-    tokens = word_tokenize(text)
 
-    # 3. Suppression des stop words et lemmatisation
-    tokens = [lemmatizer.lemmatize(w) for w in tokens if w not in stop_words]
+def reload_model():
+    """
+    Recharge le modèle, le vectoriseur et la table de lemmes depuis le disque
+    (après un réentraînement). Les résultats en cache sont invalidés.
+    """
+    global MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH
+    global model, vectorizer, scorer
+    MODEL_PATH, VECTORIZER_PATH, LEMMA_TABLE_PATH = model_paths()
+    model, vectorizer, scorer = load_model()
+    cleaner.load(LEMMA_TABLE_PATH)
+    warm_lemmatizer(cleaner.lemmatizer, vectorizer)
+    if result_cache is not None:
+        result_cache.set_model_version(model_version())
+
+
+# Fichiers du modèle surveillés : un réentraînement est pris en compte avant
+# le prochain scoring (voir model_watch.py)
+model_watcher = ModelFileWatcher(
+    model_paths, interval=config.MODEL_RELOAD_CHECK_SECONDS
+)
 
-    return " ".join(tokens)
+
+def reload_model_if_changed() -> bool:
+    """Recharge le modèle si ses fichiers ont été remplacés sur disque."""
+    if not model_watcher.changed():
+        return False
+    print("INFO: Fichiers du modèle modifiés, rechargement.")
+    reload_model()
+    return True
 
 
 # --- 4. Fonctions de Calcul de Toxicité et Score Social ---
 
 
+def score_comment(text: str) -> ScoringResult:
+    """Anonymise, nettoie et prédit la toxicité d'un texte en un seul passage.
+
+    Chaque étape n'est exécutée qu'une fois ; le résultat transporte le texte
+    anonymisé, le texte nettoyé, les entités trouvées et la probabilité.
+    """
+    # 1. Anonymisation (RGPD)
+    anonymized_text, entities = anonymize_text(text)
+    result = ScoringResult(
+        text=text, anonymized_text=anonymized_text, entities=entities
+    )
+
+    if model is None or vectorizer is None:
+        return result  # Score neutre si modèle non chargé
+
+    # 2. Nettoyage NLTK
+    result.tokens = clean_tokens_nltk(anonymized_text)
+    result.cleaned_text = " ".join(result.tokens)
+
+    # 3. Vectorisation (directement depuis les tokens) et 4. Prédiction
+    # (probabilité de toxicité, identique à model.predict_proba)
+    result.prob_toxic = scorer.predict_one(result.tokens)
+
+    return result
+
+
 def calculate_toxicity_score(text: str) -> int:
     """Calcule le score de toxicité (0-100) d'un texte.
 
@@ -162,45 +182,51 @@ def calculate_toxicity_score(text: str) -> int:
     - Score 0 = peu/non toxique
     - Score 100 = très toxique
     """
+    reload_model_if_changed()
     if model is None or vectorizer is None:
         return 50  # Score neutre si modèle non chargé
 
     try:
-        # 1. Anonymisation (RGPD)
-        anonymized_text, _ = anonymize_text(text)
-
-        # 2. Nettoyage NLTK
-        cleaned_text = clean_text_nltk(anonymized_text)
-
-        # 3. Vectorisation
-        text_vec = vectorizer.transform([cleaned_text])
-
-        # 4. Prédiction (probabilité de toxicité)
-        prob_toxic = model.predict_proba(text_vec)[:, 1][0]
+        # Textes répétés (spam, copier-coller) : résultat déjà calculé
+        cache = result_cache if isinstance(text, str) else None
+        result = cache.get(text) if cache is not None else None
+        if result is None:
+            result = score_comment(text)
+            if cache is not None:
+                cache.put(text, result)
 
         # 5. Conversion en score (0 à 100)
         # Score = 100 * Probabilité de Toxicité
-        score = int(100 * prob_toxic)
-
-        return max(0, min(100, score))  # Assurer que le score est entre 0 et 100
+        return result.toxicity_score
     except Exception as e:
         print(f"Erreur lors du calcul de toxicité : {e}")
         return 50
 
 
-def calculate_user_social_score(user_id: int, prod_df: pd.DataFrame) -> float:
+def calculate_user_social_score(
+    user_id: int, prod_df: Optional[pd.DataFrame] = None
+) -> float:
     """
     Calcule le score social d'un utilisateur.
     Score social = 100 / (moyenne des scores de toxicité du user)
 
-    Si moyenne = 0, retourne 100 (user sain).
+    Si moyenne = 0, retourne 100 (user sain). Sans DataFrame, les agrégats
+    viennent de l'index tenu par le stockage (temps constant).
     """
-    user_comments = prod_df[prod_df["user_id"] == user_id]
+    if prod_df is None:
+        return social_score_from_aggregates(comment_store.user_aggregates(user_id))
+    user_scores = prod_df.loc[prod_df["user_id"] == user_id, "toxicity_score"]
+    return social_score_from_aggregates(
+        UserAggregates(user_id, len(user_scores), float(user_scores.sum()))
+    )
+
 
-    if len(user_comments) == 0:
+def social_score_from_aggregates(aggregates: UserAggregates) -> float:
+    """Score social d'un utilisateur à partir de ses agrégats (voir ci-dessus)."""
+    if aggregates.comment_count == 0:
         return 100.0  # Nouveau user = score neutre
 
-    avg_toxicity = user_comments["toxicity_score"].mean()
+    avg_toxicity = aggregates.average_toxicity
 
     if avg_toxicity == 0:
         return 100.0  # Aucune toxicité = score social maximal
@@ -209,83 +235,95 @@ def calculate_user_social_score(user_id: int, prod_df: pd.DataFrame) -> float:
     return min(100.0, max(0.0, social_score))  # Clamped entre 0 et 100
 
 
-# --- 5. Fonctions de Gestion du CSV ---
+# --- 5. Fonctions de Gestion des Commentaires ---
 
 
 def add_or_update_comment(user_id: int, comment_text: str, toxicity_score: int) -> dict:
     """
-    Ajoute ou met à jour un commentaire dans prod.csv.
+    Ajoute un commentaire au stockage (sans réécrire prod.csv).
     """
-    prod_df = load_prod_csv()
-
-    # Génération d'un ID unique (simple)
-    if len(prod_df) == 0:
-        new_id = 1
-    else:
-        new_id = prod_df["id"].max() + 1
-
-    # Créer la nouvelle ligne
     from datetime import datetime
 
-    new_row = pd.DataFrame(
-        {
-            "id": [new_id],
-            "user_id": [user_id],
-            "comment_text": [comment_text],
-            "toxicity_score": [toxicity_score],
-            "created_at": [datetime.now().isoformat()],
-        }
+    # Ajout en O(1) par l'écrivain unique ; l'ID suivant (unique entre les
+    # workers) est attribué par le stockage
+    record = comment_writer.submit(
+        user_id, comment_text, toxicity_score, datetime.now().isoformat()
     )
 
-    # Ajouter à la DataFrame et sauvegarder
-    prod_df = pd.concat([prod_df, new_row], ignore_index=True)
-    prod_df.to_csv(PROD_CSV_PATH, index=False)
-
-    # Recalculer le score social du user
-    social_score = calculate_user_social_score(user_id, prod_df)
+    # Recalculer le score social du user (agrégats mis à jour par l'insertion)
+    social_score = calculate_user_social_score(user_id)
 
     return {
-        "id": new_id,
+        "id": record["id"],
         "user_id": user_id,
         "toxicity_score": toxicity_score,
         "user_social_score": social_score,
     }
 
 
-def compute_all_toxicity_scores():
+def compact_comment_log() -> int:
+    """Intègre les commentaires journalisés à prod.csv et vide le journal."""
+    moved = comment_store.compact()
+    if moved:
+        print(
+            f"Compaction du journal : {moved} commentaires intégrés à {PROD_CSV_PATH}."
+        )
+    return moved
+
+
+def predict_toxicity_batch(token_lists):
+    """Probabilités de toxicité d'un lot (None si modèle non chargé)."""
+    if model is None or vectorizer is None:
+        return [None] * len(token_lists)  # Score neutre
+    return scorer.predict_proba(token_lists)
+
+
+def compute_all_toxicity_scores() -> RescoringReport:
     """
     Calcule et met à jour les scores de toxicité de tous les commentaires
-    dans prod.csv (fonction amont).
+    stockés (fonction amont), par lots : anonymisation et nettoyage dans un
+    pool de processus, une prédiction par lot (voir rescoring.py).
     """
-    prod_df = load_prod_csv()
-
-    if len(prod_df) == 0:
-        print("prod.csv est vide. Aucun score à calculer.")
-        return
-
-    print(f"Calcul des scores de toxicité pour {len(prod_df)} commentaires...")
+    reload_model_if_changed()
+    # Pas de comptage préalable : le stockage n'est parcouru qu'une fois
+    print("Calcul des scores de toxicité de tous les commentaires...")
+
+    # Fonctions de comment_preprocessing : les workers "spawn" n'importent
+    # pas app1.py (modèle, stockage, écrivain)
+    report = rescore_comments(
+        comment_store,
+        anonymize_texts,
+        cleaner,
+        predict_toxicity_batch,
+        workers=config.RESCORING_WORKERS,
+        chunk_size=config.RESCORING_CHUNK_SIZE,
+    )
+    if report.comments == 0:
+        print("Aucun commentaire stocké. Aucun score à calculer.")
+        return report
+    print(
+        f"Mise à jour terminée. {report.comments} commentaires traités "
+        f"en {report.seconds:.1f}s ({report.comments_per_second:.0f} commentaires/s)."
+    )
 
-    scores = []
-    for idx, row in prod_df.iterrows():
-        text = row.get("comment_text", "")
-        toxicity = calculate_toxicity_score(text)
-        scores.append(toxicity)
+    return report
 
-        if (idx + 1) % 100 == 0:
-            print(f"  Traité {idx + 1} commentaires...")
 
-    prod_df["toxicity_score"] = scores
-    prod_df.to_csv(PROD_CSV_PATH, index=False)
-    print(f"Mise à jour terminée. {len(prod_df)} commentaires traités.")
+# --- 6. Définition de l'API FastAPI ---
 
-    return prod_df
 
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    # Arrêt : commentaires en attente écrits, journal synchronisé sur disque
+    comment_writer.close()
+    comment_store.close()
 
-# --- 6. Définition de l'API FastAPI ---
 
 app = FastAPI(
     title="Digital Social Score API",
     description="API pour la détection de toxicité, anonymisation RGPD et score social utilisateur.",
+    lifespan=lifespan,
 )
 
 
@@ -334,19 +372,14 @@ def submit_comment(payload: CommentPayload):
 @app.get("/user_social_score/{user_id}")
 def get_user_social_score(user_id: int):
     """Récupère le score social actuel d'un utilisateur."""
-    prod_df = load_prod_csv()
-    social_score = calculate_user_social_score(user_id, prod_df)
-
-    user_comments = prod_df[prod_df["user_id"] == user_id]
-    avg_toxicity = (
-        user_comments["toxicity_score"].mean() if len(user_comments) > 0 else 0
-    )
+    aggregates = comment_store.user_aggregates(user_id)
+    social_score = social_score_from_aggregates(aggregates)
 
     return {
         "user_id": user_id,
         "user_social_score": round(social_score, 2),
-        "average_toxicity": round(avg_toxicity, 2),
-        "comment_count": len(user_comments),
+        "average_toxicity": round(aggregates.average_toxicity, 2),
+        "comment_count": aggregates.comment_count,
     }
 
 
@@ -354,14 +387,39 @@ def get_user_social_score(user_id: int):
 def compute_all_toxicity():
     """
     Fonction amont : calcule les scores de toxicité de tous les commentaires
-    dans prod.csv et les met à jour.
+    stockés et les met à jour.
     """
-    prod_df = compute_all_toxicity_scores()
+    report = compute_all_toxicity_scores()
 
     return {
         "status": "success",
         "message": "Tous les scores de toxicité ont été calculés et mis à jour.",
-        "total_comments_processed": len(prod_df) if prod_df is not None else 0,
+        "total_comments_processed": report.comments,
+        "comments_per_second": round(report.comments_per_second, 1),
+    }
+
+
+@app.post("/reload_model")
+def reload_model_endpoint():
+    """Recharge immédiatement le modèle (après un réentraînement)."""
+    reload_model()
+    model_watcher.reset()
+    return {
+        "status": "success",
+        "model_loaded": model is not None,
+        "model_version": model_version(),
+    }
+
+
+@app.post("/compact_comments")
+def compact_comments():
+    """Compaction : intègre le journal des commentaires à prod.csv."""
+    moved = compact_comment_log()
+
+    return {
+        "status": "success",
+        "message": "Journal des commentaires intégré à prod.csv.",
+        "comments_compacted": moved,
     }
 
 
@@ -385,6 +443,7 @@ def root():
             "POST /submit_comment": "Soumettre un commentaire d'un user (user_id, comment_text)",
             "GET /user_social_score/{user_id}": "Obtenir le score social d'un user",
             "POST /compute_all_toxicity": "Calculer les scores de toxicité de tous les commentaires",
+            "POST /compact_comments": "Intégrer le journal des commentaires à prod.csv",
             "GET /health": "Vérifier l'état de l'API",
         },
     }
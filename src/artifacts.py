@@ -0,0 +1,385 @@
+"""
+Artefact binaire du modèle, chargé par projection mémoire (mmap)
+
+Chaque worker gunicorn faisait joblib.load de model.joblib et
+vectorizer.joblib à l'import : le vocabulaire (un dict Python) était
+désérialisé dans le tas privé de chaque worker. L'artefact binaire est un
+répertoire versionné de tableaux NumPy :
+
+    meta.json            version du format et paramètres du vectoriseur
+    coef.npy             coefficients de la régression logistique (float64)
+    idf.npy              idf_ du vectoriseur (float64, absent sans idf)
+    vocab_offsets.npy    début de chaque terme dans vocab_bytes (int64)
+    vocab_bytes.npy      termes UTF-8 concaténés, dans l'ordre des features
+    vocab_slots.npy      table de hachage (crc32, adressage ouvert) -> feature
+    lemma_*.npy          table de lemmes (forme de surface -> feature, voir
+                         lemmatizer.LemmaTable), même disposition que vocab_*
+                         plus lemma_features.npy (optionnelle)
+
+meta.json enregistre aussi la taille et la date de modification (mtime_ns)
+des fichiers joblib exportés (model.joblib, vectorizer.joblib,
+lemma_table.joblib) : si ceux-ci ont changé depuis l'export (réentraînement
+sans nouvel artefact), l'artefact est ignoré et les fichiers joblib sont
+chargés à la place. La vérification ne coûte qu'un stat par fichier, sans
+les relire.
+
+Les tableaux sont ouverts avec np.load(mmap_mode="r") : les workers d'un
+même nœud partagent les mêmes pages, et le démarrage ne dépend pas de la
+taille du vocabulaire (rien n'est lu avant la première recherche).
+
+MappedModel et MappedVectorizer exposent les attributs utilisés par
+TfidfFeaturizer et LinearScorer (coef_, intercept_, vocabulary_, idf_...),
+avec des résultats identiques au modèle et au vectoriseur d'origine.
+"""
+
+import json
+import os
+import shutil
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, Mapping, Optional, Tuple, Union
+
+import joblib
+import numpy as np
+from scipy.special import expit
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from featurizer import TfidfFeaturizer, supports
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+# Nombre de recherches de termes mémorisées par processus
+_LOOKUP_CACHE_SIZE = 65536
+
+
+def file_stamp(path: Union[str, Path]) -> dict:
+    """Taille et date de modification d'un fichier (sans le lire)."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def is_artifact_dir(path: Union[str, Path]) -> bool:
+    """
+    Indique si `path` contient un artefact binaire à jour : les fichiers
+    joblib d'origine présents à côté doivent être ceux de l'export.
+    """
+    path = Path(path)
+    try:
+        meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    for name, stamp in meta.get("sources", {}).items():
+        source = path.parent / name
+        if source.is_file() and file_stamp(source) != stamp:
+            print(f"Artefact binaire ignoré ({path}): {name} a changé depuis l'export")
+            return False
+    return True
+
+
+def _hash(term: bytes) -> int:
+    return zlib.crc32(term)
+
+
+def _save_terms(directory: Path, prefix: str, terms: list):
+    """Écrit <prefix>_offsets/_bytes/_slots.npy pour une liste de termes."""
+    encoded = [term.encode("utf-8") for term in terms]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(term) for term in encoded])
+    np.save(directory / f"{prefix}_offsets.npy", offsets)
+    np.save(
+        directory / f"{prefix}_bytes.npy",
+        np.frombuffer(b"".join(encoded), dtype=np.uint8),
+    )
+    np.save(directory / f"{prefix}_slots.npy", _build_slots(encoded))
+
+
+def _build_slots(terms: list) -> np.ndarray:
+    """Table de hachage à adressage ouvert (taux de remplissage <= 0.5)."""
+    size = 1
+    while size < 2 * max(1, len(terms)):
+        size *= 2
+    mask = size - 1
+    slots = np.full(size, -1, dtype=np.int32)
+    for index, term in enumerate(terms):
+        slot = _hash(term) & mask
+        while slots[slot] >= 0:
+            slot = (slot + 1) & mask
+        slots[slot] = index
+    return slots
+
+
+class MappedVocabulary:
+    """
+    Vocabulaire terme -> indice de feature lu dans les tableaux projetés.
+
+    Se comporte comme vectorizer.vocabulary_ en lecture (get, in, [], len,
+    itération) sans construire de dict. Avec `values`, un terme est associé
+    à values[position] au lieu de sa position (table de lemmes).
+    """
+
+    def __init__(
+        self,
+        offsets: np.ndarray,
+        data: np.ndarray,
+        slots: np.ndarray,
+        values: Optional[np.ndarray] = None,
+    ):
+        self._arrays = (offsets, data, slots, values)
+        # Vues sans copie : l'indexation d'un memoryview retourne des int Python
+        self._offsets = memoryview(offsets)
+        self._data = memoryview(data)
+        self._slots = memoryview(slots)
+        self._values = memoryview(values) if values is not None else None
+        self._mask = len(slots) - 1
+        self._size = len(offsets) - 1
+        self.get = lru_cache(maxsize=_LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def _term_bytes(self, index: int) -> bytes:
+        return self._data[self._offsets[index] : self._offsets[index + 1]].tobytes()
+
+    def _value(self, index: int) -> int:
+        return index if self._values is None else self._values[index]
+
+    def term(self, index: int) -> str:
+        """Terme à la position `index` (l'indice de feature pour un vocabulaire)."""
+        return self._term_bytes(index).decode("utf-8")
+
+    def _lookup(self, term: str, default=None):
+        encoded = term.encode("utf-8")
+        slots = self._slots
+        mask = self._mask
+        slot = _hash(encoded) & mask
+        while True:
+            index = slots[slot]
+            if index < 0:
+                return default
+            if self._term_bytes(index) == encoded:
+                return self._value(index)
+            slot = (slot + 1) & mask
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, term) -> bool:
+        return isinstance(term, str) and self.get(term) is not None
+
+    def __getitem__(self, term: str) -> int:
+        index = self.get(term)
+        if index is None:
+            raise KeyError(term)
+        return index
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._size):
+            yield self.term(index)
+
+    def items(self) -> Iterator[Tuple[str, int]]:
+        return ((term, self._value(index)) for index, term in enumerate(self))
+
+
+class MappedTerms:
+    """Termes d'un vocabulaire projeté par indice de feature (terms[indice])."""
+
+    def __init__(self, vocabulary: MappedVocabulary):
+        self._vocabulary = vocabulary
+
+    def __len__(self) -> int:
+        return len(self._vocabulary)
+
+    def __getitem__(self, index: int) -> str:
+        return self._vocabulary.term(index)
+
+
+class MappedVectorizer:
+    """Vectoriseur TF-IDF (inférence seulement) reconstruit depuis l'artefact."""
+
+    analyzer = "word"
+    tokenizer = None
+    preprocessor = None
+    strip_accents = None
+    ngram_range = (1, 1)
+    dtype = np.float64
+
+    def __init__(
+        self, meta: dict, vocabulary: MappedVocabulary, idf: Optional[np.ndarray]
+    ):
+        self.vocabulary_ = vocabulary
+        self.lowercase = meta["lowercase"]
+        self.token_pattern = meta["token_pattern"]
+        self.stop_words = meta["stop_words"]
+        self.norm = meta["norm"]
+        self.binary = meta["binary"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.use_idf = idf is not None
+        if idf is not None:
+            self.idf_ = idf
+        self._featurizer = None
+
+    def build_analyzer(self):
+        """Même analyseur que le vectoriseur d'origine."""
+        return TfidfVectorizer(
+            lowercase=self.lowercase,
+            token_pattern=self.token_pattern,
+            stop_words=self.stop_words,
+        ).build_analyzer()
+
+    def transform(self, raw_documents):
+        """Équivalent de TfidfVectorizer.transform."""
+        if self._featurizer is None:
+            self._featurizer = TfidfFeaturizer(self)
+            self._analyze = self.build_analyzer()
+        return self._featurizer.transform(self._analyze(doc) for doc in raw_documents)
+
+
+class MappedModel:
+    """Régression logistique binaire (inférence seulement) lue dans l'artefact."""
+
+    def __init__(self, coef: np.ndarray, intercept: float, classes):
+        self.coef_ = coef.reshape(1, -1)
+        self.intercept_ = np.array([intercept], dtype=np.float64)
+        self.classes_ = np.asarray(classes)
+
+    def decision_function(self, X) -> np.ndarray:
+        return X @ self.coef_[0] + self.intercept_[0]
+
+    def predict_proba(self, X) -> np.ndarray:
+        prob = expit(self.decision_function(X))
+        return np.vstack([1 - prob, prob]).T
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(int)]
+
+
+def save_artifact(
+    model,
+    vectorizer,
+    path: Union[str, Path],
+    sources: Iterable[Union[str, Path]] = (),
+    lemma_forms: Optional[Mapping[str, int]] = None,
+) -> Path:
+    """
+    Écrit l'artefact binaire de `model` et `vectorizer` dans le répertoire
+    `path` (remplacé en une fois). Lève ValueError si le modèle n'est pas
+    binaire ou si le vectoriseur utilise des options non supportées.
+
+    `sources` : fichiers joblib exportés (à côté de `path`), dont
+    la taille et la date de modification sont vérifiées au chargement (voir
+    is_artifact_dir).
+    `lemma_forms` : table forme de surface -> indice de feature
+    (LemmaTable.forms), projetée en mémoire comme le vocabulaire.
+    """
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    if coef.ndim != 2 or coef.shape[0] != 1:
+        raise ValueError("Seuls les modèles linéaires binaires sont supportés")
+    if not supports(vectorizer) or vectorizer.token_pattern is None:
+        raise ValueError("Options du vectoriseur non supportées par l'artefact binaire")
+    if coef.shape[1] != len(vectorizer.vocabulary_):
+        raise ValueError(
+            "Le modèle et le vectoriseur n'ont pas le même nombre de features"
+        )
+
+    terms = [""] * len(vectorizer.vocabulary_)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    if lemma_forms is not None:
+        forms = sorted(lemma_forms)
+        features = np.array([lemma_forms[form] for form in forms], dtype=np.int32)
+        if len(features) and not 0 <= features.min() <= features.max() < len(terms):
+            raise ValueError("La table de lemmes ne correspond pas au vectoriseur")
+    try:
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)
+    except AttributeError:
+        idf = None
+    stop_words = vectorizer.get_stop_words()
+
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_features": len(terms),
+        "intercept": float(model.intercept_[0]),
+        "classes": [c.item() if hasattr(c, "item") else c for c in model.classes_],
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "norm": vectorizer.norm,
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "has_idf": idf is not None,
+        "has_lemma_table": lemma_forms is not None,
+    }
+
+    path = Path(path)
+    meta["sources"] = {
+        os.path.relpath(source, path.parent): file_stamp(source) for source in sources
+    }
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "coef.npy", coef[0])
+    if idf is not None:
+        np.save(tmp / "idf.npy", idf)
+    _save_terms(tmp, "vocab", terms)
+    if lemma_forms is not None:
+        _save_terms(tmp, "lemma", forms)
+        np.save(tmp / "lemma_features.npy", features)
+    (tmp / META_FILE).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+    return path
+
+
+def load_artifact(path: Union[str, Path]) -> Tuple[MappedModel, MappedVectorizer]:
+    """Ouvre l'artefact binaire (tableaux projetés en mémoire, en lecture seule)."""
+    path = Path(path)
+    meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(
+            f"Version d'artefact non supportée: {meta.get('format_version')}"
+        )
+
+    def load(name):
+        return np.load(path / name, mmap_mode="r")
+
+    vocabulary = MappedVocabulary(
+        load("vocab_offsets.npy"), load("vocab_bytes.npy"), load("vocab_slots.npy")
+    )
+    idf = load("idf.npy") if meta["has_idf"] else None
+    model = MappedModel(load("coef.npy"), meta["intercept"], meta["classes"])
+    return model, MappedVectorizer(meta, vocabulary, idf)
+
+
+def load_lemma_table(path: Union[str, Path]) -> Tuple[MappedVocabulary, MappedTerms]:
+    """
+    Ouvre la table de lemmes de l'artefact : (forme -> indice de feature,
+    termes par indice). Lève ValueError si l'artefact n'en contient pas.
+    """
+    path = Path(path)
+    meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+    if not meta.get("has_lemma_table"):
+        raise ValueError(f"Pas de table de lemmes dans l'artefact {path}")
+
+    def load(name):
+        return np.load(path / name, mmap_mode="r")
+
+    forms = MappedVocabulary(
+        load("lemma_offsets.npy"),
+        load("lemma_bytes.npy"),
+        load("lemma_slots.npy"),
+        load("lemma_features.npy"),
+    )
+    vocabulary = MappedVocabulary(
+        load("vocab_offsets.npy"), load("vocab_bytes.npy"), load("vocab_slots.npy")
+    )
+    return forms, MappedTerms(vocabulary)
+
+
+def load_artifacts(model_path: Union[str, Path], vectorizer_path: Union[str, Path]):
+    """
+    Charge (modèle, vectoriseur) : artefact binaire si `model_path` est un
+    répertoire d'artefact, sinon les fichiers joblib.
+    """
+    if is_artifact_dir(model_path):
+        return load_artifact(model_path)
+    return joblib.load(model_path), joblib.load(vectorizer_path)
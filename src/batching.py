@@ -0,0 +1,114 @@
+"""
+Micro-batching des requêtes de scoring (coalescence côté serveur)
+
+Les requêtes /score concurrentes sont regroupées pendant quelques
+millisecondes (ou jusqu'à N requêtes en attente) pour exécuter une seule
+vectorisation et un seul predict_proba sur le groupe. Chaque appelant
+récupère ensuite son propre résultat et le délai d'attente qu'il a payé.
+
+Les handlers asynchrones soumettent depuis la boucle d'événements
+(`submit_async`) sans occuper de thread pendant l'attente : un lot n'est
+donc pas limité au nombre de threads du pool de scoring.
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+
+class _PendingRequest:
+    """Requête en attente d'être traitée dans un lot."""
+
+    __slots__ = ("item", "enqueued_at", "future")
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.enqueued_at = time.perf_counter()
+        self.future: "Future[Tuple[Any, float]]" = Future()
+
+
+class MicroBatcher:
+    """
+    Regroupe les appels concurrents à `submit` en lots.
+
+    Un thread de fond attend la première requête, puis collecte les suivantes
+    jusqu'à `max_batch_size` éléments ou jusqu'à ce que la première ait
+    attendu `max_wait_ms`. `batch_fn` reçoit la liste des éléments du lot et
+    doit retourner une liste de résultats dans le même ordre.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: "queue.Queue[_PendingRequest]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def _ensure_worker(self):
+        """Démarre le thread de traitement au premier appel (après un fork)."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="micro-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _enqueue(self, item: Any) -> "Future[Tuple[Any, float]]":
+        self._ensure_worker()
+        pending = _PendingRequest(item)
+        self._queue.put(pending)
+        return pending.future
+
+    def submit(self, item: Any) -> Tuple[Any, float]:
+        """
+        Soumet un élément et bloque jusqu'au traitement de son lot.
+
+        Retourne (résultat, délai d'attente en millisecondes). Chaque appelant
+        bloqué occupe un thread : depuis un handler asynchrone, préférer
+        `submit_async`.
+        """
+        return self._enqueue(item).result()
+
+    async def submit_async(self, item: Any) -> Tuple[Any, float]:
+        """Comme `submit`, mais attend le lot depuis la boucle d'événements."""
+        return await asyncio.wrap_future(self._enqueue(item))
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        batch = [self._queue.get()]
+        deadline = batch[0].enqueued_at + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            started_at = time.perf_counter()
+            delays = [(started_at - pending.enqueued_at) * 1000.0 for pending in batch]
+            try:
+                results = self.batch_fn([pending.item for pending in batch])
+            except Exception as e:
+                for pending in batch:
+                    pending.future.set_exception(e)
+                continue
+            for pending, result, delay_ms in zip(batch, results, delays):
+                pending.future.set_result((result, delay_ms))
@@ -0,0 +1,424 @@
+"""
+Journal des commentaires en ajout seul (JSONL) et instantané CSV
+
+Chaque /submit_comment relisait tout prod.csv (pd.read_csv), ajoutait une
+ligne (pd.concat) puis réécrivait le fichier entier (to_csv) : le coût
+d'une écriture croissait avec le nombre total de commentaires.
+
+CommentLog ajoute les commentaires en lignes JSON à la fin d'un journal
+(O(1) par écriture). Les fsync sont regroupés : au plus tous les
+`fsync_every` commentaires ou toutes les `fsync_interval` secondes (un
+minuteur synchronise les derniers ajouts si aucun autre n'arrive). La
+compaction réécrit l'instantané (prod.csv, toujours lu par train.py) avec
+le contenu du journal, puis vide le journal. `load_dataframe` relit
+instantané + journal avec le même schéma que load_prod_csv.
+
+Plusieurs processus (workers gunicorn) peuvent partager le même journal :
+chaque écriture, compaction ou lecture prend un verrou fcntl.flock sur
+`<instantané>.lock`, qui contient aussi le dernier ID attribué. Les IDs
+sont donc uniques et croissants entre tous les processus, et le journal
+est rouvert à chaque lot (une compaction par un autre processus ne peut
+pas faire perdre d'écriture).
+
+La compaction écrit l'instantané avant de vider le journal : un arrêt entre
+les deux laisse dans le journal des lignes déjà intégrées. Les IDs étant
+croissants, toute ligne du journal dont l'ID ne dépasse pas le plus grand ID
+de l'instantané est ignorée à la lecture, puis supprimée à la compaction
+suivante.
+"""
+
+import fcntl
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+COLUMNS = ["id", "user_id", "comment_text", "toxicity_score", "created_at"]
+DTYPES = {
+    "id": int,
+    "user_id": int,
+    "comment_text": str,
+    "toxicity_score": float,
+    "created_at": str,
+}
+
+# Position de lecture : (identité de l'instantané, inode du journal, offset)
+LogCursor = Tuple[Optional[tuple], Optional[int], int]
+
+
+def read_snapshot(path: Union[str, Path]) -> pd.DataFrame:
+    """Instantané CSV des commentaires (DataFrame vide typé s'il est absent)."""
+    if os.path.exists(path):
+        return pd.read_csv(path, dtype=DTYPES)
+    return pd.DataFrame(columns=COLUMNS).astype(DTYPES)
+
+
+def write_snapshot(df: pd.DataFrame, path: Union[str, Path]):
+    """Écrit l'instantané de façon atomique (fichier temporaire puis rename)."""
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    df.to_csv(tmp, index=False)
+    with open(tmp, "rb+") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _file_identity(path: Path) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def _records_frame(records: List[Dict]) -> pd.DataFrame:
+    return pd.DataFrame(records, columns=COLUMNS).astype(DTYPES)
+
+
+def _not_in_snapshot(records: Iterable[Dict], snapshot: pd.DataFrame) -> List[Dict]:
+    """Lignes du journal absentes de l'instantané (ID > plus grand ID de celui-ci)."""
+    if not len(snapshot):
+        return list(records)
+    snapshot_last_id = int(snapshot["id"].max())
+    return [record for record in records if int(record["id"]) > snapshot_last_id]
+
+
+class CommentLog:
+    """
+    Commentaires stockés dans un instantané CSV suivi d'un journal JSONL.
+
+    Utilisable depuis plusieurs threads et plusieurs processus.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: Union[str, Path],
+        log_path: Union[str, Path],
+        fsync_every: int = 64,
+        fsync_interval: float = 1.0,
+    ):
+        if fsync_every < 1:
+            raise ValueError("fsync_every doit être >= 1")
+        self.snapshot_path = Path(snapshot_path)
+        self.log_path = Path(log_path)
+        self.lock_path = self.snapshot_path.with_name(self.snapshot_path.name + ".lock")
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._lock = threading.RLock()
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_timer: Optional[threading.Timer] = None
+        self._log_records: Optional[int] = None
+
+    # --- Verrou inter-processus et IDs --------------------------------------
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """Verrou flock sur le fichier .lock (descripteur retourné)."""
+        with self._lock:
+            self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                yield fd
+            finally:
+                os.close(fd)
+
+    def _scan_last_id(self) -> int:
+        ids = [record["id"] for record in self.read_log()]
+        snapshot = read_snapshot(self.snapshot_path)
+        if len(snapshot):
+            ids.append(int(snapshot["id"].max()))
+        return max(ids, default=0)
+
+    def _read_last_id(self, fd: int) -> int:
+        os.lseek(fd, 0, os.SEEK_SET)
+        raw = os.read(fd, 64).strip()
+        # Fichier .lock neuf ou perdu : dernier ID recalculé depuis les données
+        return int(raw) if raw else self._scan_last_id()
+
+    def _write_last_id(self, fd: int, last_id: int):
+        os.lseek(fd, 0, os.SEEK_SET)
+        os.ftruncate(fd, 0)
+        os.write(fd, str(last_id).encode("ascii"))
+
+    def next_id(self) -> int:
+        """Identifiant que recevra le prochain commentaire."""
+        with self._locked(exclusive=False) as fd:
+            return self._read_last_id(fd) + 1
+
+    # --- Écriture -----------------------------------------------------------
+
+    @property
+    def log_records(self) -> int:
+        """Commentaires du journal pas encore intégrés à l'instantané."""
+        with self._lock:
+            if self._log_records is None:
+                with self._locked(exclusive=False):
+                    self._log_records = sum(1 for _ in self.read_log())
+            return self._log_records
+
+    def _drop_partial_line(self):
+        """Supprime une dernière ligne tronquée (arrêt pendant une écriture)."""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, "rb+") as f:
+            end = f.seek(0, os.SEEK_END)
+            if end == 0:
+                return
+            f.seek(end - 1)
+            if f.read(1) == b"\n":
+                return
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                f.seek(start)
+                newline = f.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    f.truncate(start + newline + 1)
+                    return
+                position = start
+            f.truncate(0)
+
+    def append(self, record: Dict) -> Dict:
+        """Ajoute un commentaire ; voir append_many."""
+        return self.append_many([record])[0]
+
+    def append_many(self, records: Sequence[Dict]) -> List[Dict]:
+        """
+        Ajoute des commentaires à la fin du journal en une seule écriture.
+        Ceux sans `id` reçoivent les IDs suivants. Retourne les
+        enregistrements écrits.
+        """
+        if not records:
+            return []
+        with self._locked() as fd:
+            last_id = self._read_last_id(fd)
+            written = []
+            for record in records:
+                record = {column: record.get(column) for column in COLUMNS}
+                if record["id"] is None:
+                    record["id"] = last_id + 1
+                last_id = max(last_id, int(record["id"]))
+                written.append(record)
+            # L'ID est réservé avant l'écriture : un arrêt entre les deux
+            # laisse un trou, jamais un doublon
+            self._write_last_id(fd, last_id)
+            self._drop_partial_line()
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(
+                    "".join(
+                        json.dumps(record, ensure_ascii=False) + "\n"
+                        for record in written
+                    )
+                )
+                f.flush()
+                self._unsynced += len(written)
+                if (
+                    self._unsynced >= self.fsync_every
+                    or time.monotonic() - self._last_sync >= self.fsync_interval
+                ):
+                    os.fsync(f.fileno())
+                    self._mark_synced()
+                else:
+                    self._schedule_sync()
+            if self._log_records is not None:
+                self._log_records += len(written)
+            return written
+
+    def _mark_synced(self):
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _schedule_sync(self):
+        """fsync au plus `fsync_interval` secondes après un ajout non synchronisé."""
+        if self._sync_timer is None:
+            self._sync_timer = threading.Timer(self.fsync_interval, self._timed_sync)
+            self._sync_timer.daemon = True
+            self._sync_timer.start()
+
+    def _timed_sync(self):
+        with self._lock:
+            self._sync_timer = None
+        self.sync()
+
+    def sync(self):
+        """Force l'écriture sur disque des commentaires ajoutés."""
+        with self._locked(exclusive=False):
+            if self._unsynced and self.log_path.exists():
+                with open(self.log_path, "rb") as f:
+                    os.fsync(f.fileno())
+            self._mark_synced()
+
+    def close(self):
+        with self._lock:
+            if self._sync_timer is not None:
+                self._sync_timer.cancel()
+                self._sync_timer = None
+        self.sync()
+
+    # --- Lecture ------------------------------------------------------------
+
+    def read_log(self) -> Iterator[Dict]:
+        """Enregistrements du journal (une dernière ligne tronquée est ignorée)."""
+        if not self.log_path.exists():
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                yield json.loads(line)
+
+    def iter_records(self, chunk_size: int = 1000) -> Iterator[Dict]:
+        """
+        Tous les commentaires (instantané puis journal) sans les charger en
+        entier : l'instantané est lu par tranches de `chunk_size` lignes. Les
+        deux fichiers sont ouverts sous verrou, une compaction concurrente
+        (qui les remplace) ne change donc pas ce qui est parcouru.
+        """
+        with self._locked(exclusive=False):
+            snapshot = (
+                open(self.snapshot_path, encoding="utf-8")
+                if self.snapshot_path.exists()
+                else None
+            )
+            log = open(self.log_path, "rb") if self.log_path.exists() else None
+        try:
+            snapshot_last_id = 0
+            if snapshot is not None:
+                for chunk in pd.read_csv(snapshot, dtype=DTYPES, chunksize=chunk_size):
+                    if len(chunk):
+                        snapshot_last_id = max(snapshot_last_id, int(chunk["id"].max()))
+                    yield from chunk.to_dict("records")
+            if log is not None:
+                lines = (line for line in log if line.endswith(b"\n"))
+                while True:
+                    batch = [
+                        json.loads(line) for line in itertools.islice(lines, chunk_size)
+                    ]
+                    if not batch:
+                        break
+                    batch = [r for r in batch if int(r["id"]) > snapshot_last_id]
+                    yield from _records_frame(batch).to_dict("records")
+        finally:
+            if snapshot is not None:
+                snapshot.close()
+            if log is not None:
+                log.close()
+
+    def load_dataframe(self) -> pd.DataFrame:
+        """Instantané + journal, avec le schéma de load_prod_csv."""
+        with self._locked(exclusive=False):
+            snapshot = read_snapshot(self.snapshot_path)
+            records = _not_in_snapshot(self.read_log(), snapshot)
+        if not records:
+            return snapshot
+        appended = _records_frame(records)
+        if not len(snapshot):
+            return appended
+        return pd.concat([snapshot, appended], ignore_index=True)
+
+    def changes_since(
+        self, cursor: Optional[LogCursor]
+    ) -> Tuple[Optional[pd.DataFrame], List[Dict], LogCursor]:
+        """
+        Commentaires écrits depuis `cursor` (par n'importe quel processus).
+
+        Retourne (instantané, enregistrements du journal, nouveau curseur).
+        L'instantané n'est relu (et retourné) que si `cursor` est None ou s'il
+        a changé depuis (compaction, réécriture) : les enregistrements sont
+        alors tout le journal, sinon seulement les lignes ajoutées.
+        """
+        with self._locked(exclusive=False):
+            snapshot_id = _file_identity(self.snapshot_path)
+            log_id = _file_identity(self.log_path)
+            log_inode = log_id[0] if log_id is not None else None
+            snapshot = None
+            offset = 0
+            if cursor is None or cursor[0] != snapshot_id:
+                snapshot = read_snapshot(self.snapshot_path)
+            elif cursor[1] is not None and cursor[1] != log_inode:
+                # Journal remplacé sans changement d'instantané : tout relire
+                snapshot = read_snapshot(self.snapshot_path)
+            elif cursor[1] == log_inode:
+                offset = cursor[2]
+            records: List[Dict] = []
+            if log_inode is not None:
+                with open(self.log_path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+                complete = data[: data.rfind(b"\n") + 1]
+                records = [json.loads(line) for line in complete.splitlines()]
+                offset += len(complete)
+                if snapshot is not None:
+                    records = _not_in_snapshot(records, snapshot)
+        return snapshot, records, (snapshot_id, log_inode, offset)
+
+    # --- Compaction ---------------------------------------------------------
+
+    def replace(self, df: pd.DataFrame):
+        """Remplace tout le contenu (instantané réécrit, journal vidé)."""
+        with self._locked() as fd:
+            last_id = self._read_last_id(fd)
+            write_snapshot(df[COLUMNS], self.snapshot_path)
+            self._truncate_log()
+            if len(df):
+                self._write_last_id(fd, max(last_id, int(df["id"].max())))
+
+    def update_toxicity_scores(self, scores: Dict[int, float]):
+        """
+        Réécrit les scores de toxicité (id -> score) dans un nouvel instantané
+        et vide le journal, sous verrou : aucun ajout concurrent n'est perdu.
+        """
+        with self._locked():
+            snapshot = read_snapshot(self.snapshot_path)
+            records = _not_in_snapshot(self.read_log(), snapshot)
+            df = (
+                pd.concat([snapshot, _records_frame(records)], ignore_index=True)
+                if records
+                else snapshot
+            )
+            df["toxicity_score"] = [
+                float(scores.get(comment_id, score))
+                for comment_id, score in zip(df["id"], df["toxicity_score"])
+            ]
+            write_snapshot(df, self.snapshot_path)
+            self._truncate_log()
+
+    def compact(self) -> int:
+        """
+        Intègre le journal à l'instantané puis vide le journal. Retourne le
+        nombre de commentaires déplacés du journal vers l'instantané.
+        """
+        with self._locked():
+            records = list(self.read_log())
+            if not records:
+                self._log_records = 0
+                return 0
+            snapshot = read_snapshot(self.snapshot_path)
+            records = _not_in_snapshot(records, snapshot)
+            if not records:
+                # Reste d'une compaction interrompue : déjà dans l'instantané
+                self._truncate_log()
+                return 0
+            appended = _records_frame(records)
+            df = (
+                pd.concat([snapshot, appended], ignore_index=True)
+                if len(snapshot)
+                else appended
+            )
+            write_snapshot(df, self.snapshot_path)
+            self._truncate_log()
+            return len(records)
+
+    def _truncate_log(self):
+        if self.log_path.exists():
+            self.log_path.unlink()
+        self._mark_synced()
+        self._log_records = 0
@@ -0,0 +1,129 @@
+"""
+Anonymisation et nettoyage des commentaires de app1.py
+
+Fonctions utilisées par l'API et par les workers de rescoring (voir
+rescoring.py). Ceux-ci sont démarrés en "spawn" et importent les fonctions
+qu'ils reçoivent : ce module ne charge ni le modèle, ni le stockage des
+commentaires, ni l'écrivain, contrairement à app1.py.
+
+CommentCleaner est sérialisé par le seul chemin de sa table de lemmes : un
+worker la recharge (projection mémoire de l'artefact) à la première
+utilisation.
+"""
+
+import re
+from pathlib import Path
+from typing import List, Optional, Union
+
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+
+from lemmatizer import load_serving_lemmatizer
+from ner import get_named_entity_masker
+from pii import PIIMasker
+
+# Regex patterns for common PII (données sensibles)
+EMAIL_RE = re.compile(r"\b[\w\.-]+@[\w\.-]+\.\w{2,}\b", flags=re.IGNORECASE)
+PHONE_RE = re.compile(r"(?:\+?\d{1,3}[\s.-])?(?:\(?\d{2,4}\)?[\s.-])?[\d\s.-]{6,15}")
+CREDIT_RE = re.compile(r"\b(?:\d[ -]*?){13,16}\b")
+DATE_RE = re.compile(
+    r"\b(?:\d{1,2}[/-]\d{1,2}[/-]\d{2,4}|\d{4}[/-]\d{1,2}[/-]\d{1,2}|\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\s+\d{2,4})\b",
+    flags=re.IGNORECASE,
+)
+AGE_RE = re.compile(
+    r"\b(?:age\s*[:]?\s*\d{1,3}|\d{1,3}\s?(?:years?\sold|yo|y/o|yrs|ans))\b",
+    flags=re.IGNORECASE,
+)
+ADDRESS_RE = re.compile(
+    r"\b\d{1,5}\s+(?:[\w\s]{1,60}?)\s+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Way|Court|Ct|Square|Sq)\b",
+    flags=re.IGNORECASE,
+)
+
+pii_masker = PIIMasker(
+    [
+        ("EMAIL", EMAIL_RE),
+        ("CREDIT_CARD", CREDIT_RE),
+        ("PHONE", PHONE_RE),
+        ("DATE", DATE_RE),
+        ("AGE", AGE_RE),
+        ("ADDRESS", ADDRESS_RE),
+    ]
+)
+
+
+def mask_regex_pii(text):
+    # Équivalent aux re.sub successifs (EMAIL, CREDIT_CARD, PHONE, DATE, AGE,
+    # ADDRESS) mais sans chaîne intermédiaire : voir pii.PIIMasker
+    return pii_masker.mask(text)
+
+
+ner_masker = get_named_entity_masker(
+    labels=("PERSON", "GPE", "LOCATION", "ORGANIZATION")
+)
+
+
+def mask_named_entities(text):
+    # Backend choisi par config.NER_BACKEND (voir ner.NamedEntityMasker)
+    return ner_masker.mask(text)
+
+
+def anonymize_text(text):
+    if not isinstance(text, str):
+        return "", []
+    s = mask_regex_pii(text)
+    s, entities = mask_named_entities(s)
+    return s, entities
+
+
+def anonymize_texts(texts):
+    """Anonymise un lot de textes (NER en un seul appel, voir ner.mask_batch)."""
+    masked = [mask_regex_pii(text) if isinstance(text, str) else None for text in texts]
+    valid = [text for text in masked if text is not None]
+    anonymized = iter(ner_masker.mask_batch(valid))
+    return [next(anonymized)[0] if text is not None else "" for text in masked]
+
+
+stop_words = set(stopwords.words("english"))
+
+
+class CommentCleaner:
+    """
+    Nettoyage NLTK : table de lemmes compilée à l'entraînement, WordNet
+    (cache LRU) pour les tokens inconnus (voir lemmatizer.py).
+    """
+
+    def __init__(self, lemma_table_path: Union[str, Path]):
+        self.lemma_table_path = lemma_table_path
+        self._lemmatizer = None
+
+    def load(self, lemma_table_path: Optional[Union[str, Path]] = None):
+        """(Re)charge la table de lemmes, éventuellement depuis un autre chemin."""
+        if lemma_table_path is not None:
+            self.lemma_table_path = lemma_table_path
+        self._lemmatizer = load_serving_lemmatizer(self.lemma_table_path)
+
+    @property
+    def lemmatizer(self):
+        if self._lemmatizer is None:
+            self.load()
+        return self._lemmatizer
+
+    def __getstate__(self):
+        return {"lemma_table_path": self.lemma_table_path}
+
+    def __setstate__(self, state):
+        self.lemma_table_path = state["lemma_table_path"]
+        self._lemmatizer = None
+
+    def clean_tokens(self, text: str) -> List[str]:
+        # 1. Mise en minuscule et suppression des caractères spéciaux
+        text = re.sub(r"[^a-zA-Z\s]", "", text.lower())
+
+        # 2. Tokenisation
+        tokens = word_tokenize(text)
+
+        # 3. Suppression des stop words et lemmatisation
+        return self.lemmatizer.clean_tokens(tokens, stop_words)
+
+    def __call__(self, text: str) -> str:
+        return " ".join(self.clean_tokens(text))
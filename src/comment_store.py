@@ -0,0 +1,374 @@
+"""
+Stockage des commentaires de app1.py : SQLite ou CSV
+
+app1.py n'a besoin que de quatre opérations : ajouter un commentaire, lire
+les agrégats d'un utilisateur (nombre de commentaires, toxicité moyenne),
+parcourir tous les commentaires pour les rescorer et réécrire leurs scores.
+Deux backends les implémentent :
+
+- SqliteCommentStore : base SQLite en mode WAL, index sur user_id et
+  created_at, requêtes paramétrées (préparées une fois puis gardées dans
+  le cache de statements de sqlite3) ;
+- CsvCommentStore : prod.csv + journal en ajout seul (voir comment_log.py),
+  conservé pour la compatibilité (train.py lit prod.csv).
+
+Les agrégats par utilisateur (nombre de commentaires, somme des toxicités)
+sont tenus en mémoire par UserAggregateIndex : reconstruits depuis le
+stockage à l'ouverture, mis à jour en O(1) à chaque ajout. Le score social
+d'un utilisateur ne dépend donc plus de la taille de l'historique. Avant
+chaque lecture, l'index rattrape les commentaires écrits par les autres
+processus (lignes de journal ou ids SQLite au-delà du dernier vu) et se
+reconstruit si un rescoring a eu lieu ailleurs.
+
+Les deux backends attribuent des IDs uniques et croissants même avec
+plusieurs workers gunicorn : AUTOINCREMENT pour SQLite, compteur sous
+verrou flock pour le journal. insert_many écrit un lot en une transaction
+(ou une écriture) : voir comment_writer.py pour le regroupement.
+
+open_comment_store choisit le backend d'après config.DATABASE_URL.
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from comment_log import COLUMNS, DTYPES, CommentLog
+
+# Commentaires lus par requête lors du parcours complet
+_ITER_BATCH = 1000
+
+# Commentaire à insérer : (user_id, comment_text, toxicity_score, created_at)
+CommentRow = Tuple[int, str, float, str]
+
+
+def _row_record(comment_id: int, row: CommentRow) -> Dict:
+    user_id, comment_text, toxicity_score, created_at = row
+    return {
+        "id": comment_id,
+        "user_id": user_id,
+        "comment_text": comment_text,
+        "toxicity_score": float(toxicity_score),
+        "created_at": created_at,
+    }
+
+
+@dataclass
+class UserAggregates:
+    """Agrégats des commentaires d'un utilisateur."""
+
+    user_id: int
+    comment_count: int = 0
+    toxicity_sum: float = 0.0
+
+    @property
+    def average_toxicity(self) -> float:
+        return self.toxicity_sum / self.comment_count if self.comment_count else 0.0
+
+
+class UserAggregateIndex:
+    """Agrégats de chaque utilisateur (user_id -> [nombre, somme des toxicités])."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals: Dict[int, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._totals)
+
+    def rebuild(self, rows: Iterable[Tuple[int, int, float]]):
+        """Remplace l'index par des lignes (user_id, nombre, somme)."""
+        totals = {
+            int(user_id): [int(count), float(total)] for user_id, count, total in rows
+        }
+        with self._lock:
+            self._totals = totals
+
+    def add(self, user_id: int, toxicity_score: float):
+        """Prend en compte un nouveau commentaire."""
+        with self._lock:
+            totals = self._totals.setdefault(int(user_id), [0, 0.0])
+            totals[0] += 1
+            totals[1] += float(toxicity_score)
+
+    def get(self, user_id: int) -> UserAggregates:
+        with self._lock:
+            count, total = self._totals.get(int(user_id), (0, 0.0))
+        return UserAggregates(user_id, count, total)
+
+
+class SqliteCommentStore:
+    """Commentaires dans une base SQLite (utilisable depuis plusieurs threads)."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # Plusieurs processus écrivent dans la même base : attente du verrou
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS comments ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " user_id INTEGER NOT NULL,"
+            " comment_text TEXT NOT NULL,"
+            " toxicity_score REAL NOT NULL,"
+            " created_at TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS comments_user_id ON comments (user_id)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS comments_created_at ON comments (created_at)"
+        )
+        self._conn.commit()
+        self.aggregates = UserAggregateIndex()
+        # Dernier id intégré à l'index et génération des scores (user_version,
+        # incrémentée à chaque rescoring)
+        self._seen_id = 0
+        self._generation: Optional[int] = None
+        self.rebuild_aggregates()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def insert(
+        self, user_id: int, comment_text: str, toxicity_score: float, created_at: str
+    ) -> Dict:
+        """Ajoute un commentaire ; retourne l'enregistrement avec son id."""
+        return self.insert_many([(user_id, comment_text, toxicity_score, created_at)])[
+            0
+        ]
+
+    def insert_many(self, rows: Sequence[CommentRow]) -> List[Dict]:
+        """Ajoute des commentaires en une seule transaction."""
+        records = []
+        with self._lock:
+            with self._conn:
+                for row in rows:
+                    (comment_id,) = self._conn.execute(
+                        "INSERT INTO comments (user_id, comment_text, toxicity_score, created_at)"
+                        " VALUES (?, ?, ?, ?) RETURNING id",
+                        (row[0], row[1], float(row[2]), row[3]),
+                    ).fetchone()
+                    records.append(_row_record(comment_id, row))
+        return records
+
+    def user_aggregates(self, user_id: int) -> UserAggregates:
+        """Nombre de commentaires et somme des toxicités (depuis l'index)."""
+        self.refresh_aggregates()
+        return self.aggregates.get(user_id)
+
+    def rebuild_aggregates(self):
+        """Recalcule l'index des agrégats depuis la base."""
+        with self._lock:
+            # Les lectures sont en autocommit : le dernier id est lu d'abord
+            # et borne les agrégats, pour qu'un ajout concurrent entre les
+            # deux requêtes soit repris par refresh_aggregates. Un rescoring
+            # concurrent change la génération : reconstruction au tour suivant
+            generation = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            seen_id = self._conn.execute(
+                "SELECT COALESCE(MAX(id), 0) FROM comments"
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                "SELECT user_id, COUNT(*), SUM(toxicity_score)"
+                " FROM comments WHERE id <= ? GROUP BY user_id",
+                (seen_id,),
+            ).fetchall()
+            self.aggregates.rebuild(rows)
+            self._generation, self._seen_id = generation, seen_id
+
+    def refresh_aggregates(self):
+        """
+        Intègre à l'index les commentaires ajoutés depuis la dernière lecture
+        (par ce processus ou un autre) ; reconstruction après un rescoring.
+        """
+        with self._lock:
+            generation = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            if generation != self._generation:
+                rebuild = True
+            else:
+                rebuild = False
+                rows = self._conn.execute(
+                    "SELECT id, user_id, toxicity_score FROM comments"
+                    " WHERE id > ? ORDER BY id",
+                    (self._seen_id,),
+                ).fetchall()
+                for comment_id, user_id, toxicity_score in rows:
+                    self.aggregates.add(user_id, toxicity_score)
+                    self._seen_id = comment_id
+        if rebuild:
+            self.rebuild_aggregates()
+
+    def iter_comments(self) -> Iterator[Dict]:
+        """Tous les commentaires par id croissant, lus par pages."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(COLUMNS)} FROM comments"
+                    " WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, _ITER_BATCH),
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(COLUMNS, row))
+            last_id = rows[-1][0]
+
+    def update_toxicity_scores(self, scores: Iterable[Tuple[int, float]]):
+        """Réécrit les scores de toxicité (paires id, score) en une transaction."""
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE comments SET toxicity_score = ? WHERE id = ?",
+                    [(float(score), comment_id) for comment_id, score in scores],
+                )
+                # Les autres processus reconstruiront leur index
+                generation = self._conn.execute("PRAGMA user_version").fetchone()[0]
+                self._conn.execute(f"PRAGMA user_version = {int(generation) + 1}")
+        self.rebuild_aggregates()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM comments").fetchone()[0]
+
+    def compact(self) -> int:
+        """Reporte le WAL dans la base (aucun commentaire déplacé)."""
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return 0
+
+    def load_dataframe(self) -> pd.DataFrame:
+        """Tous les commentaires, avec le schéma de prod.csv."""
+        with self._lock:
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(COLUMNS)} FROM comments ORDER BY id", self._conn
+            )
+        return df.astype(DTYPES)
+
+
+class CsvCommentStore:
+    """
+    Commentaires dans prod.csv + journal en ajout seul (voir CommentLog). Le
+    journal est compacté dans prod.csv au-delà de `compact_every` entrées.
+    """
+
+    def __init__(self, log: CommentLog, compact_every: Optional[int] = None):
+        self.log = log
+        self.compact_every = compact_every
+        self.aggregates = UserAggregateIndex()
+        self._lock = threading.Lock()
+        self._cursor = None
+        self.rebuild_aggregates()
+
+    def close(self):
+        self.log.close()
+
+    def insert(
+        self, user_id: int, comment_text: str, toxicity_score: float, created_at: str
+    ) -> Dict:
+        return self.insert_many([(user_id, comment_text, toxicity_score, created_at)])[
+            0
+        ]
+
+    def insert_many(self, rows: Sequence[CommentRow]) -> List[Dict]:
+        """Ajoute des commentaires au journal en une seule écriture."""
+        records = self.log.append_many([_row_record(None, row) for row in rows])
+        if (
+            self.compact_every is not None
+            and self.log.log_records >= self.compact_every
+        ):
+            self.compact()
+        return records
+
+    def user_aggregates(self, user_id: int) -> UserAggregates:
+        """Nombre de commentaires et somme des toxicités (depuis l'index)."""
+        self.refresh_aggregates()
+        return self.aggregates.get(user_id)
+
+    def rebuild_aggregates(self):
+        """Recalcule l'index des agrégats depuis prod.csv et le journal."""
+        with self._lock:
+            self._cursor = None
+        self.refresh_aggregates()
+
+    def refresh_aggregates(self):
+        """
+        Intègre à l'index les lignes ajoutées au journal depuis la dernière
+        lecture (par ce processus ou un autre) ; reconstruction si prod.csv a
+        changé (compaction, rescoring).
+        """
+        with self._lock:
+            snapshot, records, self._cursor = self.log.changes_since(self._cursor)
+            if snapshot is not None:
+                grouped = snapshot.groupby("user_id")["toxicity_score"]
+                counts, sums = grouped.size(), grouped.sum()
+                self.aggregates.rebuild(zip(counts.index, counts, sums))
+            for record in records:
+                self.aggregates.add(record["user_id"], record["toxicity_score"])
+
+    def iter_comments(self) -> Iterator[Dict]:
+        """Tous les commentaires, lus par tranches (prod.csv puis journal)."""
+        return self.log.iter_records(_ITER_BATCH)
+
+    def update_toxicity_scores(self, scores: Iterable[Tuple[int, float]]):
+        """Réécrit prod.csv avec les nouveaux scores et vide le journal."""
+        self.log.update_toxicity_scores(dict(scores))
+        self.rebuild_aggregates()
+
+    def count(self) -> int:
+        """Nombre de commentaires, compté par tranches (sans tout charger)."""
+        return sum(1 for _ in self.log.iter_records(_ITER_BATCH))
+
+    def load_dataframe(self) -> pd.DataFrame:
+        return self.log.load_dataframe()
+
+    def compact(self) -> int:
+        """Intègre le journal à prod.csv ; retourne le nombre de commentaires déplacés."""
+        return self.log.compact()
+
+
+def sqlite_path(database_url: str) -> Optional[str]:
+    """Chemin de la base d'une URL sqlite:///..., ou None pour un autre schéma."""
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        return None
+    return database_url[len(prefix) :]
+
+
+def open_comment_store(
+    database_url: Optional[str],
+    csv_path: Union[str, Path],
+    log_path: Union[str, Path],
+    fsync_every: int = 64,
+    fsync_interval: float = 1.0,
+    compact_every: Optional[int] = None,
+):
+    """
+    Backend de stockage d'après DATABASE_URL : SQLite pour sqlite:///chemin
+    (ou sqlite:///:memory:), prod.csv + journal si l'URL est vide.
+    """
+    if not database_url:
+        log = CommentLog(
+            csv_path, log_path, fsync_every=fsync_every, fsync_interval=fsync_interval
+        )
+        return CsvCommentStore(log, compact_every=compact_every)
+    path = sqlite_path(database_url)
+    if path is None:
+        raise ValueError(
+            f"DATABASE_URL non supportée: {database_url} (attendu: sqlite:///chemin)"
+        )
+    return SqliteCommentStore(path)
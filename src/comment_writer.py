@@ -0,0 +1,112 @@
+"""
+Écrivain unique des commentaires, avec validation groupée (group commit)
+
+Les handlers /submit_comment s'exécutent dans le pool de threads de
+FastAPI : chacun écrivait lui-même dans le stockage, et chaque écriture
+payait son verrou, sa transaction ou son fsync. CommentWriter confie toutes
+les écritures d'un processus à un seul thread : les commentaires arrivés
+pendant une écriture sont regroupés et écrits ensemble au tour suivant
+(insert_many : une transaction SQLite ou une écriture dans le journal,
+sous un seul verrou).
+
+Entre processus (workers gunicorn), l'unicité et l'ordre des IDs sont
+garantis par le stockage (voir comment_store.py).
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from comment_store import CommentRow
+
+_STOP = object()
+
+
+class CommentWriter:
+    """
+    Thread d'écriture unique devant un stockage de commentaires.
+
+    `submit` bloque jusqu'à ce que le commentaire soit écrit et retourne
+    l'enregistrement (avec son id). Au plus `max_batch_size` commentaires
+    sont écrits par lot.
+    """
+
+    def __init__(self, store, max_batch_size: int = 256):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        self.store = store
+        self.max_batch_size = max_batch_size
+        self._queue: "queue.Queue" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self.batches = 0
+        self.written = 0
+
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="comment-writer", daemon=True
+                )
+                self._thread.start()
+
+    def submit(
+        self, user_id: int, comment_text: str, toxicity_score: float, created_at: str
+    ) -> Dict:
+        """Écrit un commentaire (regroupé avec les écritures concurrentes)."""
+        future: Future = Future()
+        self._ensure_started()
+        self._queue.put(((user_id, comment_text, toxicity_score, created_at), future))
+        return future.result()
+
+    def _next_batch(self) -> Tuple[List[Tuple[CommentRow, Future]], bool]:
+        """Attend un commentaire puis prend ceux déjà en attente."""
+        batch = []
+        item = self._queue.get()
+        while item is not _STOP:
+            batch.append(item)
+            if len(batch) >= self.max_batch_size:
+                return batch, False
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return batch, False
+        return batch, True
+
+    def _run(self):
+        while True:
+            batch, stop = self._next_batch()
+            if batch:
+                self._write(batch)
+            if stop:
+                return
+
+    def _write(self, batch: List[Tuple[CommentRow, Future]]):
+        try:
+            records = self.store.insert_many([row for row, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.batches += 1
+        self.written += len(records)
+        for (_, future), record in zip(batch, records):
+            future.set_result(record)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "written": self.written,
+            "pending": self._queue.qsize(),
+            "average_batch_size": self.written / self.batches if self.batches else 0.0,
+        }
+
+    def close(self, timeout: Optional[float] = None):
+        """Écrit les commentaires en attente puis arrête le thread."""
+        with self._start_lock:
+            thread = self._thread
+            self._thread = None
+        if thread is not None and thread.is_alive():
+            self._queue.put(_STOP)
+            thread.join(timeout)
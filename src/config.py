@@ -4,7 +4,7 @@ import os
 import re
 from enum import Enum
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 
 class Environment(str, Enum):
@@ -23,12 +23,12 @@ class Config:
     VERSION = "1.0.0"
     DESCRIPTION = "API de détection de toxicité et score social conforme RGPD"
 
-        # Chemins du projet - Détection automatique du contexte
+    # Chemins du projet - Détection automatique du contexte
     @classmethod
     def _get_base_dir(cls) -> Path:
         """Détermine le répertoire de base selon le contexte d'exécution."""
         current_file = Path(__file__).resolve()
-        
+
         # Si on est dans src/, le projet est au parent
         if current_file.parent.name == "src":
             base_dir = current_file.parent.parent
@@ -39,11 +39,11 @@ class Config:
                 if (base_dir / "src").exists():
                     break
                 base_dir = base_dir.parent
-        
+
         return base_dir
 
     BASE_DIR = None  # Sera initialisé plus tard
-    
+
     @classmethod
     def _init_paths(cls):
         """Initialise les chemins après la définition de la classe"""
@@ -51,11 +51,12 @@ class Config:
             cls.BASE_DIR = cls._get_base_dir()
             cls.SRC_DIR = cls.BASE_DIR / "src"
             cls.DATA_DIR = cls.BASE_DIR / "data"
-            cls.MODELS_DIR = cls.SRC_DIR / "models"  # Utiliser src/models pour cohérence
+            cls.MODELS_DIR = (
+                cls.SRC_DIR / "models"
+            )  # Utiliser src/models pour cohérence
             cls.LOGS_DIR = cls.BASE_DIR / "logs"
             cls.TESTS_DIR = cls.BASE_DIR / "tests"
 
-
     # Environnement
     ENV = os.getenv("ENVIRONMENT", Environment.DEVELOPMENT.value)
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
@@ -77,12 +78,29 @@ class Config:
     ENABLE_LEMMATIZATION = True
     ENABLE_STOPWORDS_REMOVAL = True
 
+    # Backend de détection des entités nommées (voir ner.py) :
+    # "nltk" (pos_tag + ne_chunk) ou "gazetteer" (sans modèle, plus rapide)
+    NER_BACKEND = os.getenv("NER_BACKEND", "nltk")
+    # Gazetteer additionnel optionnel (une entrée « nom<TAB>LABEL » par ligne)
+    NER_GAZETTEER_PATH = os.getenv("NER_GAZETTEER_PATH", None)
+
+    # Cache LRU token -> lemme (voir lemmatizer.py), préchauffé au démarrage
+    # avec le vocabulaire du vectoriseur quand aucune table de lemmes n'existe
+    LEMMATIZER_CACHE_SIZE = int(os.getenv("LEMMATIZER_CACHE_SIZE", "100000"))
+    LEMMATIZER_WARMUP = os.getenv("LEMMATIZER_WARMUP", "True").lower() == "true"
+
+    # Format des artefacts servis : "mmap" (artefact binaire partagé entre les
+    # workers, voir artifacts.py) ou "joblib"
+    MODEL_ARTIFACT_FORMAT = os.getenv("MODEL_ARTIFACT_FORMAT", "mmap")
+    # Vérification des fichiers du modèle avant scoring, au plus toutes les N
+    # secondes : rechargement après un réentraînement (voir model_watch.py,
+    # 0 = désactivé)
+    MODEL_RELOAD_CHECK_SECONDS = float(os.getenv("MODEL_RELOAD_CHECK_SECONDS", "30"))
+
     # GCS Configuration
     PROJECT_ID = os.getenv("GCP_PROJECT_ID", "digital-social-score")
     GCS_PROJECT_ID = PROJECT_ID  # Alias pour compatibilité
-    GCS_BUCKET_NAME = os.getenv(
-        "GCS_BUCKET_NAME", f"{PROJECT_ID}-digital-social-score"
-    )
+    GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", f"{PROJECT_ID}-digital-social-score")
     GCS_PIPELINE_BUCKET = os.getenv("GCS_PIPELINE_BUCKET", f"gs://{GCS_BUCKET_NAME}")
 
     # Vertex AI Configuration
@@ -105,12 +123,54 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 
     # Feature Flags
-    USE_CACHE = True
-    CACHE_TTL = 3600  # 1 heure
+    # Cache des résultats de scoring par texte brut (voir result_cache.py)
+    USE_CACHE = os.getenv("USE_CACHE", "True").lower() == "true"
+    CACHE_TTL = int(os.getenv("CACHE_TTL", "3600"))  # 1 heure
+    RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", "64"))
 
     # Performance
     MAX_TEXT_LENGTH = 10000
     REQUEST_TIMEOUT = 30
+    MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", "1000"))
+    # Taille des lots d'anonymisation en masse (entraînement)
+    ANONYMIZATION_BATCH_SIZE = int(os.getenv("ANONYMIZATION_BATCH_SIZE", "1000"))
+    # Prétraitement multiprocessus de l'entraînement (0 = un worker par cœur)
+    PREPROCESSING_WORKERS = int(os.getenv("PREPROCESSING_WORKERS", "1"))
+    PREPROCESSING_CHUNK_SIZE = int(os.getenv("PREPROCESSING_CHUNK_SIZE", "2000"))
+    # Cache persistant des textes prétraités (voir text_cache.py)
+    ENABLE_PREPROCESSING_CACHE = (
+        os.getenv("ENABLE_PREPROCESSING_CACHE", "True").lower() == "true"
+    )
+    PREPROCESSING_CACHE_MAX_MB = int(os.getenv("PREPROCESSING_CACHE_MAX_MB", "1024"))
+
+    # Journal des commentaires de app1.py (voir comment_log.py) : fsync
+    # regroupés, compaction dans prod.csv au-delà de N commentaires journalisés
+    COMMENT_LOG_FSYNC_EVERY = int(os.getenv("COMMENT_LOG_FSYNC_EVERY", "64"))
+    COMMENT_LOG_FSYNC_INTERVAL = float(os.getenv("COMMENT_LOG_FSYNC_INTERVAL", "1"))
+    COMMENT_LOG_COMPACT_EVERY = int(os.getenv("COMMENT_LOG_COMPACT_EVERY", "10000"))
+    # Écrivain unique des commentaires : taille maximale d'un lot (voir comment_writer.py)
+    COMMENT_WRITER_MAX_BATCH = int(os.getenv("COMMENT_WRITER_MAX_BATCH", "256"))
+    # Rescoring de tous les commentaires (voir rescoring.py) : 1 = dans le
+    # processus de l'API, N > 1 = N workers "spawn", 0 = un worker par cœur
+    RESCORING_WORKERS = int(os.getenv("RESCORING_WORKERS", "1"))
+    RESCORING_CHUNK_SIZE = int(os.getenv("RESCORING_CHUNK_SIZE", "2000"))
+
+    # Micro-batching des requêtes /score concurrentes (attendues depuis la boucle
+    # d'événements : un lot n'est pas limité par SCORING_WORKERS)
+    ENABLE_MICRO_BATCHING = os.getenv("ENABLE_MICRO_BATCHING", "True").lower() == "true"
+    MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "32"))
+    MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+
+    # Exécuteur borné du scoring (voir executor.py) : "thread" ou "process"
+    # (processus préchauffés). Au-delà de workers + max_queue requêtes en
+    # cours, l'API répond 503 avec Retry-After
+    SCORING_EXECUTOR = os.getenv("SCORING_EXECUTOR", "thread")
+    SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "4"))
+    SCORING_MAX_QUEUE = int(os.getenv("SCORING_MAX_QUEUE", "64"))
+    SCORING_RETRY_AFTER_SECONDS = int(os.getenv("SCORING_RETRY_AFTER_SECONDS", "1"))
+    # Mode "process" : démarrage des processus de scoring ("fork" partage le
+    # modèle déjà chargé en copy-on-write, voir worker_pool.py)
+    SCORING_START_METHOD = os.getenv("SCORING_START_METHOD", "fork")
 
     # ============================================================================
     # PATTERNS REGEX POUR L'ANONYMISATION PII
@@ -185,15 +245,49 @@ class Config:
     }
 
     @classmethod
-    def get_model_path(cls) -> Path:
-        """Retourne le chemin du modèle"""
+    def get_artifact_dir(cls) -> Path:
+        """Retourne le répertoire de l'artefact binaire (modèle + vectoriseur)"""
+        return cls.MODELS_DIR / "scorer"
+
+    @classmethod
+    def _use_artifact_dir(cls, artifact_format: Optional[str]) -> bool:
+        artifact_format = (artifact_format or cls.MODEL_ARTIFACT_FORMAT).lower()
+        if artifact_format != "mmap":
+            return False
+        # Artefact ignoré s'il ne correspond plus aux fichiers joblib
+        from artifacts import is_artifact_dir
+
+        return is_artifact_dir(cls.get_artifact_dir())
+
+    @classmethod
+    def get_model_path(cls, artifact_format: Optional[str] = None) -> Path:
+        """Retourne le chemin du modèle (artefact binaire s'il existe, sinon joblib)"""
+        if cls._use_artifact_dir(artifact_format):
+            return cls.get_artifact_dir()
         return cls.MODELS_DIR / "model.joblib"
 
     @classmethod
-    def get_vectorizer_path(cls) -> Path:
-        """Retourne le chemin du vectoriseur"""
+    def get_vectorizer_path(cls, artifact_format: Optional[str] = None) -> Path:
+        """Retourne le chemin du vectoriseur (artefact binaire s'il existe, sinon joblib)"""
+        if cls._use_artifact_dir(artifact_format):
+            return cls.get_artifact_dir()
         return cls.MODELS_DIR / "vectorizer.joblib"
 
+    @classmethod
+    def get_lemma_table_path(cls, artifact_format: Optional[str] = None) -> Path:
+        """Retourne le chemin de la table de lemmes (artefact binaire s'il existe, sinon joblib)"""
+        if cls._use_artifact_dir(artifact_format):
+            return cls.get_artifact_dir()
+        return cls.MODELS_DIR / "lemma_table.joblib"
+
+    @classmethod
+    def get_preprocessing_cache_path(cls) -> Path:
+        """Retourne le chemin du cache des textes prétraités"""
+        path = os.getenv("PREPROCESSING_CACHE_PATH")
+        if path:
+            return Path(path)
+        return cls.DATA_DIR / "cache" / "preprocessing.sqlite"
+
     @classmethod
     def get_log_file(cls, name: str = "app.log") -> Path:
         """Retourne le chemin d'un fichier log"""
@@ -225,7 +319,9 @@ class DevelopmentConfig(Config):
 
     DEBUG = True
     LOG_LEVEL = "DEBUG"
-    USE_CACHE = False
+    # Cache des résultats désactivé par défaut en développement (USE_CACHE=true
+    # pour le réactiver, par exemple pour mesurer son effet)
+    USE_CACHE = os.getenv("USE_CACHE", "False").lower() == "true"
 
 
 class ProductionConfig(Config):
@@ -249,6 +345,7 @@ class TestingConfig(Config):
     LOG_LEVEL = "DEBUG"
     DATABASE_URL = "sqlite:///:memory:"
     USE_CACHE = False
+    ENABLE_PREPROCESSING_CACHE = False
     ENABLE_CORS = True
     CORS_ORIGINS = ["*"]
 
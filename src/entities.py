@@ -0,0 +1,232 @@
+r"""
+Remplacement des entités nommées en une seule passe (Aho-Corasick)
+
+mask_named_entities compilait une regex \b<entité>\b (IGNORECASE) par
+entité détectée et réécrivait tout le texte à chaque fois : O(entités x
+longueur) plus une compilation par entité et par requête.
+
+Ici, les entités détectées sont collectées puis recherchées ensemble par un
+automate d'Aho-Corasick, en un seul parcours du texte en minuscules. Les
+occurrences sont ensuite résolues dans l'ordre des entités, comme les
+pattern.sub successifs : une occurrence n'est retenue que si elle ne
+chevauche pas une entité déjà masquée, et les frontières de mots voisines
+d'une balise déjà insérée voient '<' ou '>' (non-mot). Le texte masqué est
+assemblé une seule fois.
+
+Les cas où une entité pourrait correspondre à l'intérieur d'une balise
+insérée (entité contenant '<' ou '>', ou sous-chaîne d'une balise) ou sur un
+texte non ASCII (règles de casse de re plus larges que str.lower) sont
+traités par les substitutions successives historiques, avec des patterns
+compilés mis en cache.
+"""
+
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, Iterable, List, Pattern, Sequence, Tuple
+
+
+def _is_word(c: str) -> bool:
+    # Identique à \w pour les motifs str
+    return c.isalnum() or c == "_"
+
+
+def collect_entities(tree, labels: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Extrait les entités d'un arbre ne_chunk.
+
+    Retourne la liste ordonnée (texte de l'entité, label) des sous-arbres
+    dont le label fait partie de `labels`.
+    """
+    labels = set(labels)
+    found = []
+    for subtree in tree:
+        if hasattr(subtree, "label"):
+            label = subtree.label()
+            if label in labels:
+                ent = " ".join([tok for tok, pos in subtree.leaves()])
+                found.append((ent, label))
+    return found
+
+
+class EntityAutomaton:
+    """
+    Automate d'Aho-Corasick sur un ensemble de chaînes (déjà en minuscules).
+
+    `find_all` retourne toutes les occurrences, y compris chevauchantes,
+    sous la forme (début, fin, indice de la chaîne).
+    """
+
+    def __init__(self, words: Sequence[str]):
+        self.words = list(words)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, word in enumerate(self.words):
+            self._add(word, index)
+        self._build_failure_links()
+        self._delta = self._build_transitions()
+
+    def _add(self, word: str, index: int):
+        state = 0
+        for c in word:
+            nxt = self._goto[state].get(c)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][c] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _build_failure_links(self):
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for c, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and c not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(c, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _build_transitions(self) -> List[Dict[str, int]]:
+        """Table de transitions complète : plus de remontée des liens d'échec
+        pendant le parcours (un caractère absent des entités ramène à la
+        racine)."""
+        delta: List[Dict[str, int]] = [{} for _ in self._goto]
+        delta[0] = dict(self._goto[0])
+        queue = list(self._goto[0].values())
+        for state in queue:
+            queue.extend(self._goto[state].values())
+            row = dict(delta[self._fail[state]])
+            row.update(self._goto[state])
+            delta[state] = row
+        return delta
+
+    def find_all(self, text: str) -> List[Tuple[int, int, int]]:
+        delta = self._delta
+        out = self._out
+        lengths = [len(word) for word in self.words]
+        matches = []
+        state = 0
+        for pos, c in enumerate(text):
+            state = delta[state].get(c, 0)
+            if out[state]:
+                end = pos + 1
+                for index in out[state]:
+                    matches.append((end - lengths[index], end, index))
+        return matches
+
+
+@lru_cache(maxsize=1024)
+def _entity_pattern(ent: str) -> Pattern:
+    return re.compile(r"\b" + re.escape(ent) + r"\b", flags=re.IGNORECASE)
+
+
+def replace_entities_sequential(text: str, entities: Sequence[Tuple[str, str]]) -> str:
+    """Substitutions successives historiques (une regex par entité)."""
+    for ent, tag in entities:
+        try:
+            text = _entity_pattern(ent).sub(tag, text)
+        except re.error:
+            pass
+    return text
+
+
+def _needs_sequential(text: str, entities: Sequence[Tuple[str, str]]) -> bool:
+    """Vrai si la résolution en une passe pourrait différer des re.sub."""
+    if not text.isascii():
+        return True
+    tags = [tag.lower() for _, tag in entities]
+    for ent, _ in entities:
+        if not ent or not ent.isascii() or "<" in ent or ">" in ent:
+            return True
+        folded = ent.lower()
+        if any(folded in tag for tag in tags):
+            return True
+    return False
+
+
+def _boundary(before: str, after: str) -> bool:
+    # \b : un seul des deux côtés est un caractère de mot ('' = bord du texte)
+    return (before != "" and _is_word(before)) != (after != "" and _is_word(after))
+
+
+def find_entity_spans(
+    text: str, entities: Sequence[Tuple[str, str]]
+) -> List[Tuple[int, int, str]]:
+    """
+    Retourne les intervalles (début, fin, balise) remplacés dans `text`.
+
+    `entities` est la liste ordonnée (texte de l'entité, balise). Suppose
+    que _needs_sequential(text, entities) est faux.
+    """
+    words = []
+    word_index: Dict[str, int] = {}
+    for ent, _ in entities:
+        folded = ent.lower()
+        if folded not in word_index:
+            word_index[folded] = len(words)
+            words.append(folded)
+
+    occurrences: List[List[Tuple[int, int]]] = [[] for _ in words]
+    for start, end, index in EntityAutomaton(words).find_all(text.lower()):
+        occurrences[index].append((start, end))
+    for found in occurrences:
+        found.sort()
+
+    length = len(text)
+    spans: List[Tuple[int, int, str]] = []
+    starts: List[int] = []
+    for ent, tag in entities:
+        accepted = []
+        last_end = 0
+        for start, end in occurrences[word_index[ent.lower()]]:
+            if start < last_end:
+                continue
+            # Entité masquée la plus proche à gauche et à droite
+            i = bisect_right(starts, start)
+            if i and spans[i - 1][1] > start:
+                continue
+            if i < len(spans) and spans[i][0] < end:
+                continue
+            if i and spans[i - 1][1] == start:
+                before = ">"
+            else:
+                before = text[start - 1] if start else ""
+            if i < len(spans) and spans[i][0] == end:
+                after = "<"
+            else:
+                after = text[end] if end < length else ""
+            if _boundary(before, text[start]) and _boundary(text[end - 1], after):
+                accepted.append((start, end, tag))
+                last_end = end
+        if accepted:
+            spans = sorted(spans + accepted)
+            starts = [span[0] for span in spans]
+    return spans
+
+
+def replace_entities(text: str, entities: Sequence[Tuple[str, str]]) -> str:
+    """
+    Remplace chaque entité (insensible à la casse, sur frontières de mots)
+    par sa balise, avec le même résultat que les re.sub successifs.
+    """
+    if not entities:
+        return text
+    if _needs_sequential(text, entities):
+        return replace_entities_sequential(text, entities)
+    spans = find_entity_spans(text, entities)
+    if not spans:
+        return text
+    parts = []
+    pos = 0
+    for start, end, tag in spans:
+        parts.append(text[pos:start])
+        parts.append(tag)
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
@@ -0,0 +1,119 @@
+"""
+Exécuteur borné pour le scoring dans les handlers asynchrones
+
+Les handlers synchrones de FastAPI partent dans le pool de threads par
+défaut d'anyio, sans limite utile : sous charge, les requêtes s'accumulent
+et le travail NLTK (lié au GIL) concurrence la boucle d'événements.
+BoundedExecutor envoie le scoring dans un pool dédié (threads ou processus
+préchauffés) et refuse immédiatement les requêtes au-delà de
+`workers + max_queue` en cours : l'API répond alors 503 avec Retry-After
+au lieu de laisser la latence exploser.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+EXECUTOR_KINDS = ("thread", "process")
+
+
+class ExecutorFull(Exception):
+    """La file d'attente de l'exécuteur est pleine."""
+
+
+class BoundedExecutor:
+    """
+    Pool de `workers` threads ou processus avec au plus `max_queue` tâches
+    en attente. `initializer` est appelé une fois par thread/processus (par
+    exemple pour préchauffer les ressources NLTK d'un processus).
+    """
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: int = 4,
+        max_queue: int = 64,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Type d'exécuteur inconnu: {kind} (attendu: {EXECUTOR_KINDS})"
+            )
+        if workers < 1:
+            raise ValueError("workers doit être >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue doit être >= 0")
+        self.kind = kind
+        self.workers = workers
+        self.max_queue = max_queue
+        pool_class = ThreadPoolExecutor if kind == "thread" else ProcessPoolExecutor
+        self._executor = pool_class(
+            max_workers=workers, initializer=initializer, initargs=initargs
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        """Nombre maximal de tâches en cours (exécutées ou en attente)."""
+        return self.workers + self.max_queue
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Tâches acceptées qui attendent un thread/processus libre."""
+        return max(0, self._in_flight - self.workers)
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self.rejected += 1
+                raise ExecutorFull(
+                    f"{self._in_flight} tâches en cours (capacité {self.capacity})"
+                )
+            self._in_flight += 1
+            self.submitted += 1
+
+    def _release(self, _future=None):
+        with self._lock:
+            self._in_flight -= 1
+            self.completed += 1
+
+    async def run(self, fn: Callable, *args) -> Any:
+        """
+        Exécute `fn(*args)` dans le pool et attend le résultat. Lève
+        ExecutorFull sans attendre si la file est pleine. La place n'est
+        libérée qu'à la fin réelle de la tâche, même si l'appelant abandonne.
+        """
+        self._acquire()
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> Dict[str, Any]:
+        """Métriques de l'exécuteur (exposées par /metrics)."""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
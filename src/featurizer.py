@@ -0,0 +1,127 @@
+"""
+Vectorisation TF-IDF directe à partir des tokens nettoyés
+
+clean_text_nltk produisait une chaîne (" ".join(tokens)) que
+vectorizer.transform redécoupait aussitôt avec son propre analyseur, en
+validant ses entrées à chaque appel. TfidfFeaturizer construit la ligne
+TF-IDF directement depuis les tokens, avec le vocabulaire et le tableau
+idf_ du vectoriseur entraîné.
+
+Le résultat est numériquement identique à vectorizer.transform : mêmes
+comptages, mêmes opérations (tf sous-linéaire, pondération idf,
+normalisation) dans le même ordre, sur les mêmes indices triés.
+"""
+
+import re
+from typing import Iterable, List, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.utils.sparsefuncs_fast import (
+    inplace_csr_row_normalize_l1,
+    inplace_csr_row_normalize_l2,
+)
+
+# Token que l'analyseur par défaut retourne tel quel (un seul mot de 2+ caractères)
+_SIMPLE_TOKEN_RE = re.compile(r"\w\w+")
+
+
+def supports(vectorizer) -> bool:
+    """Indique si la vectorisation directe reproduit ce vectoriseur."""
+    return (
+        getattr(vectorizer, "analyzer", None) == "word"
+        and vectorizer.tokenizer is None
+        and vectorizer.preprocessor is None
+        and vectorizer.strip_accents is None
+        and tuple(vectorizer.ngram_range) == (1, 1)
+        and vectorizer.norm in (None, "l1", "l2")
+        and hasattr(vectorizer, "vocabulary_")
+    )
+
+
+class TfidfFeaturizer:
+    """
+    Transforme des listes de tokens nettoyés en matrice TF-IDF creuse.
+
+    `transform([tokens, ...])` == `vectorizer.transform([" ".join(tokens), ...])`.
+    Si le vectoriseur utilise des options non reproduites (n-grammes,
+    tokenizer personnalisé...), la transformation lui est déléguée.
+    """
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+        self.fused = supports(vectorizer)
+        # Comme TfidfTransformer.transform : pondération seulement si idf_ existe
+        # (lu aussi en mode délégué, pour l'empreinte du modèle)
+        self.idf = getattr(vectorizer, "idf_", None)
+        if not self.fused:
+            return
+        self.vocabulary = vectorizer.vocabulary_
+        self.n_features = len(self.vocabulary)
+        self.dtype = vectorizer.dtype
+        self._analyze = vectorizer.build_analyzer()
+        self._lowercase = vectorizer.lowercase
+
+    def _token_indices(self, token: str) -> Tuple[int, ...]:
+        """Indices des features produites par l'analyseur pour un token hors vocabulaire."""
+        if _SIMPLE_TOKEN_RE.fullmatch(token) and (
+            not self._lowercase or token.islower()
+        ):
+            # L'analyseur retournerait le token lui-même, absent du vocabulaire
+            return ()
+        vocabulary = self.vocabulary
+        return tuple(
+            vocabulary[term] for term in self._analyze(token) if term in vocabulary
+        )
+
+    def transform(self, token_lists: Iterable[Sequence[str]]):
+        """Matrice TF-IDF (une ligne par liste de tokens)."""
+        token_lists = list(token_lists)
+        if not self.fused:
+            return self.vectorizer.transform(
+                [" ".join(tokens) for tokens in token_lists]
+            )
+
+        vocabulary = self.vocabulary
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        values: List[int] = []
+        for tokens in token_lists:
+            counts = {}
+            for token in tokens:
+                index = vocabulary.get(token)
+                if index is not None:
+                    counts[index] = counts.get(index, 0) + 1
+                    continue
+                for index in self._token_indices(token):
+                    counts[index] = counts.get(index, 0) + 1
+            row = sorted(counts)
+            indices.extend(row)
+            values.extend(counts[index] for index in row)
+            indptr.append(len(indices))
+
+        X = sp.csr_matrix(
+            (
+                np.asarray(values, dtype=self.dtype),
+                np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int32),
+            ),
+            shape=(len(token_lists), self.n_features),
+        )
+        return self._weight(X)
+
+    def _weight(self, X):
+        """Pondération TF-IDF, dans l'ordre de TfidfTransformer.transform."""
+        vectorizer = self.vectorizer
+        if vectorizer.binary:
+            X.data.fill(1)
+        if vectorizer.sublinear_tf:
+            np.log(X.data, X.data)
+            X.data += 1.0
+        if self.idf is not None:
+            X.data *= self.idf[X.indices]
+        if vectorizer.norm == "l2":
+            inplace_csr_row_normalize_l2(X)
+        elif vectorizer.norm == "l1":
+            inplace_csr_row_normalize_l1(X)
+        return X
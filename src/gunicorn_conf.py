@@ -1,15 +1,22 @@
-import multiprocessing
+import gc
+import os
+import sys
 
 # Le port par défaut de Cloud Run est 8080
 bind = "0.0.0.0:8080"
 
 # Définir le nombre de workers
 # Nous utilisons 2 workers pour un vCPU pour optimiser l'utilisation.
-workers = 2
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
 
 # Type de worker (recommandé pour FastAPI)
 worker_class = "uvicorn.workers.UvicornWorker"
 
+# Préchargement : le maître importe app.py (modèle, vectoriseur, ressources
+# NLTK) une seule fois avant le fork ; les workers en héritent en
+# copy-on-write au lieu de tout recharger chacun
+preload_app = os.getenv("GUNICORN_PRELOAD", "True").lower() == "true"
+
 # Timeout pour les requêtes longues (utile pour les modèles ML)
 timeout = 120
 
@@ -17,3 +24,38 @@ timeout = 120
 loglevel = "info"
 accesslog = "-"
 errorlog = "-"
+
+
+def when_ready(server):
+    """Maître prêt, avant le premier fork : charge les ressources paresseuses."""
+    if not preload_app:
+        return
+    # Le module de l'application est déjà importé par le préchargement
+    app_module = sys.modules.get("app")
+    if app_module is not None and hasattr(app_module, "warm_up"):
+        app_module.warm_up()
+
+    from memory_report import format_usage, read_memory_usage
+
+    server.log.info(format_usage("Maître", read_memory_usage(os.getpid())))
+
+
+def pre_fork(server, worker):
+    """
+    Juste avant chaque fork : les objets existants passent dans la génération
+    permanente du GC, qui ne les parcourt plus (pas d'écriture dans leurs
+    pages, donc pas de copie par les workers).
+    """
+    if preload_app:
+        gc.collect()
+        gc.freeze()
+
+
+def post_worker_init(worker):
+    """Rapport mémoire au démarrage de chaque worker."""
+    from memory_report import format_usage, read_memory_usage, report_workers
+
+    worker.log.info(format_usage("Worker", read_memory_usage(os.getpid())))
+    # Le dernier worker lancé au démarrage publie le rapport de l'ensemble
+    if worker.age == worker.cfg.workers:
+        worker.log.info("Rapport mémoire des workers:\n" + report_workers(worker.ppid))
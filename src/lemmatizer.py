@@ -0,0 +1,233 @@
+"""
+Lemmatisation mémoïsée partagée par app.py, app1.py et train.py
+
+WordNetLemmatizer.lemmatize passe par les recherches morphy de WordNet à
+chaque appel. Le vocabulaire des commentaires suit une loi de Zipf : un
+cache borné (LRU) token -> lemme évite l'essentiel de ce travail.
+
+LemmaTable est une table forme de surface -> indice de feature compilée à
+l'entraînement : les formes vues à l'entraînement dont le lemme est dans le
+vocabulaire sont résolues par une simple recherche, WordNet ne sert plus
+qu'aux tokens inconnus. Les APIs l'ouvrent dans l'artefact binaire (tableaux
+projetés en mémoire, voir artifacts.py) : le démarrage ne dépend pas de la
+taille de la table. lemma_table.joblib (dict Python) reste le format de
+repli sans artefact.
+
+Sans table de lemmes, le cache WordNet peut être préchauffé au démarrage à
+partir du vocabulaire du vectoriseur entraîné (vectorizer.vocabulary_), qui
+contient les tokens les plus fréquents du corpus (config.LEMMATIZER_WARMUP).
+"""
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Union
+
+import joblib
+from nltk.stem import WordNetLemmatizer
+
+from artifacts import is_artifact_dir, load_lemma_table
+from config import config
+
+
+class CachedLemmatizer:
+    """
+    Lemmatiseur WordNet avec cache LRU borné (`max_size` entrées).
+
+    Les statistiques (hits, misses) sont comptées depuis le dernier
+    préchauffage (`warm`), pour refléter le trafic réel.
+    """
+
+    def __init__(self, max_size: int = 100_000, lemmatizer=None):
+        if max_size < 1:
+            raise ValueError("max_size doit être >= 1")
+        self.max_size = max_size
+        self._lemmatizer = lemmatizer if lemmatizer is not None else WordNetLemmatizer()
+        self._lemmatize = lru_cache(maxsize=max_size)(self._lemmatizer.lemmatize)
+        self._baseline = self._lemmatize.cache_info()
+
+    def lemmatize(self, token: str) -> str:
+        """Retourne le lemme de `token` (même résultat que WordNetLemmatizer)."""
+        return self._lemmatize(token)
+
+    def clean_tokens(self, tokens: Iterable[str], stop_words) -> List[str]:
+        """Supprime les stop words puis lemmatise les tokens restants."""
+        lemmatize = self._lemmatize
+        return [lemmatize(w) for w in tokens if w not in stop_words]
+
+    def warm(self, tokens: Iterable[str]) -> int:
+        """Précharge le cache avec `tokens` ; retourne le nombre d'entrées."""
+        for token in tokens:
+            for word in token.split():
+                self._lemmatize(word)
+        self._baseline = self._lemmatize.cache_info()
+        return self._baseline.currsize
+
+    def warm_from_vectorizer(self, vectorizer) -> int:
+        """Précharge le cache avec le vocabulaire d'un vectoriseur entraîné."""
+        vocabulary = getattr(vectorizer, "vocabulary_", None)
+        if not vocabulary:
+            return 0
+        terms = list(vocabulary)
+        # Les termes les plus fréquents (idf le plus bas) d'abord, au cas
+        # où le cache serait plus petit que le vocabulaire
+        idf = getattr(vectorizer, "idf_", None)
+        if idf is not None:
+            terms.sort(key=lambda term: idf[vocabulary[term]])
+        return self.warm(terms[: self.max_size])
+
+    def clear(self):
+        """Vide le cache et remet les statistiques à zéro."""
+        self._lemmatize.cache_clear()
+        self._baseline = self._lemmatize.cache_info()
+
+    def stats(self) -> Dict[str, float]:
+        """Statistiques du cache depuis le dernier préchauffage."""
+        info = self._lemmatize.cache_info()
+        hits = info.hits - self._baseline.hits
+        misses = info.misses - self._baseline.misses
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / total if total else 0.0,
+            "size": info.currsize,
+            "max_size": self.max_size,
+        }
+
+
+def warm_lemmatizer(lemmatizer, vectorizer) -> Optional[int]:
+    """
+    Préchauffe le cache WordNet si config.LEMMATIZER_WARMUP est activé.
+    Sans effet pour une LemmaTable, qui résout déjà les formes du vocabulaire.
+    """
+    if not config.LEMMATIZER_WARMUP or vectorizer is None:
+        return None
+    if not isinstance(lemmatizer, CachedLemmatizer):
+        return None
+    return lemmatizer.warm_from_vectorizer(vectorizer)
+
+
+# Lemmatiseur partagé par les APIs et l'entraînement
+cached_lemmatizer = CachedLemmatizer(max_size=config.LEMMATIZER_CACHE_SIZE)
+
+
+class LemmaTable:
+    """
+    Table précalculée forme de surface -> indice de feature du vectoriseur.
+
+    Le lemme d'une forme connue est `terms[indice]` ; les formes absentes
+    de la table sont lemmatisées par `fallback` (WordNet avec cache LRU).
+    Même interface que CachedLemmatizer (lemmatize, clean_tokens, stats).
+
+    `forms` et `terms` sont des dicts/listes (entraînement, joblib) ou des
+    vues projetées de l'artefact binaire (voir artifacts.load_lemma_table) :
+    les lemmes sont résolus à la demande et mémorisés (cache LRU).
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, forms: Mapping[str, int], terms: Sequence[str], fallback=None):
+        self.forms = forms
+        self.terms = terms
+        self.fallback = fallback if fallback is not None else cached_lemmatizer
+        self._lemma = lru_cache(maxsize=config.LEMMATIZER_CACHE_SIZE)(self._lookup)
+
+    def _lookup(self, token: str) -> Optional[str]:
+        index = self.forms.get(token)
+        return None if index is None else self.terms[index]
+
+    def __len__(self) -> int:
+        return len(self.forms)
+
+    @classmethod
+    def build(
+        cls,
+        surface_forms: Iterable[str],
+        vectorizer,
+        lemmatizer,
+        stop_words=(),
+        fallback=None,
+    ) -> "LemmaTable":
+        """
+        Compile la table à partir des formes vues à l'entraînement : seules
+        les formes dont le lemme appartient au vocabulaire sont conservées.
+        """
+        vocabulary = vectorizer.vocabulary_
+        terms = [""] * len(vocabulary)
+        for term, index in vocabulary.items():
+            terms[index] = term
+        forms = {}
+        for form in sorted(set(surface_forms)):
+            if form in stop_words:
+                continue
+            index = vocabulary.get(lemmatizer.lemmatize(form))
+            if index is not None:
+                forms[form] = int(index)
+        return cls(forms, terms, fallback=fallback)
+
+    def lemmatize(self, token: str) -> str:
+        """Lemme de `token` : table d'abord, WordNet pour les formes inconnues."""
+        lemma = self._lemma(token)
+        if lemma is None:
+            return self.fallback.lemmatize(token)
+        return lemma
+
+    def feature_index(self, token: str) -> Optional[int]:
+        """Indice de feature de la forme `token`, ou None si elle est inconnue."""
+        return self.forms.get(token)
+
+    def clean_tokens(self, tokens: Iterable[str], stop_words) -> List[str]:
+        """Supprime les stop words puis lemmatise les tokens restants."""
+        lemma = self._lemma
+        fallback = self.fallback.lemmatize
+        return [lemma(w) or fallback(w) for w in tokens if w not in stop_words]
+
+    def stats(self) -> Dict[str, float]:
+        """Statistiques du lemmatiseur de secours, plus la taille de la table."""
+        stats = dict(self.fallback.stats())
+        stats["table_size"] = len(self.forms)
+        return stats
+
+    def save(self, path: Union[str, Path]):
+        """Sauvegarde la table (dict simple, indépendant du chemin du module)."""
+        joblib.dump(
+            {
+                "version": self.FORMAT_VERSION,
+                "forms": dict(self.forms),
+                "terms": list(self.terms),
+            },
+            path,
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path], fallback=None) -> "LemmaTable":
+        """
+        Ouvre la table de l'artefact binaire si `path` en est un (voir
+        artifacts.save_artifact), sinon charge une table sauvegardée par `save`.
+        """
+        if is_artifact_dir(path):
+            forms, terms = load_lemma_table(path)
+            return cls(forms, terms, fallback=fallback)
+        data = joblib.load(path)
+        if data.get("version") != cls.FORMAT_VERSION:
+            raise ValueError(
+                f"Version de table de lemmes non supportée: {data.get('version')}"
+            )
+        return cls(data["forms"], data["terms"], fallback=fallback)
+
+
+def load_serving_lemmatizer(path: Union[str, Path]):
+    """
+    Lemmatiseur des APIs : la table de lemmes si elle existe (artefact
+    binaire ou joblib), sinon le lemmatiseur partagé (cache LRU rempli par
+    le trafic).
+    """
+    try:
+        table = LemmaTable.load(path)
+        print(f"Table de lemmes chargée: {len(table)} formes.")
+        return table
+    except FileNotFoundError:
+        pass
+    except ValueError as e:
+        print(f"Table de lemmes ignorée ({path}): {e}")
+    return cached_lemmatizer
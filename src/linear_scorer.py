@@ -0,0 +1,75 @@
+"""
+Scoreur linéaire exporté de la régression logistique
+
+Pour un seul commentaire, model.predict_proba passe l'essentiel de son
+temps dans la validation des entrées de sklearn, pas dans le produit
+scalaire avec les ~5000 coefficients. LinearScorer reprend coef_ et
+intercept_ du modèle, ainsi que le vocabulaire et idf_ du vectoriseur
+(via TfidfFeaturizer), et calcule directement :
+
+    P(toxique) = sigmoid(x · coef + intercept)
+
+avec le même produit creux et la même sigmoïde (expit) que sklearn pour
+un modèle binaire : les probabilités sont identiques à
+model.predict_proba(...)[:, 1].
+"""
+
+import hashlib
+from typing import List, Sequence
+
+import numpy as np
+from scipy.special import expit
+
+from featurizer import TfidfFeaturizer
+
+
+class LinearScorer:
+    """Probabilité de toxicité à partir des tokens nettoyés (modèle linéaire binaire)."""
+
+    def __init__(self, featurizer: TfidfFeaturizer, coef: np.ndarray, intercept: float):
+        self.featurizer = featurizer
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self._version = None
+
+    @classmethod
+    def from_model(cls, model, vectorizer) -> "LinearScorer":
+        """Exporte coef_/intercept_ d'une LogisticRegression binaire entraînée."""
+        coef = np.asarray(model.coef_)
+        if coef.ndim != 2 or coef.shape[0] != 1:
+            raise ValueError("Seuls les modèles linéaires binaires sont supportés")
+        if coef.shape[1] != len(vectorizer.vocabulary_):
+            raise ValueError(
+                f"Le modèle attend {coef.shape[1]} features, le vectoriseur en produit "
+                f"{len(vectorizer.vocabulary_)}"
+            )
+        return cls(TfidfFeaturizer(vectorizer), coef[0], model.intercept_[0])
+
+    @property
+    def version(self) -> str:
+        """Empreinte des paramètres (coefficients, intercept, idf) du modèle."""
+        if self._version is None:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(self.coef.tobytes())
+            digest.update(np.float64(self.intercept).tobytes())
+            if self.featurizer.idf is not None:
+                digest.update(
+                    np.ascontiguousarray(
+                        self.featurizer.idf, dtype=np.float64
+                    ).tobytes()
+                )
+            self._version = digest.hexdigest()
+        return self._version
+
+    def decision_function(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Scores linéaires x · coef + intercept, un par liste de tokens."""
+        X = self.featurizer.transform(token_lists)
+        return X @ self.coef + self.intercept
+
+    def predict_proba(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        """Probabilités de toxicité (classe 1) d'un lot de textes nettoyés."""
+        return expit(self.decision_function(token_lists))
+
+    def predict_one(self, tokens: List[str]) -> float:
+        """Probabilité de toxicité d'un seul texte nettoyé."""
+        return float(self.predict_proba([tokens])[0])
@@ -0,0 +1,104 @@
+"""
+Mémoire résidente et partagée des processus gunicorn
+
+Avec le préchargement (preload_app), le maître charge le modèle et les
+ressources NLTK une seule fois ; les workers en héritent par copy-on-write.
+Ce module lit /proc/<pid>/smaps_rollup (Linux) pour mesurer, pour chaque
+processus, la mémoire résidente (RSS), la part réellement partagée avec
+d'autres processus et la part privée.
+
+La PSS (proportional set size) répartit chaque page partagée entre les
+processus qui la partagent : la somme des RSS moins la somme des PSS est la
+mémoire économisée grâce au partage.
+"""
+
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+
+@dataclass
+class MemoryUsage:
+    """Mémoire d'un processus, en octets."""
+
+    pid: int
+    rss: int
+    pss: int
+    shared: int
+    private: int
+
+
+def parse_smaps_rollup(text: str) -> Dict[str, int]:
+    """Champs « Nom: valeur kB » de smaps_rollup, convertis en octets."""
+    fields: Dict[str, int] = {}
+    for line in text.splitlines():
+        name, sep, value = line.partition(":")
+        parts = value.split()
+        if not sep or len(parts) != 2 or parts[1] != "kB":
+            continue
+        fields[name.strip()] = int(parts[0]) * 1024
+    return fields
+
+
+def read_memory_usage(pid: int) -> Optional[MemoryUsage]:
+    """Mémoire du processus `pid`, ou None si /proc n'est pas disponible."""
+    try:
+        text = Path(f"/proc/{pid}/smaps_rollup").read_text()
+    except OSError:
+        return None
+    fields = parse_smaps_rollup(text)
+    return MemoryUsage(
+        pid=pid,
+        rss=fields.get("Rss", 0),
+        pss=fields.get("Pss", 0),
+        shared=fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0),
+        private=fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    )
+
+
+def child_pids(pid: int) -> List[int]:
+    """Processus enfants directs de `pid` (workers d'un maître gunicorn)."""
+    children: List[int] = []
+    for task in Path(f"/proc/{pid}/task").glob("*/children"):
+        try:
+            children.extend(int(child) for child in task.read_text().split())
+        except OSError:
+            continue
+    return sorted(set(children))
+
+
+def _mb(value: int) -> str:
+    return f"{value / (1024 * 1024):.1f} Mo"
+
+
+def format_usage(label: str, usage: Optional[MemoryUsage]) -> str:
+    """Ligne de rapport pour un processus."""
+    if usage is None:
+        return f"{label}: mémoire indisponible (/proc absent)"
+    return (
+        f"{label} (pid {usage.pid}): RSS {_mb(usage.rss)}, "
+        f"partagée {_mb(usage.shared)}, privée {_mb(usage.private)}, "
+        f"PSS {_mb(usage.pss)}"
+    )
+
+
+def format_report(usages: Iterable[MemoryUsage]) -> str:
+    """Rapport multi-processus avec le total économisé par le partage."""
+    usages = list(usages)
+    lines = [format_usage("worker", usage) for usage in usages]
+    total_rss = sum(usage.rss for usage in usages)
+    total_pss = sum(usage.pss for usage in usages)
+    lines.append(
+        f"Total: RSS {_mb(total_rss)}, PSS {_mb(total_pss)}, "
+        f"économisé par le partage {_mb(total_rss - total_pss)}"
+    )
+    return "\n".join(lines)
+
+
+def report_workers(master_pid: Optional[int] = None) -> str:
+    """Rapport mémoire des workers d'un maître gunicorn (par défaut le parent)."""
+    if master_pid is None:
+        master_pid = os.getppid()
+    usages = [read_memory_usage(pid) for pid in child_pids(master_pid)]
+    return format_report(usage for usage in usages if usage is not None)
@@ -0,0 +1,73 @@
+"""
+Rechargement du modèle après un réentraînement
+
+train.py réécrit les fichiers du modèle (joblib et artefact binaire) sans
+que les APIs en soient averties : chaque worker gardait l'ancien modèle, et
+les résultats mis en cache avec lui, jusqu'au redémarrage.
+
+ModelFileWatcher compare la taille et la date de modification des fichiers
+servis (meta.json pour un artefact binaire) au plus toutes les `interval`
+secondes. Chaque worker vérifie de lui-même avant de scorer : tous
+rechargent le nouveau modèle (et invalident leur cache de résultats) sans
+coordination.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Tuple, Union
+
+from artifacts import META_FILE
+
+PathsFn = Callable[[], Iterable[Union[str, Path]]]
+
+
+def _stamp(path: Union[str, Path]) -> Optional[Tuple[str, int, int]]:
+    """(chemin, taille, mtime_ns) du fichier servi, ou None s'il est absent."""
+    path = Path(path)
+    target = path / META_FILE if path.is_dir() else path
+    try:
+        st = os.stat(target)
+    except OSError:
+        return None
+    return (str(target), st.st_size, st.st_mtime_ns)
+
+
+class ModelFileWatcher:
+    """
+    Détecte le remplacement des fichiers du modèle. `paths_fn` retourne les
+    chemins servis (ils peuvent changer, par exemple artefact binaire ->
+    joblib) ; `interval` <= 0 désactive la vérification.
+    """
+
+    def __init__(self, paths_fn: PathsFn, interval: float = 30.0):
+        self.paths_fn = paths_fn
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stamps = self._current()
+        self._checked_at = time.monotonic()
+
+    def _current(self) -> tuple:
+        return tuple(_stamp(path) for path in self.paths_fn())
+
+    def changed(self) -> bool:
+        """Vrai (une seule fois) si les fichiers ont changé depuis le dernier appel."""
+        if self.interval <= 0:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at < self.interval:
+                return False
+            self._checked_at = now
+            stamps = self._current()
+            if stamps == self._stamps:
+                return False
+            self._stamps = stamps
+            return True
+
+    def reset(self):
+        """Prend les fichiers actuels comme référence (après un rechargement)."""
+        with self._lock:
+            self._stamps = self._current()
+            self._checked_at = time.monotonic()
@@ -0,0 +1,436 @@
+"""
+Masquage des entités nommées avec un backend interchangeable
+
+NamedEntityMasker définit l'interface commune utilisée par app.py, app1.py
+et train.py : `find_entities` retourne la liste ordonnée (entité, label) et
+`mask` remplace toutes les occurrences par <LABEL> (voir entities.py).
+`find_entities_batch` / `mask_batch` traitent une collection de textes en
+un seul appel (étiquetage et chunking par lots pour NLTK).
+
+Backends disponibles (config.NER_BACKEND) :
+
+- "nltk" : pos_tag + ne_chunk (maxent), comportement historique ;
+- "gazetteer" : dictionnaire de noms connus + heuristique sur les
+  majuscules, sans inférence de modèle (quelques microsecondes par
+  commentaire au lieu de quelques millisecondes).
+"""
+
+import abc
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from nltk import ne_chunk, ne_chunk_sents, pos_tag, pos_tag_sents
+from nltk.tokenize import word_tokenize
+
+from config import config
+from entities import collect_entities, replace_entities
+
+
+class NamedEntityMasker(abc.ABC):
+    """Interface commune des backends de détection d'entités nommées."""
+
+    name = "base"
+
+    def __init__(self, labels: Optional[Iterable[str]] = None):
+        if labels is None:
+            labels = config.NAMED_ENTITY_LABELS
+        self.labels = frozenset(labels)
+
+    @abc.abstractmethod
+    def find_entities(self, text: str) -> List[Tuple[str, str]]:
+        """Retourne la liste ordonnée (texte de l'entité, label)."""
+
+    def is_available(self) -> bool:
+        """Indique si le backend peut fonctionner (données installées)."""
+        return True
+
+    def warm_up(self, text: str = "John Smith lives in Paris."):
+        """
+        Charge les ressources du backend par un appel factice. Contrairement
+        à find_entities, les erreurs (données manquantes) sont propagées.
+        """
+        self.find_entities(text)
+
+    def find_entities_batch(self, texts: Iterable[str]) -> List[List[Tuple[str, str]]]:
+        """Version par lot de find_entities (mêmes résultats, même ordre)."""
+        return [self.find_entities(text) for text in texts]
+
+    @staticmethod
+    def _replace(
+        text: str, entities: List[Tuple[str, str]]
+    ) -> Tuple[str, List[Tuple[str, str]]]:
+        if not entities:
+            return text, entities
+        tags = [(ent, f"<{label}>") for ent, label in entities]
+        return replace_entities(text, tags), entities
+
+    def mask(self, text: str) -> Tuple[str, List[Tuple[str, str]]]:
+        """Masque les entités d'un texte et retourne (texte, entités)."""
+        return self._replace(text, self.find_entities(text))
+
+    def mask_batch(
+        self, texts: Iterable[str]
+    ) -> List[Tuple[str, List[Tuple[str, str]]]]:
+        """Masque les entités d'une collection de textes."""
+        texts = list(texts)
+        return [
+            self._replace(text, entities)
+            for text, entities in zip(texts, self.find_entities_batch(texts))
+        ]
+
+
+class NLTKEntityMasker(NamedEntityMasker):
+    """Backend historique : word_tokenize + pos_tag + ne_chunk."""
+
+    name = "nltk"
+
+    def find_entities(self, text: str) -> List[Tuple[str, str]]:
+        try:
+            tree = ne_chunk(pos_tag(word_tokenize(text)), binary=False)
+        except Exception:
+            return []
+        return collect_entities(tree, self.labels)
+
+    def find_entities_batch(self, texts: Iterable[str]) -> List[List[Tuple[str, str]]]:
+        """
+        Tokenise tous les textes puis appelle une seule fois pos_tag_sents et
+        ne_chunk_sents : le tagger et le chunker ne sont chargés qu'une fois
+        par lot au lieu d'une fois par texte.
+        """
+        texts = list(texts)
+        found: List[List[Tuple[str, str]]] = [[] for _ in texts]
+        indices = []
+        sentences = []
+        for i, text in enumerate(texts):
+            try:
+                sentences.append(word_tokenize(text))
+            except Exception:
+                continue
+            indices.append(i)
+        try:
+            trees = list(ne_chunk_sents(pos_tag_sents(sentences), binary=False))
+        except Exception:
+            # Un texte fautif ne doit pas faire échouer tout le lot
+            return [self.find_entities(text) for text in texts]
+        for i, tree in zip(indices, trees):
+            found[i] = collect_entities(tree, self.labels)
+        return found
+
+    def warm_up(self, text: str = "John Smith lives in Paris."):
+        # Appel factice à ne_chunk : charge le tagger et le chunker maxent
+        ne_chunk(pos_tag(word_tokenize(text)), binary=False)
+
+    def is_available(self) -> bool:
+        try:
+            self.warm_up("John lives in Paris.")
+        except LookupError:
+            return False
+        return True
+
+
+# ============================================================================
+# GAZETTEER
+# ============================================================================
+
+# Noms connus (en minuscules) et leur label
+DEFAULT_GAZETTEER: Dict[str, str] = {
+    **{
+        name: "GPE"
+        for name in (
+            "afghanistan",
+            "africa",
+            "america",
+            "argentina",
+            "australia",
+            "austria",
+            "belgium",
+            "brazil",
+            "britain",
+            "canada",
+            "chile",
+            "china",
+            "colombia",
+            "cuba",
+            "denmark",
+            "egypt",
+            "england",
+            "finland",
+            "france",
+            "germany",
+            "greece",
+            "india",
+            "indonesia",
+            "iran",
+            "iraq",
+            "ireland",
+            "israel",
+            "italy",
+            "japan",
+            "korea",
+            "mexico",
+            "netherlands",
+            "new zealand",
+            "nigeria",
+            "norway",
+            "pakistan",
+            "palestine",
+            "poland",
+            "portugal",
+            "romania",
+            "russia",
+            "scotland",
+            "serbia",
+            "spain",
+            "sweden",
+            "switzerland",
+            "syria",
+            "turkey",
+            "ukraine",
+            "united kingdom",
+            "united states",
+            "usa",
+            "uk",
+            "vietnam",
+            "wales",
+            "amsterdam",
+            "athens",
+            "berlin",
+            "boston",
+            "brussels",
+            "chicago",
+            "dublin",
+            "london",
+            "los angeles",
+            "madrid",
+            "moscow",
+            "new york",
+            "paris",
+            "rome",
+            "san francisco",
+            "sydney",
+            "tokyo",
+            "toronto",
+            "vienna",
+            "washington",
+            "california",
+            "florida",
+            "texas",
+        )
+    },
+    **{
+        name: "LOCATION"
+        for name in (
+            "asia",
+            "europe",
+            "middle east",
+            "pacific",
+            "atlantic",
+            "mediterranean",
+            "antarctica",
+            "balkans",
+            "caribbean",
+        )
+    },
+    **{
+        name: "ORGANIZATION"
+        for name in (
+            "bbc",
+            "cia",
+            "cnn",
+            "eu",
+            "fbi",
+            "google",
+            "microsoft",
+            "nato",
+            "nasa",
+            "united nations",
+            "wikimedia",
+            "wikipedia",
+            "facebook",
+            "twitter",
+            "youtube",
+            "congress",
+            "senate",
+        )
+    },
+}
+
+# Titres qui précèdent un nom de personne
+PERSON_TITLES = frozenset(
+    ["mr", "mrs", "ms", "miss", "dr", "prof", "sir", "lord", "lady", "president"]
+)
+
+# Mots finaux qui désignent une organisation
+ORGANIZATION_SUFFIXES = frozenset(
+    [
+        "inc",
+        "corp",
+        "corporation",
+        "ltd",
+        "llc",
+        "company",
+        "university",
+        "college",
+        "institute",
+        "foundation",
+        "association",
+        "party",
+        "bank",
+        "agency",
+        "council",
+        "society",
+        "committee",
+        "church",
+    ]
+)
+
+# Mots courants écrits avec une majuscule qui ne sont pas des entités
+CAPITALIZED_STOPWORDS = frozenset(
+    """
+    i a an the this that these those it its he she we you they me him her us
+    them my your his our their if in on at to of for from by with and but or
+    so as not no yes also then there here what why how when where who which
+    please thanks thank hi hello hey dear ok okay well oh just all any some
+    is are was were be been do does did have has had will would can could
+    should may might must let talk user page article edit note see re
+    january february march april may june july august september october
+    november december monday tuesday wednesday thursday friday saturday
+    sunday god
+    """.split()
+)
+
+_CAPITALIZED_RUN_RE = re.compile(
+    r"(?<![\w'])[A-Z][A-Za-z'\-]*(?:[ \t]+[A-Z][A-Za-z'\-]*)*(?![\w'])"
+)
+_PREVIOUS_WORD_RE = re.compile(r"([A-Za-z]+)\.?[ \t]+$")
+
+# Ponctuation après laquelle un mot en majuscule commence une phrase
+SENTENCE_END_CHARS = frozenset('.!?:;"()\n')
+
+
+def _is_sentence_start(text: str, start: int) -> bool:
+    """Vrai si le mot en position `start` commence une phrase ou une ligne."""
+    i = start
+    while i > 0 and text[i - 1].isspace():
+        if text[i - 1] == "\n":
+            return True
+        i -= 1
+    return i == 0 or text[i - 1] in SENTENCE_END_CHARS
+
+
+def load_gazetteer(path) -> Dict[str, str]:
+    """
+    Charge un gazetteer depuis un fichier texte.
+
+    Une entrée par ligne : « nom<TAB>LABEL » ; les lignes vides et celles
+    qui commencent par '#' sont ignorées.
+    """
+    gazetteer = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, label = line.partition("\t")
+            if label:
+                gazetteer[name.strip().lower()] = label.strip()
+    return gazetteer
+
+
+class GazetteerEntityMasker(NamedEntityMasker):
+    """
+    Backend sans modèle : dictionnaire + heuristique sur les majuscules.
+
+    Chaque suite de mots commençant par une majuscule est une entité
+    candidate. Le premier mot d'une phrase, les mots courants et les mots
+    entièrement en majuscules (texte crié) sont ignorés, sauf s'ils sont
+    dans le gazetteer. Le label vient du gazetteer, d'un titre (Mr, Dr...),
+    d'un suffixe d'organisation (Inc, University...), et vaut PERSON sinon.
+    """
+
+    name = "gazetteer"
+
+    def __init__(
+        self,
+        labels: Optional[Iterable[str]] = None,
+        gazetteer: Optional[Dict[str, str]] = None,
+        default_label: str = "PERSON",
+    ):
+        super().__init__(labels)
+        self.gazetteer = dict(DEFAULT_GAZETTEER if gazetteer is None else gazetteer)
+        self.default_label = default_label
+
+    def _label(self, words: Sequence[str], after_title: bool) -> Optional[str]:
+        phrase = " ".join(words).lower()
+        if phrase in self.gazetteer:
+            return self.gazetteer[phrase]
+        if words[-1].lower() in ORGANIZATION_SUFFIXES:
+            return "ORGANIZATION"
+        if after_title:
+            return "PERSON"
+        return self.default_label
+
+    def _is_candidate(self, word: str) -> bool:
+        lowered = word.lower()
+        if lowered in self.gazetteer:
+            return True
+        if lowered in CAPITALIZED_STOPWORDS or lowered in PERSON_TITLES:
+            return False
+        # Les mots entièrement en majuscules sont le plus souvent du texte crié
+        return not (len(word) > 1 and word.isupper())
+
+    def find_entities(self, text: str) -> List[Tuple[str, str]]:
+        found = []
+        for m in _CAPITALIZED_RUN_RE.finditer(text):
+            words = m.group(0).split()
+            previous = _PREVIOUS_WORD_RE.search(text, max(0, m.start() - 16), m.start())
+            after_title = (
+                previous is not None and previous.group(1).lower() in PERSON_TITLES
+            )
+            # Un mot isolé en début de phrase n'est retenu que s'il est connu
+            if (
+                len(words) == 1
+                and not after_title
+                and words[0].lower() not in self.gazetteer
+                and _is_sentence_start(text, m.start())
+            ):
+                continue
+            # Découpe sur les mots non candidats (titres, mots courants)
+            run: List[str] = []
+            for word in words + [""]:
+                if word and self._is_candidate(word):
+                    run.append(word)
+                    continue
+                if run:
+                    label = self._label(run, after_title)
+                    if label in self.labels:
+                        found.append((" ".join(run), label))
+                    run = []
+                after_title = word.lower() in PERSON_TITLES
+        return found
+
+
+# ============================================================================
+# SÉLECTION DU BACKEND
+# ============================================================================
+
+NER_BACKENDS = {
+    NLTKEntityMasker.name: NLTKEntityMasker,
+    GazetteerEntityMasker.name: GazetteerEntityMasker,
+}
+
+
+def get_named_entity_masker(
+    backend: Optional[str] = None, labels: Optional[Iterable[str]] = None
+) -> NamedEntityMasker:
+    """Construit le backend demandé (par défaut config.NER_BACKEND)."""
+    backend = (backend or config.NER_BACKEND).lower()
+    if backend not in NER_BACKENDS:
+        raise ValueError(
+            f"Backend NER inconnu: {backend} (disponibles: {', '.join(NER_BACKENDS)})"
+        )
+    if backend == GazetteerEntityMasker.name and config.NER_GAZETTEER_PATH:
+        gazetteer = dict(DEFAULT_GAZETTEER)
+        gazetteer.update(load_gazetteer(config.NER_GAZETTEER_PATH))
+        return GazetteerEntityMasker(labels, gazetteer=gazetteer)
+    return NER_BACKENDS[backend](labels)
@@ -0,0 +1,469 @@
+r"""
+Masquage des données personnelles (PII) sans passes successives
+
+Remplace les six re.sub successifs de mask_regex_pii (EMAIL, CREDIT_CARD,
+PHONE, DATE, AGE, ADDRESS) par un moteur compilé une fois :
+
+- un pré-filtre d'une seule classe de caractères ([\d@]) écarte en un
+  parcours les commentaires qui ne peuvent contenir aucune PII (la grande
+  majorité), sans aucune allocation ;
+- pour les autres, les conflits sont résolus par ordre de priorité sur les
+  intervalles du texte original, sans construire de chaînes
+  intermédiaires : le texte masqué est assemblé une seule fois ;
+- la vérification du nombre de chiffres des téléphones est faite en ligne ;
+- PHONE_RE et ADDRESS_RE sont évalués par des scanners dédiés en temps
+  linéaire (PhoneScanner, AddressScanner) : ADDRESS_RE fait reculer re de
+  façon quadratique sur les longues suites d'espaces.
+
+Une alternance unique (?P<EMAIL>...)|(?P<PHONE>...)|... n'est pas utilisée :
+avec le moteur à retour arrière de re, elle essaie chaque branche à chaque
+position (plus lente que les six passes) et ne reproduit pas la priorité
+globale des re.sub successifs.
+
+Le résultat est identique à l'application séquentielle des patterns,
+y compris aux frontières de mots voisines des balises déjà insérées.
+"""
+
+import re
+from typing import List, Optional, Pattern, Sequence, Tuple
+
+from config import config
+
+# Nombre minimal de chiffres pour qu'une séquence soit masquée comme téléphone
+MIN_PHONE_DIGITS = 6
+
+# Caractère présent dans toute occurrence masquée de chaque type de PII
+REQUIRED_CHARS = {
+    "EMAIL": "@",
+    "CREDIT_CARD": r"\d",
+    "PHONE": r"\d",
+    "DATE": r"\d",
+    "AGE": r"\d",
+    "ADDRESS": r"\d",
+}
+
+_WORD_RE = re.compile(r"\w")
+
+
+def default_pii_patterns(cfg=config) -> List[Tuple[str, Pattern]]:
+    """Retourne les patterns de la configuration dans l'ordre de priorité
+    historique de mask_regex_pii."""
+    return [
+        ("EMAIL", cfg.EMAIL_RE),
+        ("CREDIT_CARD", cfg.CREDIT_RE),
+        ("PHONE", cfg.PHONE_RE),
+        ("DATE", cfg.DATE_RE),
+        ("AGE", cfg.AGE_RE),
+        ("ADDRESS", cfg.ADDRESS_RE),
+    ]
+
+
+def _count_digits(s: str) -> int:
+    # str.isdecimal correspond exactement à \d pour les motifs str
+    return sum(1 for c in s if c.isdecimal())
+
+
+class ScanMatch:
+    """Résultat d'un scanner, compatible avec l'usage fait de re.Match."""
+
+    __slots__ = ("string", "_start", "_end")
+
+    def __init__(self, string: str, start: int, end: int):
+        self.string = string
+        self._start = start
+        self._end = end
+
+    def start(self) -> int:
+        return self._start
+
+    def end(self) -> int:
+        return self._end
+
+    def span(self) -> Tuple[int, int]:
+        return self._start, self._end
+
+    def group(self, index: int = 0) -> str:
+        if index != 0:
+            raise IndexError("no such group")
+        return self.string[self._start : self._end]
+
+
+def _is_word(c: str) -> bool:
+    # Identique à \w pour les motifs str
+    return c.isalnum() or c == "_"
+
+
+def _is_phone_sep(c: str) -> bool:
+    # Identique à [\s.-]
+    return c.isspace() or c == "." or c == "-"
+
+
+def _is_phone_tail(c: str) -> bool:
+    # Identique à [\d\s.-]
+    return c.isdecimal() or c.isspace() or c == "." or c == "-"
+
+
+class PhoneScanner:
+    r"""
+    Détecteur linéaire équivalent à config.PHONE_RE.
+
+    Pour chaque position de départ, les chemins du motif sont essayés dans
+    l'ordre du moteur re (préfixes optionnels gloutons, puis queue gloutonne
+    de 6 à 15 caractères) : au plus 7 x 13 chemins de longueur bornée, donc
+    un travail constant par position. Les positions de départ sont de plus
+    limitées aux 12 caractères qui précèdent une suite d'au moins 6
+    caractères [\d\s.-], trouvée par une regex sans retour arrière.
+    """
+
+    PATTERN = r"(?:\+?\d{1,3}[\s.-])?(?:\(?\d{2,4}\)?[\s.-])?[\d\s.-]{6,15}"
+    FLAGS = 0
+
+    # Longueur maximale des deux préfixes optionnels : +ddd- et (dddd)-
+    MAX_PREFIX = 12
+    MIN_TAIL = 6
+    MAX_TAIL = 15
+
+    _TAIL_RE = re.compile(r"[\d\s.-]{6}")
+
+    def __init__(self, virtual_boundary: bool = False):
+        # Sans \b dans le motif, le contexte précédent n'a pas d'effet
+        self.virtual_boundary = virtual_boundary
+
+    def after_tag(self) -> "PhoneScanner":
+        return PhoneScanner(virtual_boundary=True)
+
+    @staticmethod
+    def _digit_run(text: str, pos: int, endpos: int, limit: int) -> int:
+        n = 0
+        while n < limit and pos + n < endpos and text[pos + n].isdecimal():
+            n += 1
+        return n
+
+    def _prefix1_ends(self, text: str, s: int, endpos: int) -> List[int]:
+        r"""Fins possibles de (?:\+?\d{1,3}[\s.-])? dans l'ordre du moteur."""
+        ends = []
+        starts = [s + 1, s] if s < endpos and text[s] == "+" else [s]
+        for a in starts:
+            for k in range(self._digit_run(text, a, endpos, 3), 0, -1):
+                if a + k < endpos and _is_phone_sep(text[a + k]):
+                    ends.append(a + k + 1)
+        ends.append(s)
+        return ends
+
+    def _prefix2_ends(self, text: str, p: int, endpos: int) -> List[int]:
+        r"""Fins possibles de (?:\(?\d{2,4}\)?[\s.-])? dans l'ordre du moteur."""
+        ends = []
+        starts = [p + 1, p] if p < endpos and text[p] == "(" else [p]
+        for b in starts:
+            for k in range(self._digit_run(text, b, endpos, 4), 1, -1):
+                c = b + k
+                if c < endpos and text[c] == ")":
+                    if c + 1 < endpos and _is_phone_sep(text[c + 1]):
+                        ends.append(c + 2)
+                if c < endpos and _is_phone_sep(text[c]):
+                    ends.append(c + 1)
+        ends.append(p)
+        return ends
+
+    def _tail_end(self, text: str, p: int, endpos: int) -> Optional[int]:
+        n = 0
+        while n < self.MAX_TAIL and p + n < endpos and _is_phone_tail(text[p + n]):
+            n += 1
+        return p + n if n >= self.MIN_TAIL else None
+
+    def _match_at(self, text: str, s: int, endpos: int) -> Optional[int]:
+        for p1 in self._prefix1_ends(text, s, endpos):
+            for p2 in self._prefix2_ends(text, p1, endpos):
+                end = self._tail_end(text, p2, endpos)
+                if end is not None:
+                    return end
+        return None
+
+    def match(
+        self, text: str, pos: int = 0, endpos: Optional[int] = None
+    ) -> Optional[ScanMatch]:
+        endpos = len(text) if endpos is None else min(endpos, len(text))
+        end = self._match_at(text, pos, endpos)
+        return ScanMatch(text, pos, end) if end is not None else None
+
+    def search(
+        self, text: str, pos: int = 0, endpos: Optional[int] = None
+    ) -> Optional[ScanMatch]:
+        endpos = len(text) if endpos is None else min(endpos, len(text))
+        s = pos
+        tail_start = -1
+        while s < endpos:
+            if tail_start < s:
+                # Toute occurrence contient une queue d'au moins 6 caractères
+                # qui commence au plus MAX_PREFIX caractères après le départ
+                m = self._TAIL_RE.search(text, s, endpos)
+                if m is None:
+                    return None
+                tail_start = m.start()
+                s = max(s, tail_start - self.MAX_PREFIX)
+            end = self._match_at(text, s, endpos)
+            if end is not None:
+                return ScanMatch(text, s, end)
+            s += 1
+        return None
+
+
+class AddressScanner:
+    r"""
+    Détecteur linéaire équivalent à config.ADDRESS_RE.
+
+    Le motif \b\d{1,5}\s+(?:[\w\s]{1,60}?)\s+(?:Street|...)\b fait
+    reculer re de façon quadratique sur les longues suites d'espaces (plus
+    de 30 s pour « 1 » suivi de 2000 espaces). Ici, pour un départ donné,
+    seuls comptent la fin du premier bloc d'espaces, les positions
+    d'espace q des 60 caractères suivants et le suffixe qui suit le bloc
+    d'espaces contenant q : le premier \s+ glouton recule jusqu'à ce
+    qu'une position q valide entre dans la fenêtre du groupe paresseux.
+    Chaque départ coûte O(60) et les blocs d'espaces de deux départs sont
+    disjoints.
+    """
+
+    PATTERN = (
+        r"\b\d{1,5}\s+(?:[\w\s]{1,60}?)\s+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|"
+        r"Blvd|Lane|Ln|Drive|Dr|Way|Court|Ct|Square|Sq)\b"
+    )
+    FLAGS = re.IGNORECASE
+
+    MAX_MIDDLE = 60
+
+    _START_RE = re.compile(r"(?<!\w)\d{1,5}(?=\s)")
+    _START_AT_RE = re.compile(r"\d{1,5}(?=\s)")
+    _SPACES_RE = re.compile(r"\s*")
+    _WORD_OR_SPACE_RE = re.compile(r"[\w\s]*")
+    _SUFFIX_RE = re.compile(
+        r"(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Way|"
+        r"Court|Ct|Square|Sq)\b",
+        flags=re.IGNORECASE,
+    )
+
+    def __init__(self, virtual_boundary: bool = False):
+        # Si vrai, le caractère qui précède `pos` est traité comme non-mot
+        # (contexte d'une balise <...> déjà insérée)
+        self.virtual_boundary = virtual_boundary
+
+    def after_tag(self) -> "AddressScanner":
+        return AddressScanner(virtual_boundary=True)
+
+    def _suffix_end(self, text: str, q: int, endpos: int) -> Optional[int]:
+        """Fin du suffixe après le bloc d'espaces qui commence en q."""
+        p3 = self._SPACES_RE.match(text, q, endpos).end()
+        m = self._SUFFIX_RE.match(text, p3, endpos)
+        return m.end() if m is not None else None
+
+    def _match_from(self, text: str, s: int, p0: int, endpos: int) -> Optional[int]:
+        """Fin de l'occurrence qui commence en s (chiffres s..p0), ou None."""
+        first_end = self._SPACES_RE.match(text, p0, endpos).end()
+        width = first_end - p0
+        limit = min(endpos, first_end + self.MAX_MIDDLE + 1)
+        run_end = self._WORD_OR_SPACE_RE.match(text, p0, limit).end()
+
+        # Positions q (fin du groupe paresseux) valides, par ordre croissant
+        candidates = []
+        # Dans le premier bloc d'espaces, toutes partagent le même suffixe
+        first_suffix = self._suffix_end(text, first_end, endpos)
+        if first_suffix is not None:
+            candidates.extend((q, first_suffix) for q in range(p0 + 1, first_end))
+        q = first_end + 1
+        while q < run_end:
+            if text[q].isspace():
+                block_end = self._SPACES_RE.match(text, q, run_end).end()
+                suffix = self._suffix_end(text, q, endpos)
+                if suffix is not None:
+                    candidates.extend((r, suffix) for r in range(q, block_end))
+                q = block_end
+            else:
+                q += 1
+
+        # Le premier \s+ (j espaces) recule depuis `width` ; le groupe
+        # paresseux couvre [p0 + j, q) avec 1 <= q - p0 - j <= 60
+        best_j = 0
+        for q, _ in candidates:
+            j = min(width, q - p0 - 1)
+            if j >= max(1, q - p0 - self.MAX_MIDDLE) and j > best_j:
+                best_j = j
+        if best_j == 0:
+            return None
+        for q, suffix in candidates:
+            if p0 + best_j + 1 <= q <= p0 + best_j + self.MAX_MIDDLE:
+                return suffix
+        return None
+
+    def _try_start(self, text: str, m, endpos: int) -> Optional[ScanMatch]:
+        end = self._match_from(text, m.start(), m.end(), endpos)
+        return ScanMatch(text, m.start(), end) if end is not None else None
+
+    def match(
+        self, text: str, pos: int = 0, endpos: Optional[int] = None
+    ) -> Optional[ScanMatch]:
+        endpos = len(text) if endpos is None else min(endpos, len(text))
+        if pos > 0 and not self.virtual_boundary and _is_word(text[pos - 1]):
+            return None
+        m = self._START_AT_RE.match(text, pos, endpos)
+        return self._try_start(text, m, endpos) if m is not None else None
+
+    def search(
+        self, text: str, pos: int = 0, endpos: Optional[int] = None
+    ) -> Optional[ScanMatch]:
+        endpos = len(text) if endpos is None else min(endpos, len(text))
+        if self.virtual_boundary and pos < endpos:
+            found = self.match(text, pos, endpos)
+            if found is not None:
+                return found
+            pos += 1
+        m = self._START_RE.search(text, pos, endpos)
+        while m is not None:
+            found = self._try_start(text, m, endpos)
+            if found is not None:
+                return found
+            m = self._START_RE.search(text, m.start() + 1, endpos)
+        return None
+
+
+def linear_matcher_for(pattern: Pattern):
+    """Retourne le scanner linéaire équivalent à un motif connu, sinon None."""
+    for scanner_class in (PhoneScanner, AddressScanner):
+        if (
+            pattern.pattern == scanner_class.PATTERN
+            and pattern.flags & re.IGNORECASE == scanner_class.FLAGS
+        ):
+            return scanner_class()
+    return None
+
+
+class _Rule:
+    """Un pattern de PII et sa variante « après une balise »."""
+
+    __slots__ = ("label", "tag", "pattern", "after_tag", "required")
+
+    def __init__(self, label: str, pattern: Pattern, linear: bool = True):
+        self.label = label
+        self.tag = f"<{label}>"
+        self.required = REQUIRED_CHARS.get(label)
+        scanner = linear_matcher_for(pattern) if linear else None
+        if scanner is not None:
+            # Détecteur sans retour arrière (temps linéaire garanti)
+            self.pattern = scanner
+            self.after_tag = scanner.after_tag()
+            return
+        self.pattern = pattern
+        # Après une balise insérée (qui se termine par '>'), un \b initial
+        # équivaut à (?=\w). re ne permet pas de simuler ce contexte avec
+        # `pos`, d'où une variante compilée pour ce seul cas.
+        if pattern.pattern.startswith(r"\b"):
+            self.after_tag = re.compile(
+                r"(?=\w)" + pattern.pattern[2:], flags=pattern.flags
+            )
+        else:
+            self.after_tag = pattern
+
+
+class PIIMasker:
+    """
+    Moteur de masquage des PII compilé une fois.
+
+    `patterns` est une liste ordonnée (label, regex) : en cas de
+    chevauchement, le pattern le plus prioritaire (le premier) l'emporte,
+    comme avec les re.sub successifs. Avec `linear=True`, PHONE_RE et
+    ADDRESS_RE sont remplacés par leurs scanners en temps linéaire.
+    """
+
+    def __init__(
+        self,
+        patterns: Optional[Sequence[Tuple[str, Pattern]]] = None,
+        min_phone_digits: int = MIN_PHONE_DIGITS,
+        linear: bool = True,
+    ):
+        if patterns is None:
+            patterns = default_pii_patterns()
+        self.rules = [_Rule(label, pattern, linear) for label, pattern in patterns]
+        self.min_phone_digits = min_phone_digits
+        # Pré-filtre valable seulement si chaque règle a un caractère requis
+        required = {rule.required for rule in self.rules}
+        if None in required:
+            self.prefilter = None
+        else:
+            self.prefilter = re.compile("[" + "".join(sorted(required)) + "]")
+        self._required_res = {
+            rule.label: re.compile(rule.required)
+            for rule in self.rules
+            if rule.required is not None
+        }
+
+    def _accepts(self, rule: _Rule, matched: str) -> bool:
+        if rule.label == "PHONE":
+            return _count_digits(matched) >= self.min_phone_digits
+        return True
+
+    def _scan_gap(
+        self, rule: _Rule, text: str, start: int, end: int
+    ) -> List[Tuple[int, int, str]]:
+        """Cherche les occurrences d'une règle dans un intervalle non masqué."""
+        found = []
+        pos = start
+        # Un intervalle qui suit une balise voit '>' comme caractère précédent
+        if start > 0 and _WORD_RE.match(text, start - 1):
+            m = rule.after_tag.match(text, start, end)
+            if m is None:
+                pos = start + 1
+        else:
+            m = None
+        while pos < end:
+            if m is None:
+                m = rule.pattern.search(text, pos, end)
+                if m is None:
+                    break
+            if self._accepts(rule, m.group(0)):
+                found.append((m.start(), m.end(), rule.tag))
+            # Une séquence rejetée (téléphone trop court) reste consommée
+            pos = max(m.end(), m.start() + 1)
+            m = None
+        return found
+
+    def find_spans(self, text: str) -> List[Tuple[int, int, str]]:
+        """
+        Retourne les intervalles masqués (début, fin, balise), triés.
+
+        Chaque règle n'est appliquée qu'aux intervalles non encore masqués
+        par une règle plus prioritaire.
+        """
+        spans: List[Tuple[int, int, str]] = []
+        for rule in self.rules:
+            required_re = self._required_res.get(rule.label)
+            if required_re is not None and required_re.search(text) is None:
+                continue
+            found = []
+            gap_start = 0
+            for span_start, span_end, _ in spans:
+                if span_start > gap_start:
+                    found.extend(self._scan_gap(rule, text, gap_start, span_start))
+                gap_start = span_end
+            if gap_start < len(text):
+                found.extend(self._scan_gap(rule, text, gap_start, len(text)))
+            if found:
+                spans = sorted(spans + found)
+        return spans
+
+    def mask(self, text: str) -> str:
+        """Masque les PII d'un texte (équivalent aux re.sub successifs)."""
+        if self.prefilter is not None and self.prefilter.search(text) is None:
+            return text
+        spans = self.find_spans(text)
+        if not spans:
+            return text
+        parts = []
+        pos = 0
+        for start, end, tag in spans:
+            parts.append(text[pos:start])
+            parts.append(tag)
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+# Moteur partagé, construit sur les patterns de config.Config
+pii_masker = PIIMasker()
@@ -4,27 +4,48 @@ Composants: Préparation des données -> Entraînement -> Évaluation
 """
 
 import logging
+import os
 
 from kfp.v2 import dsl
 from kfp.v2.dsl import Dataset, Input, Model, Output, component
 
+# Image de l'application (voir Dockerfile) : le composant de préparation y
+# réutilise text_cache.py, copié sous /app/src
+APP_IMAGE = os.getenv(
+    "PIPELINE_APP_IMAGE", "gcr.io/digital-social-score/digital-social-score:latest"
+)
+
 
 # ============================================================================
 # COMPOSANT 1: Préparation des données
 # ============================================================================
 @component(
-    base_image="python:3.11-slim",
+    base_image=APP_IMAGE,
     packages_to_install=["pandas", "scikit-learn", "nltk"],
 )
-def prepare_data_op(raw_csv_path: str, clean_csv_path: Output[Dataset]):
+def prepare_data_op(
+    raw_csv_path: str,
+    clean_csv_path: Output[Dataset],
+    cache_path: str = "",
+    cache_max_mb: int = 1024,
+):
     """
     Préparation des données:
     - Charge le CSV brut (train.csv)
     - Supprime les valeurs manquantes
     - Nettoie le texte (stopwords, lemmatisation NLTK)
     - Sauvegarde le CSV nettoyé
+
+    Si `cache_path` est renseigné (chemin local ou gs://), les textes déjà
+    nettoyés lors d'une exécution précédente sont relus depuis un cache
+    SQLite adressé par contenu (src/text_cache.py) : seuls les commentaires
+    nouveaux ou modifiés sont traités.
     """
+    import os
     import re
+    import shutil
+    import sys
+    import tempfile
 
     import nltk
     import pandas as pd
@@ -66,9 +87,49 @@ def prepare_data_op(raw_csv_path: str, clean_csv_path: Output[Dataset]):
         tokens = [lemmatizer.lemmatize(w) for w in tokens if w not in stop_words]
         return " ".join(tokens)
 
-    # Appliquer le nettoyage
-    logging.info("Nettoyage du texte en cours...")
-    df["comment_text_clean"] = df["comment_text"].apply(clean_text)
+    if not cache_path:
+        # Appliquer le nettoyage
+        logging.info("Nettoyage du texte en cours...")
+        df["comment_text_clean"] = df["comment_text"].apply(clean_text)
+    else:
+        # Cache de train.py (sources de l'application copiées dans l'image ;
+        # le corps du composant est exécuté seul, sans les globales du module)
+        sys.path.insert(0, "/app/src")
+        from text_cache import PreprocessingCache, fingerprint, make_key
+
+        # Les buckets GCS sont montés sous /gcs/ dans Vertex AI ; SQLite
+        # travaille sur une copie locale, recopiée à la fin
+        shared_path = cache_path
+        if shared_path.startswith("gs://"):
+            shared_path = "/gcs/" + shared_path[len("gs://") :]
+        local_path = os.path.join(tempfile.mkdtemp(), "preprocessing.sqlite")
+        if os.path.exists(shared_path):
+            shutil.copyfile(shared_path, local_path)
+
+        # Empreinte du prétraitement : toute modification invalide le cache
+        namespace = fingerprint("prepare_data_op", "2", nltk.__version__)
+        texts = df["comment_text"].tolist()
+        keys = [make_key(namespace, text) for text in texts]
+
+        with PreprocessingCache(
+            local_path, max_bytes=cache_max_mb * 1024 * 1024
+        ) as cache:
+            cleaned = {key: entry[1] for key, entry in cache.get_many(keys).items()}
+            # Nettoyage des seuls textes absents du cache
+            missing = {}
+            for key, text in zip(keys, texts):
+                if key not in cleaned and key not in missing:
+                    missing[key] = clean_text(text)
+            # Ce composant n'anonymise pas : la colonne "anonymisé" reste vide,
+            # le texte brut n'est jamais écrit dans le cache
+            cache.put_many((key, "", clean) for key, clean in missing.items())
+            cleaned.update(missing)
+            logging.info(f"Cache: {cache.summary()}")
+        df["comment_text_clean"] = [cleaned[key] for key in keys]
+
+        os.makedirs(os.path.dirname(shared_path) or ".", exist_ok=True)
+        shutil.copyfile(local_path, shared_path)
+        logging.info(f"Cache sauvegardé: {cache_path}")
 
     # Sauvegarder le CSV nettoyé
     df.to_csv(clean_csv_path.path, index=False)
@@ -150,8 +211,13 @@ def evaluate_model_op(
     """
     import joblib
     import pandas as pd
-    from sklearn.metrics import (accuracy_score, confusion_matrix, f1_score,
-                                 precision_score, recall_score)
+    from sklearn.metrics import (
+        accuracy_score,
+        confusion_matrix,
+        f1_score,
+        precision_score,
+        recall_score,
+    )
 
     logging.info(f"Chargement du modèle: {model_path.path}")
     model = joblib.load(model_path.path)
@@ -197,6 +263,7 @@ def evaluate_model_op(
 def digital_score_pipeline(
     raw_csv_path: str = "gs://digital-social-score/data/train.csv",
     clean_csv_path: str = "gs://digital-social-score/data/clean.csv",
+    preprocessing_cache_path: str = "gs://digital-social-score/cache/preprocessing.sqlite",
 ):
     """
     Pipeline d'entraînement complet:
@@ -207,7 +274,9 @@ def digital_score_pipeline(
 
     # Étape 1: Préparation
     prepare_task = prepare_data_op(
-        raw_csv_path=raw_csv_path, clean_csv_path=clean_csv_path
+        raw_csv_path=raw_csv_path,
+        clean_csv_path=clean_csv_path,
+        cache_path=preprocessing_cache_path,
     )
     prepare_task.set_display_name("Préparation des données")
 
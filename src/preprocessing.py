@@ -0,0 +1,205 @@
+"""
+Prétraitement multiprocessus des textes d'entraînement
+
+L'anonymisation et le nettoyage NLTK de train_and_save_model tournaient sur
+un seul cœur via pandas.apply. preprocess_texts découpe les textes en lots
+et les répartit sur un pool de processus :
+
+- chaque worker initialise une seule fois les ressources NLTK (chargement
+  paresseux du tokenizer, du tagger, de WordNet...) ;
+- l'ordre des lignes est préservé (les lots sont réassemblés par indice) ;
+- la progression est rapportée à chaque lot terminé.
+
+Le résultat est identique au traitement en série : chaque texte passe par
+les mêmes fonctions, seul le processus qui les exécute change.
+
+preprocess_texts_cached ne traite que les textes absents du cache
+persistant (voir text_cache.py) et y enregistre les nouveaux résultats
+(avec leurs formes de surface si `clean_fn` les retourne).
+
+preprocess_chunks traite un flux de lots sans tout charger en mémoire
+(rescoring des commentaires stockés, voir rescoring.py).
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from text_cache import PreprocessingCache, make_key
+
+# (anonymisation par lot, nettoyage d'un texte)
+Steps = Tuple[Callable[[List[str]], List[str]], Callable[[str], str]]
+ProgressCallback = Callable[[int, int, int], None]
+
+# Texte traité une fois au démarrage de chaque worker
+WARMUP_TEXT = "John Smith lives in Paris and writes to john@example.com."
+
+_worker_steps: Optional[Steps] = None
+
+
+def _run_steps(steps: Steps, texts: List[str]) -> Tuple[List[str], List[str]]:
+    anonymize_fn, clean_fn = steps
+    anonymized = list(anonymize_fn(texts))
+    cleaned = [clean_fn(text) for text in anonymized]
+    return anonymized, cleaned
+
+
+def _init_worker(steps: Steps):
+    """Initialise le worker : charge les ressources NLTK une seule fois."""
+    global _worker_steps
+    _worker_steps = steps
+    _run_steps(steps, [WARMUP_TEXT])
+
+
+def _process_chunk(index: int, texts: List[str]):
+    return index, _run_steps(_worker_steps, texts)
+
+
+def print_progress(done: int, total: int, rows: int):
+    """Affiche la progression après chaque lot."""
+    print(f"  Lot {done}/{total} terminé ({rows} lignes prétraitées)")
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """0 ou None : un worker par cœur disponible pour ce processus."""
+    if not workers:
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0)) or 1
+        return os.cpu_count() or 1
+    return max(1, workers)
+
+
+def preprocess_texts(
+    texts: Sequence[str],
+    anonymize_fn: Callable[[List[str]], List[str]],
+    clean_fn: Callable[[str], str],
+    workers: Optional[int] = 1,
+    chunk_size: int = 2000,
+    progress: Optional[ProgressCallback] = print_progress,
+) -> Tuple[List[str], List[str]]:
+    """
+    Anonymise puis nettoie `texts` et retourne (anonymisés, nettoyés).
+
+    `anonymize_fn` reçoit un lot de textes, `clean_fn` un texte anonymisé.
+    Avec plusieurs workers, les deux fonctions doivent être définies au
+    niveau d'un module (sérialisables par pickle).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size doit être >= 1")
+    texts = list(texts)
+    chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    workers = min(resolve_workers(workers), max(1, len(chunks)))
+    steps = (anonymize_fn, clean_fn)
+    results: List[Optional[Tuple[List[str], List[str]]]] = [None] * len(chunks)
+
+    done_rows = 0
+    if workers == 1:
+        for index, chunk in enumerate(chunks):
+            results[index] = _run_steps(steps, chunk)
+            done_rows += len(chunk)
+            if progress:
+                progress(index + 1, len(chunks), done_rows)
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(steps,)
+        ) as pool:
+            futures = [
+                pool.submit(_process_chunk, index, chunk)
+                for index, chunk in enumerate(chunks)
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                index, result = future.result()
+                results[index] = result
+                done_rows += len(chunks[index])
+                if progress:
+                    progress(done, len(chunks), done_rows)
+
+    anonymized: List[str] = []
+    cleaned: List[str] = []
+    for chunk_anonymized, chunk_cleaned in results:
+        anonymized.extend(chunk_anonymized)
+        cleaned.extend(chunk_cleaned)
+    return anonymized, cleaned
+
+
+def preprocess_chunks(
+    chunks: Iterable[List[str]],
+    anonymize_fn: Callable[[List[str]], List[str]],
+    clean_fn: Callable[[str], str],
+    workers: Optional[int] = 1,
+    mp_context=None,
+) -> Iterator[Tuple[List[str], List[str]]]:
+    """
+    Anonymise puis nettoie un flux de lots et produit (anonymisés, nettoyés)
+    pour chaque lot, dans l'ordre. Au plus deux lots par worker sont en
+    cours à la fois : le flux n'est lu qu'au fur et à mesure.
+
+    `mp_context` : contexte multiprocessing des workers (par défaut celui de
+    la plateforme), par exemple "spawn" depuis un serveur multi-thread.
+    """
+    workers = resolve_workers(workers)
+    steps = (anonymize_fn, clean_fn)
+    if workers == 1:
+        for chunk in chunks:
+            yield _run_steps(steps, chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(steps,),
+        mp_context=mp_context,
+    ) as pool:
+        pending = deque()
+        for index, chunk in enumerate(chunks):
+            pending.append(pool.submit(_process_chunk, index, chunk))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()[1]
+        while pending:
+            yield pending.popleft().result()[1]
+
+
+def preprocess_texts_cached(
+    texts: Sequence[str],
+    anonymize_fn: Callable[[List[str]], List[str]],
+    clean_fn: Callable[[str], str],
+    cache: PreprocessingCache,
+    namespace: str,
+    with_forms: bool = False,
+    **kwargs,
+) -> tuple:
+    """
+    Comme preprocess_texts, mais seuls les textes absents du cache (pour
+    l'empreinte `namespace`) sont traités ; les autres sont relus.
+
+    Avec `with_forms`, `clean_fn` retourne (texte nettoyé, formes de
+    surface) : les formes sont enregistrées avec l'entrée et retournées en
+    troisième élément (anonymisés, nettoyés, formes), sans retraiter les
+    textes déjà en cache.
+    """
+    texts = list(texts)
+    keys = [make_key(namespace, text) for text in texts]
+    cached = cache.get_many(keys, with_forms=with_forms)
+
+    # Textes à traiter (une seule fois par clé)
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+    if missing:
+        anonymized, cleaned = preprocess_texts(
+            list(missing.values()), anonymize_fn, clean_fn, **kwargs
+        )
+        if with_forms:
+            computed = {
+                key: (anon, clean, forms)
+                for key, anon, (clean, forms) in zip(missing, anonymized, cleaned)
+            }
+        else:
+            computed = dict(zip(missing, zip(anonymized, cleaned)))
+        cache.put_many((key, *entry) for key, entry in computed.items())
+        cached.update(computed)
+
+    columns = 3 if with_forms else 2
+    return tuple([cached[key][i] for key in keys] for i in range(columns))
@@ -0,0 +1,116 @@
+"""
+Rescoring par lots de tous les commentaires stockés
+
+compute_all_toxicity_scores parcourait prod.csv avec iterrows et appelait
+calculate_toxicity_score pour chaque ligne : une anonymisation NLTK, une
+vectorisation et une prédiction par commentaire, sur un seul cœur.
+
+rescore_comments lit les commentaires du stockage par lots de
+`chunk_size`, anonymise et nettoie chaque lot (voir
+preprocessing.preprocess_chunks), puis fait une seule vectorisation et une
+seule prédiction par lot. Les nouveaux scores sont réécrits en une seule
+passe à la fin, et le débit (commentaires/seconde) est rapporté.
+
+Par défaut tout s'exécute dans le processus appelant. Avec plusieurs
+workers, les processus sont démarrés en "spawn" : un fork de l'API
+copierait ses threads, ses verrous et ses connexions SQLite en cours
+d'utilisation.
+"""
+
+import itertools
+import multiprocessing
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from preprocessing import preprocess_chunks
+from scoring import toxicity_score
+
+# Probabilités de toxicité d'un lot de textes nettoyés (listes de tokens)
+PredictFn = Callable[[List[List[str]]], Sequence[Optional[float]]]
+RescoringProgress = Callable[[int, int, float], None]
+
+
+@dataclass
+class RescoringReport:
+    """Bilan d'un rescoring complet."""
+
+    comments: int
+    chunks: int
+    seconds: float
+
+    @property
+    def comments_per_second(self) -> float:
+        return self.comments / self.seconds if self.seconds > 0 else 0.0
+
+
+def print_rescoring_progress(chunks: int, comments: int, comments_per_second: float):
+    """Affiche la progression après chaque lot."""
+    print(
+        f"  Lot {chunks} terminé ({comments} commentaires, {comments_per_second:.0f}/s)"
+    )
+
+
+def iter_chunks(records: Iterable[Dict], chunk_size: int) -> Iterator[List[Dict]]:
+    """Découpe un flux d'enregistrements en listes de `chunk_size`."""
+    records = iter(records)
+    while True:
+        chunk = list(itertools.islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def rescore_comments(
+    store,
+    anonymize_fn: Callable[[List[str]], List[str]],
+    clean_fn: Callable[[str], str],
+    predict_fn: PredictFn,
+    workers: Optional[int] = 1,
+    chunk_size: int = 2000,
+    progress: Optional[RescoringProgress] = print_rescoring_progress,
+) -> RescoringReport:
+    """
+    Recalcule le score de toxicité de tous les commentaires de `store` et
+    les réécrit en une seule passe (update_toxicity_scores).
+
+    `anonymize_fn` reçoit un lot de textes, `clean_fn` un texte anonymisé
+    (voir preprocess_texts) ; `predict_fn` reçoit les tokens nettoyés d'un
+    lot et retourne une probabilité par texte. Avec plusieurs workers,
+    `anonymize_fn` et `clean_fn` doivent être importables depuis un
+    processus neuf (fonctions de niveau module).
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size doit être >= 1")
+    start = time.perf_counter()
+
+    # Les IDs restent dans ce processus ; seuls les textes partent aux workers
+    pending_ids = deque()
+
+    def texts() -> Iterator[List[str]]:
+        for chunk in iter_chunks(store.iter_comments(), chunk_size):
+            pending_ids.append([comment["id"] for comment in chunk])
+            yield [comment["comment_text"] for comment in chunk]
+
+    scores = []
+    chunks = 0
+    for _, cleaned in preprocess_chunks(
+        texts(),
+        anonymize_fn,
+        clean_fn,
+        workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    ):
+        ids = pending_ids.popleft()
+        # Une seule vectorisation et une seule prédiction pour le lot
+        probas = predict_fn([text.split() for text in cleaned])
+        scores.extend(zip(ids, (toxicity_score(prob) for prob in probas)))
+        chunks += 1
+        if progress:
+            elapsed = time.perf_counter() - start
+            progress(chunks, len(scores), len(scores) / elapsed if elapsed > 0 else 0.0)
+
+    if scores:
+        store.update_toxicity_scores(scores)
+    return RescoringReport(len(scores), chunks, time.perf_counter() - start)
@@ -0,0 +1,150 @@
+"""
+Cache en mémoire des résultats de scoring (LRU + TTL, borné en octets)
+
+Le spam et les copier-coller représentent une grande part du trafic : le
+même texte brut repasse par l'anonymisation, NLTK et le modèle à chaque
+fois. ResultCache mémorise le résultat par texte brut pendant `ttl`
+secondes, dans la limite de `max_bytes` (les entrées les moins récemment
+utilisées sont évincées au-delà).
+
+La clé est un BLAKE2b du texte brut préfixé par la version du modèle
+(empreinte de ses paramètres, voir LinearScorer.version) : un résultat
+calculé par un autre modèle n'est jamais servi, et `set_model_version`
+vide le cache quand le modèle est rechargé.
+"""
+
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional, Tuple
+
+# Surcoût approximatif d'une entrée (clé, tuple, nœud de l'OrderedDict)
+_ENTRY_OVERHEAD = 200
+
+
+def make_key(model_version: str, text: str) -> bytes:
+    """Clé d'un texte brut pour une version du modèle."""
+    digest = hashlib.blake2b(model_version.encode("utf-8"), digest_size=16)
+    digest.update(text.encode("utf-8", "surrogatepass"))
+    return digest.digest()
+
+
+@dataclass
+class ResultCacheStats:
+    """Compteurs du cache depuis sa création."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResultCache:
+    """
+    Cache LRU à expiration (texte brut -> résultat) borné en octets.
+
+    `sizeof` estime la taille d'un résultat (par défaut sys.getsizeof).
+    Utilisable depuis plusieurs threads.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 3600,
+        model_version: str = "",
+        sizeof: Callable[[Any], int] = sys.getsizeof,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if max_bytes < 1:
+            raise ValueError("max_bytes doit être >= 1")
+        if ttl <= 0:
+            raise ValueError("ttl doit être > 0")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.model_version = model_version
+        self.stats = ResultCacheStats()
+        self._sizeof = sizeof
+        self._clock = clock
+        # clé -> (résultat, taille, date d'expiration), du plus ancien au plus récent
+        self._entries: "OrderedDict[bytes, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, text: str) -> Optional[Any]:
+        """Résultat mémorisé pour `text`, ou None (absent ou expiré)."""
+        key = make_key(self.model_version, text)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            value, size, expires_at = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                self._bytes -= size
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats.hits += 1
+            return value
+
+    def put(self, text: str, value: Any):
+        """Mémorise le résultat de `text` (ignoré s'il dépasse max_bytes)."""
+        key = make_key(self.model_version, text)
+        size = self._sizeof(value) + len(key) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (value, size, self._clock() + self.ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.stats.evictions += 1
+
+    def set_model_version(self, model_version: str):
+        """Change de version du modèle ; le cache est vidé si elle diffère."""
+        with self._lock:
+            if model_version == self.model_version:
+                return
+            self.model_version = model_version
+            self._entries.clear()
+            self._bytes = 0
+            self.stats.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def report(self) -> dict:
+        """Compteurs et occupation du cache (exposés par /metrics)."""
+        return {
+            **asdict(self.stats),
+            "hit_rate": round(self.stats.hit_rate, 4),
+            "entries": len(self._entries),
+            "size_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "ttl": self.ttl,
+            "model_version": self.model_version,
+        }
@@ -0,0 +1,68 @@
+"""
+Résultat de scoring partagé par les APIs (app.py, app1.py)
+
+Un ScoringResult transporte le texte anonymisé, le texte nettoyé et la
+probabilité de toxicité à travers le pipeline, pour que chaque étape
+(anonymisation, nettoyage, prédiction) ne soit exécutée qu'une seule fois
+par requête.
+"""
+
+import sys
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# Score retourné quand le modèle n'est pas chargé
+NEUTRAL_SCORE = 50
+
+
+def _clamp_score(value: float) -> int:
+    """Convertit une valeur en score entier borné entre 0 et 100."""
+    return max(0, min(100, int(value)))
+
+
+def toxicity_score(prob_toxic: Optional[float]) -> int:
+    """Score de toxicité (0-100) : 100 * probabilité de toxicité."""
+    if prob_toxic is None:
+        return NEUTRAL_SCORE
+    return _clamp_score(100 * prob_toxic)
+
+
+@dataclass
+class ScoringResult:
+    """Résultat intermédiaire puis final du scoring d'un texte."""
+
+    text: str
+    anonymized_text: str = ""
+    cleaned_text: str = ""
+    # Tokens nettoyés (cleaned_text = " ".join(tokens)), vectorisés sans re-tokenisation
+    tokens: List[str] = field(default_factory=list)
+    entities: List[Tuple[str, str]] = field(default_factory=list)
+    prob_toxic: Optional[float] = None
+
+    @property
+    def nbytes(self) -> int:
+        """Taille approximative en mémoire (textes, tokens et entités)."""
+        size = sys.getsizeof(self)
+        size += sys.getsizeof(self.text) + sys.getsizeof(self.anonymized_text)
+        size += sys.getsizeof(self.cleaned_text) + sys.getsizeof(self.tokens)
+        size += sum(sys.getsizeof(token) for token in self.tokens)
+        size += sys.getsizeof(self.entities)
+        size += sum(sys.getsizeof(a) + sys.getsizeof(b) for a, b in self.entities)
+        return size
+
+    @property
+    def is_scored(self) -> bool:
+        """Indique si une probabilité de toxicité a été calculée."""
+        return self.prob_toxic is not None
+
+    @property
+    def social_score(self) -> int:
+        """Score social (0-100) : 100 * (1 - probabilité de toxicité)."""
+        if self.prob_toxic is None:
+            return NEUTRAL_SCORE
+        return _clamp_score(100 * (1 - self.prob_toxic))
+
+    @property
+    def toxicity_score(self) -> int:
+        """Score de toxicité (0-100) : 100 * probabilité de toxicité."""
+        return toxicity_score(self.prob_toxic)
@@ -0,0 +1,97 @@
+"""
+Démarrage mesuré de l'API et état de préparation (readiness)
+
+Importer app.py charge le modèle et les stop words, mais plusieurs
+ressources NLTK ne sont chargées qu'au premier appel (tokenizer punkt,
+tagger, chunker maxent, WordNet) : sans préchauffage, la première vraie
+requête payait ces chargements alors que /health répondait déjà « ok ».
+
+StartupState enregistre la durée de chaque étape de démarrage (chargement
+du modèle, appels factices à ne_chunk, lemmatize...) et n'indique « prêt »
+qu'une fois le préchauffage terminé. /ready s'appuie dessus pour que
+Kubernetes n'envoie pas de trafic aux pods encore froids.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+Stage = Tuple[str, Callable[[], object]]
+
+
+@dataclass
+class StageTiming:
+    """Durée d'une étape de démarrage."""
+
+    seconds: float
+    error: Optional[str] = None
+
+
+class StartupState:
+    """Durées des étapes de démarrage et état de préparation."""
+
+    def __init__(self):
+        self.stages: Dict[str, StageTiming] = {}
+        self._started = False
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Préchauffage terminé sans étape en échec."""
+        return self._done.is_set() and not self.failed_stages()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Mesure la durée du bloc ; les exceptions sont enregistrées puis relancées."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException as e:
+            self.stages[name] = StageTiming(time.perf_counter() - start, repr(e))
+            raise
+        self.stages[name] = StageTiming(time.perf_counter() - start)
+
+    def warm_up(self, stages: Iterable[Stage]) -> bool:
+        """
+        Exécute les étapes de préchauffage dans l'ordre (une seule fois) puis
+        marque l'API comme prête si aucune n'a échoué.
+        """
+        with self._lock:
+            if self._started:
+                self._done.wait()
+                return self.ready
+            self._started = True
+        for name, fn in stages:
+            try:
+                with self.stage(name):
+                    fn()
+            except Exception as e:
+                print(f"Erreur lors du préchauffage ({name}): {e}")
+        for name, timing in self.stages.items():
+            print(f"Démarrage - {name}: {timing.seconds * 1000:.1f} ms")
+        self._done.set()
+        return self.ready
+
+    def start_background(self, stages: Iterable[Stage]) -> Optional[threading.Thread]:
+        """Lance le préchauffage dans un thread, sauf s'il a déjà eu lieu."""
+        if self._started:
+            return None
+        thread = threading.Thread(
+            target=self.warm_up, args=(list(stages),), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def failed_stages(self) -> Dict[str, str]:
+        return {name: t.error for name, t in self.stages.items() if t.error is not None}
+
+    def report(self) -> dict:
+        """État de préparation et durée de chaque étape (réponse de /ready)."""
+        return {
+            "ready": self.ready,
+            "stages": {name: asdict(timing) for name, timing in self.stages.items()},
+            "total_seconds": sum(timing.seconds for timing in self.stages.values()),
+        }
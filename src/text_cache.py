@@ -0,0 +1,202 @@
+"""
+Cache persistant des textes prétraités (adressé par contenu)
+
+Chaque réentraînement refaisait l'anonymisation et le nettoyage NLTK de
+toutes les lignes, alors que la quasi-totalité des commentaires ne change
+pas d'un entraînement à l'autre. PreprocessingCache stocke sur disque
+(SQLite) le texte anonymisé et le texte nettoyé de chaque commentaire,
+ainsi que ses formes de surface (tokens avant lemmatisation, utilisés par
+train.py pour compiler la table de lemmes).
+
+La clé est un SHA-256 de (empreinte du prétraitement, texte brut) :
+l'empreinte couvre les patterns d'anonymisation et la version du pipeline
+NLTK, donc toute modification de l'un d'eux invalide le cache sans
+intervention. La taille est bornée : au-delà de `max_bytes`, les entrées
+les moins récemment utilisées sont supprimées.
+"""
+
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Union
+
+# Nombre maximal de paramètres par requête SQLite
+_SQL_BATCH = 500
+
+# Après éviction, la taille est ramenée à cette fraction de max_bytes
+_EVICTION_TARGET = 0.9
+
+
+def fingerprint(*parts: str) -> str:
+    """Empreinte stable d'une configuration de prétraitement."""
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def make_key(namespace: str, text: str) -> str:
+    """Clé de cache d'un texte brut pour une empreinte donnée."""
+    return hashlib.sha256(f"{namespace}\x1e{text}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Statistiques du cache depuis son ouverture."""
+
+    hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class PreprocessingCache:
+    """
+    Cache SQLite (clé -> texte anonymisé, texte nettoyé).
+
+    `get_many` / `put_many` travaillent par lots pour limiter le nombre de
+    requêtes. Les entrées lues sont marquées comme récemment utilisées.
+    """
+
+    def __init__(self, path: Union[str, Path], max_bytes: int = 1024 * 1024 * 1024):
+        if max_bytes < 1:
+            raise ValueError("max_bytes doit être >= 1")
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        if str(path) != ":memory:":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " anonymized TEXT NOT NULL,"
+            " cleaned TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " forms TEXT NOT NULL DEFAULT '')"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        if "forms" not in columns:
+            # Cache créé avant l'ajout des formes de surface
+            self._conn.execute(
+                "ALTER TABLE entries ADD COLUMN forms TEXT NOT NULL DEFAULT ''"
+            )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def get_many(
+        self, keys: Sequence[str], with_forms: bool = False
+    ) -> Dict[str, tuple]:
+        """
+        Retourne {clé: (anonymisé, nettoyé)} pour les clés présentes, ou
+        {clé: (anonymisé, nettoyé, formes)} avec `with_forms`.
+        """
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, tuple] = {}
+        for start in range(0, len(unique), _SQL_BATCH):
+            batch = unique[start : start + _SQL_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                "SELECT key, anonymized, cleaned, forms FROM entries"
+                f" WHERE key IN ({placeholders})",
+                batch,
+            )
+            for key, anonymized, cleaned, forms in rows:
+                found[key] = (
+                    (anonymized, cleaned, forms)
+                    if with_forms
+                    else (anonymized, cleaned)
+                )
+        if found:
+            now = time.time()
+            self._conn.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(now, key) for key in found],
+            )
+            self._conn.commit()
+        self.stats.hits += sum(1 for key in keys if key in found)
+        self.stats.misses += sum(1 for key in keys if key not in found)
+        return found
+
+    def put_many(self, items: Iterable[tuple]):
+        """
+        Enregistre des entrées (clé, anonymisé, nettoyé[, formes]) puis
+        applique l'éviction.
+        """
+        now = time.time()
+        rows = []
+        for key, anonymized, cleaned, *rest in items:
+            forms = rest[0] if rest else ""
+            size = _entry_size(key, anonymized, cleaned, forms)
+            rows.append((key, anonymized, cleaned, forms, size, now))
+        if not rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO entries"
+            " (key, anonymized, cleaned, forms, size, last_used)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        self._conn.commit()
+        self.stats.writes += len(rows)
+        self.evict()
+
+    def size_bytes(self) -> int:
+        """Taille totale des entrées (clés, textes et formes encodés en UTF-8)."""
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def evict(self) -> int:
+        """Supprime les entrées les moins récemment utilisées si la taille dépasse max_bytes."""
+        total = self.size_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * _EVICTION_TARGET)
+        to_delete: List[str] = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY last_used, key"
+        ):
+            if total <= target:
+                break
+            to_delete.append(key)
+            total -= size
+        self._conn.executemany(
+            "DELETE FROM entries WHERE key = ?", [(key,) for key in to_delete]
+        )
+        self._conn.commit()
+        self.stats.evictions += len(to_delete)
+        return len(to_delete)
+
+    def summary(self) -> str:
+        """Résumé lisible des statistiques."""
+        return (
+            f"{self.stats.hits} hits, {self.stats.misses} misses "
+            f"({self.stats.hit_rate:.1%}), {len(self)} entrées, "
+            f"{self.size_bytes() / 1e6:.1f} Mo, {self.stats.evictions} évictions"
+        )
+
+
+def _entry_size(key: str, anonymized: str, cleaned: str, forms: str = "") -> int:
+    return len(key) + sum(
+        len(text.encode("utf-8")) for text in (anonymized, cleaned, forms)
+    )
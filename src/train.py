@@ -1,13 +1,12 @@
+import argparse
 import re
+import shutil
 from pathlib import Path
 
 import joblib
 import nltk
-import numpy as np
 import pandas as pd
-from nltk import ne_chunk, pos_tag
 from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
 from nltk.tokenize import word_tokenize
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
@@ -15,7 +14,13 @@ from sklearn.metrics import classification_report
 from sklearn.model_selection import train_test_split
 
 # Configuration centralisée
+from artifacts import save_artifact
 from config import config
+from lemmatizer import LemmaTable, cached_lemmatizer
+from ner import get_named_entity_masker
+from pii import default_pii_patterns, pii_masker
+from preprocessing import preprocess_texts, preprocess_texts_cached
+from text_cache import PreprocessingCache, fingerprint
 
 # --- 1. Fonctions d'Anonymisation (Basées sur la configuration) ---
 
@@ -29,43 +34,18 @@ ADDRESS_RE = config.ADDRESS_RE
 
 
 def mask_regex_pii(text):
-    s = text
-    s = EMAIL_RE.sub("<EMAIL>", s)
-    s = CREDIT_RE.sub("<CREDIT_CARD>", s)
-    s = PHONE_RE.sub(
-        lambda m: (
-            "<PHONE>" if len(re.sub(r"[^\d]", "", m.group(0))) >= 6 else m.group(0)
-        ),
-        s,
-    )
-    s = DATE_RE.sub("<DATE>", s)
-    s = AGE_RE.sub("<AGE>", s)
-    s = ADDRESS_RE.sub("<ADDRESS>", s)
-    return s
+    # Équivalent aux re.sub successifs (EMAIL, CREDIT_CARD, PHONE, DATE, AGE,
+    # ADDRESS) mais sans chaîne intermédiaire : voir pii.PIIMasker
+    return pii_masker.mask(text)
+
+
+ner_masker = get_named_entity_masker(labels=config.NAMED_ENTITY_LABELS)
 
 
 def mask_named_entities(text):
-    try:
-        tokens = word_tokenize(text)
-        tags = pos_tag(tokens)
-        tree = ne_chunk(tags, binary=False)
-    except Exception:
-        return text
-
-    for subtree in tree:
-        if hasattr(subtree, "label"):
-            label = subtree.label()
-            ent = " ".join([tok for tok, pos in subtree.leaves()])
-            if label in config.NAMED_ENTITY_LABELS:
-                try:
-                    pattern = re.compile(
-                        r"\b" + re.escape(ent) + r"\b", flags=re.IGNORECASE
-                    )
-                    tag = f"<{label}>" if label != "PERSON" else "<PERSON>"
-                    text = pattern.sub(tag, text)
-                except re.error:
-                    pass
-    return text
+    # Backend choisi par config.NER_BACKEND (voir ner.NamedEntityMasker)
+    masked, _ = ner_masker.mask(text)
+    return masked
 
 
 def anonymize_text(text):
@@ -78,30 +58,126 @@ def anonymize_text(text):
     return s
 
 
+def anonymize_texts(texts, batch_size=None):
+    """
+    Anonymise une collection de textes (même résultat que anonymize_text
+    sur chaque texte). La détection des entités est faite par lots de
+    `batch_size` textes pour éviter le coût d'un appel NLTK par ligne.
+    """
+    if batch_size is None:
+        batch_size = config.ANONYMIZATION_BATCH_SIZE
+    texts = list(texts)
+    results = [""] * len(texts)
+    # 1. Mask regex-based PII (les valeurs non textuelles restent vides)
+    indices = [i for i, text in enumerate(texts) if isinstance(text, str)]
+    masked = [mask_regex_pii(texts[i]) for i in indices]
+    # 2. Mask named entities, par lots
+    for start in range(0, len(masked), batch_size):
+        batch = ner_masker.mask_batch(masked[start : start + batch_size])
+        for i, (text, _) in zip(indices[start : start + batch_size], batch):
+            results[i] = text
+    return results
+
+
 # --- 2. Fonctions de Nettoyage NLTK (Basées sur le guide) ---
 
-lemmatizer = WordNetLemmatizer()
+# Lemmatiseur partagé avec cache LRU (voir lemmatizer.py)
+lemmatizer = cached_lemmatizer
 stop_words = set(stopwords.words("english"))
 
 
-def clean_text_nltk(text):
+def tokenize_text(text):
     # 1. Mise en minuscule et suppression des caractères spéciaux
     text = re.sub(r"[^a-zA-Z\s]", "", text.lower())
 
     # 2. Tokenisation
-    tokens = word_tokenize(text)
+    return word_tokenize(text)
+
+
+def clean_text_nltk(text):
+    tokens = tokenize_text(text)
 
     # 3. Suppression des stop words et lemmatisation
-    tokens = [lemmatizer.lemmatize(w) for w in tokens if w not in stop_words]
+    tokens = lemmatizer.clean_tokens(tokens, stop_words)
 
     return " ".join(tokens)
 
 
+def clean_text_with_forms(text):
+    """
+    Comme clean_text_nltk, mais retourne aussi les formes de surface du
+    texte (tokens hors stop words, uniques) pour la table de lemmes : le
+    corpus n'est tokenisé qu'une fois, et plus du tout pour les textes en cache.
+    """
+    tokens = [token for token in tokenize_text(text) if token not in stop_words]
+    cleaned = " ".join(lemmatizer.clean_tokens(tokens, ()))
+    return cleaned, " ".join(sorted(set(tokens)))
+
+
+# Version du prétraitement : à incrémenter à chaque modification de
+# anonymize_text ou clean_text_nltk pour invalider le cache
+PREPROCESSING_VERSION = "2"
+
+
+def preprocessing_fingerprint():
+    """Empreinte (patterns d'anonymisation, pipeline NLTK) des entrées du cache"""
+    patterns = [
+        f"{label}:{pattern.flags}:{pattern.pattern}"
+        for label, pattern in default_pii_patterns()
+    ]
+    return fingerprint(
+        PREPROCESSING_VERSION,
+        nltk.__version__,
+        ner_masker.name,
+        ",".join(config.NAMED_ENTITY_LABELS),
+        *patterns,
+    )
+
+
+def preprocess_dataframe_texts(texts, workers, use_cache):
+    """
+    Anonymise et nettoie les textes, en réutilisant le cache si activé.
+    Retourne (anonymisés, nettoyés, formes de surface de chaque texte).
+    """
+    kwargs = dict(workers=workers, chunk_size=config.PREPROCESSING_CHUNK_SIZE)
+    if not use_cache:
+        anonymized, results = preprocess_texts(
+            texts, anonymize_texts, clean_text_with_forms, **kwargs
+        )
+        cleaned = [clean for clean, _ in results]
+        forms = [text_forms for _, text_forms in results]
+        return anonymized, cleaned, forms
+
+    cache_path = config.get_preprocessing_cache_path()
+    print(f"Cache de prétraitement: {cache_path}")
+    with PreprocessingCache(
+        cache_path, max_bytes=config.PREPROCESSING_CACHE_MAX_MB * 1024 * 1024
+    ) as cache:
+        result = preprocess_texts_cached(
+            texts,
+            anonymize_texts,
+            clean_text_with_forms,
+            cache,
+            preprocessing_fingerprint(),
+            with_forms=True,
+            **kwargs,
+        )
+        print(f"Cache de prétraitement: {cache.summary()}")
+    return result
+
+
 # --- 3. Fonction Principale d'Entraînement ---
 
 
-def train_and_save_model(file_path=None):
-    """Entraîne et sauvegarde le modèle"""
+def train_and_save_model(file_path=None, workers=None, use_cache=None):
+    """
+    Entraîne et sauvegarde le modèle.
+
+    `workers` : nombre de processus de prétraitement (défaut
+    config.PREPROCESSING_WORKERS, 0 = un par cœur).
+    `use_cache` : réutiliser le cache des textes prétraités (défaut
+    config.ENABLE_PREPROCESSING_CACHE).
+    """
     # Utiliser le chemin de la configuration si aucun chemin n'est fourni
     if file_path is None:
         file_path = config.DATA_DIR / "prod.csv"
@@ -142,13 +218,25 @@ def train_and_save_model(file_path=None):
 
     print(f"Nombre de commentaires à traiter: {len(df)}")
 
-    # 2. Anonymisation (Étape RGPD)
-    print("Application de l'anonymisation (RGPD)...")
-    df["text_anonymized"] = df[text_column].apply(anonymize_text)
-
-    # 3. Nettoyage NLTK
-    print("Application du nettoyage NLTK...")
-    df["comment_text_clean"] = df["text_anonymized"].apply(clean_text_nltk)
+    # 2. Anonymisation (Étape RGPD) et 3. Nettoyage NLTK, par lots
+    if workers is None:
+        workers = config.PREPROCESSING_WORKERS
+    if use_cache is None:
+        use_cache = config.ENABLE_PREPROCESSING_CACHE
+    print(
+        f"Application de l'anonymisation (RGPD) et du nettoyage NLTK (workers={workers})..."
+    )
+    anonymized, cleaned, forms = preprocess_dataframe_texts(
+        df[text_column].tolist(), workers, use_cache
+    )
+    df["text_anonymized"] = anonymized
+    df["comment_text_clean"] = cleaned
+    if workers == 1:
+        stats = lemmatizer.stats()
+        print(
+            f"Cache du lemmatiseur: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%})"
+        )
 
     # 4. Vectorisation (TF-IDF)
     print("Vectorisation TF-IDF...")
@@ -166,6 +254,15 @@ def train_and_save_model(file_path=None):
     X_train_vec = vectorizer.fit_transform(X_train)
     X_test_vec = vectorizer.transform(X_test)
 
+    # Table forme de surface -> feature pour l'inférence (voir lemmatizer.LemmaTable),
+    # à partir des formes collectées pendant le nettoyage (ou relues du cache)
+    print("Compilation de la table de lemmes...")
+    surface_forms = {form for text_forms in set(forms) for form in text_forms.split()}
+    lemma_table = LemmaTable.build(surface_forms, vectorizer, lemmatizer, stop_words)
+    print(
+        f"Table de lemmes: {len(lemma_table)} formes pour {len(vectorizer.vocabulary_)} features"
+    )
+
     # 5. Entraînement du Modèle (Régression Logistique)
     print("Entraînement du modèle de Régression Logistique...")
     model = LogisticRegression(solver="liblinear", random_state=42, max_iter=1000)
@@ -180,15 +277,16 @@ def train_and_save_model(file_path=None):
 
     # 7. Sauvegarde du Modèle et du Vectoriseur
     print("Sauvegarde du modèle et du vectoriseur...")
-    
+
     # Debug: Afficher les chemins calculés
     print(f"🔍 Debug - BASE_DIR: {config.BASE_DIR}")
     print(f"🔍 Debug - MODELS_DIR: {config.MODELS_DIR}")
     print(f"🔍 Debug - Répertoire courant: {Path.cwd()}")
-    
-    model_path = config.get_model_path()
-    vectorizer_path = config.get_vectorizer_path()
-    
+
+    model_path = config.get_model_path("joblib")
+    vectorizer_path = config.get_vectorizer_path("joblib")
+    lemma_table_path = config.get_lemma_table_path("joblib")
+
     print(f"🔍 Debug - model_path calculé: {model_path}")
     print(f"🔍 Debug - vectorizer_path calculé: {vectorizer_path}")
 
@@ -199,21 +297,61 @@ def train_and_save_model(file_path=None):
     # Sauvegarde
     joblib.dump(model, model_path)
     joblib.dump(vectorizer, vectorizer_path)
-    
+    lemma_table.save(lemma_table_path)
+    # Artefact binaire projeté en mémoire par les APIs (voir artifacts.py)
+    artifact_dir = config.get_artifact_dir()
+    try:
+        save_artifact(
+            model,
+            vectorizer,
+            artifact_dir,
+            sources=(model_path, vectorizer_path, lemma_table_path),
+            lemma_forms=lemma_table.forms,
+        )
+        print(f"✅ Artefact binaire sauvegardé sous '{artifact_dir}'")
+    except ValueError as e:
+        # L'artefact précédent décrirait l'ancien modèle : il est supprimé
+        shutil.rmtree(artifact_dir, ignore_errors=True)
+        print(f"⚠️  Artefact binaire non généré: {e}")
+
     # Vérification immédiate
     if model_path.exists():
         print(f"✅ Modèle sauvegardé sous '{model_path}'")
     else:
         print(f"❌ Échec sauvegarde modèle vers '{model_path}'")
-        
+
     if vectorizer_path.exists():
         print(f"✅ Vectoriseur sauvegardé sous '{vectorizer_path}'")
     else:
         print(f"❌ Échec sauvegarde vectoriseur vers '{vectorizer_path}'")
 
+    if lemma_table_path.exists():
+        print(f"✅ Table de lemmes sauvegardée sous '{lemma_table_path}'")
+    else:
+        print(f"❌ Échec sauvegarde table de lemmes vers '{lemma_table_path}'")
+
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entraînement du modèle de toxicité")
+    parser.add_argument("--data", default=None, help="Fichier CSV d'entraînement")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.PREPROCESSING_WORKERS,
+        help="Processus de prétraitement (0 = un par cœur)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ne pas utiliser le cache des textes prétraités",
+    )
+    args = parser.parse_args()
+
     print(
         "Les ressources NLTK sont supposées être pré-téléchargées. Lancement de l'entraînement..."
     )
-    train_and_save_model()
+    train_and_save_model(
+        args.data,
+        workers=args.workers,
+        use_cache=False if args.no_cache else None,
+    )
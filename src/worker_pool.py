@@ -0,0 +1,329 @@
+"""
+Pool de processus de scoring préchauffés, pilotés depuis la boucle d'événements
+
+NLTK (tokenisation, tagging, chunking) est du Python pur : avec des threads,
+un seul cœur travaille à la fois. ProcessScoringPool garde N processus
+préchauffés qui possèdent chacun l'anonymiseur, le nettoyeur, le vectoriseur
+et le modèle (hérités par fork du processus de l'API, en copy-on-write).
+
+Chaque processus a son propre Pipe. La boucle asyncio surveille les pipes
+(loop.add_reader) : pas de thread intermédiaire. Les requêtes en attente
+sont envoyées par micro-lots (au plus `max_batch_size` textes) au premier
+processus libre, qui les traite en un seul appel à `handler` ; un seul
+processus API peut ainsi occuper tous les cœurs du pod.
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import time
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Sequence, Tuple
+
+from executor import ExecutorFull
+
+
+def _worker_main(
+    conn, handler: Callable[[List[Any]], List[Any]], initializer: Optional[Callable]
+):
+    """Boucle d'un processus de scoring : reçoit un lot, renvoie ses résultats."""
+    if initializer is not None:
+        try:
+            initializer()
+        except Exception as e:
+            # Signalé au pool, qui cesse de relancer des processus voués à
+            # l'échec ; le processus reste en vie jusqu'à la fermeture du pipe
+            # pour que le lot éventuellement déjà envoyé reçoive cette erreur
+            conn.send(("init_error", f"{type(e).__name__}: {e}"))
+            try:
+                while conn.recv() is not None:
+                    pass
+            except EOFError:
+                pass
+            conn.close()
+            return
+    while True:
+        try:
+            items = conn.recv()
+        except EOFError:
+            break
+        if items is None:
+            break
+        try:
+            conn.send(("ok", handler(items)))
+        except Exception as e:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class _PendingItem:
+    __slots__ = ("item", "future", "enqueued_at", "queue_delay_ms")
+
+    def __init__(self, item: Any, future: asyncio.Future):
+        self.item = item
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+        self.queue_delay_ms = 0.0
+
+
+class _Worker:
+    __slots__ = ("process", "conn", "batch")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.batch: List[_PendingItem] = []
+
+
+class ProcessScoringPool:
+    """
+    N processus de scoring alimentés par micro-lots via des pipes.
+
+    `handler` reçoit une liste d'éléments et retourne la liste des résultats
+    dans le même ordre (par exemple app.score_texts). `initializer` est
+    appelé une fois dans chaque processus (préchauffage). Un envoi qui
+    laisserait plus de `max_queue` éléments en attente (après remplissage des
+    processus libres) est refusé avec ExecutorFull. Si `initializer` échoue,
+    le pool passe en échec (`failed`) : plus aucun processus n'est relancé et
+    les envois sont refusés.
+    """
+
+    kind = "process"
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        workers: int = 2,
+        max_queue: int = 64,
+        max_batch_size: int = 32,
+        initializer: Optional[Callable] = None,
+        start_method: Optional[str] = None,
+    ):
+        if workers < 1:
+            raise ValueError("workers doit être >= 1")
+        if max_queue < 0:
+            raise ValueError("max_queue doit être >= 0")
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+        self.handler = handler
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_batch_size = max_batch_size
+        self.initializer = initializer
+        self._context = multiprocessing.get_context(start_method)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._workers: List[_Worker] = []
+        self._idle: Deque[_Worker] = deque()
+        self._pending: Deque[_PendingItem] = deque()
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.batches = 0
+        self.restarts = 0
+        self.failed: Optional[str] = None
+
+    # --- Cycle de vie -------------------------------------------------------
+
+    def start(self):
+        """Démarre les processus (à appeler depuis la boucle d'événements)."""
+        if self._loop is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        # Objets déjà chargés (modèle, NLTK) : hors du GC pour rester partagés
+        gc.collect()
+        gc.freeze()
+        for _ in range(self.workers):
+            self._spawn()
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe(duplex=True)
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.handler, self.initializer),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(process, parent_conn)
+        self._workers.append(worker)
+        self._idle.append(worker)
+        self._loop.add_reader(parent_conn.fileno(), self._on_readable, worker)
+        return worker
+
+    def shutdown(self):
+        """Arrête les processus ; les requêtes en attente échouent."""
+        if self._loop is None:
+            return
+        for worker in self._workers:
+            self._loop.remove_reader(worker.conn.fileno())
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            self._fail(worker.batch, RuntimeError("Pool de scoring arrêté"))
+            worker.conn.close()
+        self._fail(list(self._pending), RuntimeError("Pool de scoring arrêté"))
+        self._pending.clear()
+        self._workers.clear()
+        self._idle.clear()
+        self._loop = None
+
+    # --- Soumission ---------------------------------------------------------
+
+    def _has_room(self, count: int) -> bool:
+        """`count` éléments de plus laisseraient-ils au plus max_queue en attente ?"""
+        room = self.max_queue + len(self._idle) * self.max_batch_size
+        return len(self._pending) + count <= room
+
+    def _enqueue(self, items: Sequence[Any]) -> List[_PendingItem]:
+        if self._loop is None:
+            raise RuntimeError("Pool de scoring non démarré")
+        if self.failed is not None:
+            raise RuntimeError(f"Pool de scoring en échec: {self.failed}")
+        if not self._has_room(len(items)):
+            self.rejected += 1
+            raise ExecutorFull(
+                f"{len(self._pending)} éléments en attente, {len(items)} soumis"
+                f" (max_queue {self.max_queue})"
+            )
+        pending = [_PendingItem(item, self._loop.create_future()) for item in items]
+        self._pending.extend(pending)
+        self.submitted += len(pending)
+        self._dispatch()
+        return pending
+
+    async def submit(self, item: Any) -> Tuple[Any, float]:
+        """Traite un élément ; retourne (résultat, attente en file en ms)."""
+        (pending,) = self._enqueue([item])
+        return await pending.future
+
+    async def submit_many(self, items: Sequence[Any]) -> List[Any]:
+        """
+        Traite plusieurs éléments, envoyés par tranches de `max_batch_size`.
+        Seule la première tranche peut être refusée : les suivantes attendent
+        qu'une de leurs devancières se termine pour trouver de la place.
+        """
+        pending: List[_PendingItem] = []
+        for start in range(0, len(items), self.max_batch_size):
+            chunk = items[start : start + self.max_batch_size]
+            while not self._has_room(len(chunk)):
+                running = [p.future for p in pending if not p.future.done()]
+                if not running:
+                    break
+                await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            pending.extend(self._enqueue(chunk))
+        results = await asyncio.gather(*(p.future for p in pending))
+        return [result for result, _ in results]
+
+    # --- Répartition --------------------------------------------------------
+
+    def _dispatch(self):
+        while self._idle and self._pending:
+            worker = self._idle.popleft()
+            batch = [
+                self._pending.popleft()
+                for _ in range(min(self.max_batch_size, len(self._pending)))
+            ]
+            worker.batch = batch
+            self.batches += 1
+            now = time.perf_counter()
+            for pending in batch:
+                pending.queue_delay_ms = (now - pending.enqueued_at) * 1000.0
+            try:
+                worker.conn.send([p.item for p in batch])
+            except OSError as e:
+                self._replace(worker, e)
+
+    def _on_readable(self, worker: _Worker):
+        try:
+            status, payload = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._replace(worker, e)
+            return
+        if status == "init_error":
+            self._give_up(worker, payload)
+            return
+        batch, worker.batch = worker.batch, []
+        self.completed += len(batch)
+        if status == "ok":
+            for pending, result in zip(batch, payload):
+                if not pending.future.done():
+                    pending.future.set_result((result, pending.queue_delay_ms))
+        else:
+            self._fail(batch, RuntimeError(payload))
+        self._idle.append(worker)
+        self._dispatch()
+
+    def _detach(self, worker: _Worker):
+        self._loop.remove_reader(worker.conn.fileno())
+        worker.conn.close()
+        if worker in self._workers:
+            self._workers.remove(worker)
+        if worker in self._idle:
+            self._idle.remove(worker)
+
+    def _replace(self, worker: _Worker, error: BaseException):
+        """Un processus est mort : son lot échoue et il est remplacé."""
+        self._detach(worker)
+        self._fail(
+            worker.batch, RuntimeError(f"Processus de scoring arrêté: {error!r}")
+        )
+        worker.batch = []
+        if self.failed is not None:
+            return
+        self.restarts += 1
+        self._spawn()
+        self._dispatch()
+
+    def _give_up(self, worker: _Worker, error: str):
+        """
+        L'initialisation d'un processus a échoué : la relancer échouerait de
+        même. Le pool passe en échec et toutes les requêtes en attente échouent.
+        """
+        self._detach(worker)
+        if self.failed is None:
+            self.failed = error
+            print(f"Erreur lors de l'initialisation d'un processus de scoring: {error}")
+        failure = RuntimeError(f"Pool de scoring en échec: {self.failed}")
+        self._fail(worker.batch, failure)
+        worker.batch = []
+        self._fail(list(self._pending), failure)
+        self._pending.clear()
+
+    @staticmethod
+    def _fail(batch: List[_PendingItem], error: BaseException):
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_exception(error)
+
+    # --- Métriques ----------------------------------------------------------
+
+    @property
+    def queue_depth(self) -> int:
+        """Éléments en attente d'un processus libre."""
+        return len(self._pending)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending) + sum(len(worker.batch) for worker in self._workers)
+
+    def stats(self) -> dict:
+        """Métriques du pool (exposées par /metrics)."""
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "busy_workers": len(self._workers) - len(self._idle),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "restarts": self.restarts,
+            "failed": self.failed,
+        }
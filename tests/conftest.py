@@ -3,6 +3,7 @@ Fixtures pytest partagées pour tous les tests
 Fichier: tests/conftest.py
 """
 
+import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, Mock
@@ -11,6 +12,9 @@ import numpy as np
 import pandas as pd
 import pytest
 
+# Les modules de src/ s'importent entre eux en absolu ("from config import config")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
 # ============================================================================
 # FIXTURES DONNÉES
 # ============================================================================
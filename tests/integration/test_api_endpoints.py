@@ -28,6 +28,81 @@ class TestAPIHealthCheck:
         assert "status" in data
         assert data["status"] == "healthy"
 
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_ready_endpoint_waits_for_warm_up(self, api_client, monkeypatch):
+        """L'endpoint /ready doit retourner 503 tant que l'API n'est pas préchauffée"""
+        import src.app
+        from src.startup import StartupState
+
+        startup = StartupState()
+        monkeypatch.setattr(src.app, "startup", startup)
+
+        assert api_client.get("/ready").status_code == 503
+
+        startup.warm_up([("tokenizer", lambda: None)])
+        response = api_client.get("/ready")
+
+        assert response.status_code == 200
+        assert response.json()["ready"] is True
+        assert "tokenizer" in response.json()["stages"]
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_ready_fails_when_scoring_processes_cannot_start(
+        self, api_client, monkeypatch
+    ):
+        """L'endpoint /ready doit retourner 503 si les processus de scoring sont en échec"""
+        import src.app
+        from src.startup import StartupState
+
+        startup = StartupState()
+        startup.warm_up([("tokenizer", lambda: None)])
+        monkeypatch.setattr(src.app, "startup", startup)
+        monkeypatch.setattr(src.app, "scoring_uses_processes", True)
+        monkeypatch.setattr(
+            src.app.scoring_executor,
+            "failed",
+            "OSError: modèle introuvable",
+            raising=False,
+        )
+
+        response = api_client.get("/ready")
+
+        assert response.status_code == 503
+        assert response.json()["ready"] is False
+        assert "modèle introuvable" in response.json()["scoring_executor_error"]
+
+
+class TestScoringBackpressure:
+    """Tests pour l'exécuteur borné des endpoints de scoring"""
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_score_rejected_when_queue_full(self, api_client, monkeypatch):
+        """L'endpoint /score doit répondre 503 avec Retry-After quand la file est pleine"""
+        import src.app
+
+        async def full(*args):
+            raise src.app.ExecutorFull("file pleine")
+
+        monkeypatch.setattr(src.app.scoring_executor, "run", full)
+        response = api_client.post("/score", json={"text": "hello"})
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == str(
+            src.app.config.SCORING_RETRY_AFTER_SECONDS
+        )
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_metrics_expose_queue_depth(self, api_client):
+        """L'endpoint /metrics doit exposer la profondeur de la file"""
+        response = api_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert "queue_depth" in response.json()["scoring_executor"]
+
 
 class TestAnonymizeEndpoint:
     """Tests pour l'endpoint d'anonymisation POST /anonymize"""
@@ -142,6 +217,65 @@ class TestScoreEndpoint:
         assert toxic_score is not None
         assert normal_score is not None
 
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_score_endpoint_anonymizes_once(self, api_client, monkeypatch):
+        """Chaque requête /score ne doit anonymiser le texte qu'une seule fois"""
+        import src.app
+
+        calls = []
+        original = src.app.anonymize_text
+
+        def counting_anonymize(text):
+            calls.append(text)
+            return original(text)
+
+        monkeypatch.setattr(src.app, "anonymize_text", counting_anonymize)
+        response = api_client.post("/score", json={"text": "Email john@example.com"})
+
+        assert response.status_code == 200
+        assert len(calls) == 1
+        assert "<EMAIL>" in response.json()["text_anonymized"]
+
+
+class TestBatchScoreEndpoint:
+    """Tests pour l'endpoint de scoring par lot POST /score/batch"""
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_batch_endpoint_returns_one_result_per_text(self, api_client):
+        """L'endpoint /score/batch doit retourner un résultat par texte"""
+        payload = {"texts": ["I like this product", "I hate everything", ""]}
+        response = api_client.post("/score/batch", json=payload)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 3
+        assert len(data["results"]) == 3
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_batch_results_match_single_endpoint(self, api_client):
+        """Chaque résultat du lot doit être identique à celui de /score"""
+        texts = [
+            "This is a great product!",
+            "Contact me at john@example.com",
+            "I hate this, terrible service",
+        ]
+        batch = api_client.post("/score/batch", json={"texts": texts}).json()
+
+        for text, item in zip(texts, batch["results"]):
+            single = api_client.post("/score", json={"text": text}).json()
+            assert item["toxicity_score"] == single["toxicity_score"]
+            assert item["text_anonymized"] == single["text_anonymized"]
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_batch_endpoint_rejects_empty_list(self, api_client):
+        """L'endpoint /score/batch doit rejeter une liste vide"""
+        response = api_client.post("/score/batch", json={"texts": []})
+        assert response.status_code == 422
+
 
 class TestErrorHandling:
     """Tests pour la gestion des erreurs"""
@@ -310,3 +444,65 @@ class TestResponseFormat:
         # Doit pouvoir parser la réponse comme JSON
         data = response.json()
         assert isinstance(data, dict)
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_score_response_reports_queue_delay(self, api_client, sample_api_payload):
+        """La réponse /score doit indiquer le délai d'attente du micro-batching"""
+        response = api_client.post("/score", json=sample_api_payload)
+        data = response.json()
+
+        assert "queue_delay_ms" in data
+        assert data["queue_delay_ms"] >= 0
+
+
+class TestModelReload:
+    """Tests pour le rechargement du modèle après un réentraînement"""
+
+    @pytest.mark.integration
+    @pytest.mark.api
+    def test_retrained_model_invalidates_result_cache(
+        self, api_client, sample_api_payload, monkeypatch, tmp_path
+    ):
+        """Des fichiers de modèle remplacés rechargent le modèle et vident le cache"""
+        import src.app
+        from src.linear_scorer import LinearScorer
+        from src.model_watch import ModelFileWatcher
+        from src.result_cache import ResultCache
+
+        scorer = src.app.scorer
+        if scorer is None:
+            pytest.skip("Modèle non disponible")
+        for name in ("model", "vectorizer", "scorer", "lemmatizer"):
+            monkeypatch.setattr(src.app, name, getattr(src.app, name))
+        cache = ResultCache(max_bytes=1 << 20, ttl=60, model_version=scorer.version)
+        monkeypatch.setattr(src.app, "result_cache", cache)
+        model_file = tmp_path / "model.joblib"
+        model_file.write_bytes(b"v1")
+        monkeypatch.setattr(
+            src.app,
+            "model_watcher",
+            ModelFileWatcher(lambda: [model_file], interval=1e-9),
+        )
+
+        assert api_client.post("/score", json=sample_api_payload).status_code == 200
+        assert len(cache) == 1
+
+        # Réentraînement : nouveaux coefficients, fichiers réécrits sur disque
+        retrained = LinearScorer(scorer.featurizer, scorer.coef * 2, scorer.intercept)
+        monkeypatch.setattr(
+            src.app,
+            "load_model",
+            lambda: (src.app.model, src.app.vectorizer, retrained),
+        )
+        model_file.write_bytes(b"v2-retrained")
+
+        response = api_client.post("/score", json=sample_api_payload)
+
+        assert response.status_code == 200
+        assert src.app.scorer is retrained
+        assert cache.model_version == retrained.version
+        assert cache.stats.invalidations == 1
+        # Le résultat a été recalculé avec le nouveau modèle puis remis en cache
+        assert cache.stats.misses == 2
+        assert len(cache) == 1
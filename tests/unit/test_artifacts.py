@@ -0,0 +1,187 @@
+"""
+Tests unitaires pour l'artefact binaire projeté en mémoire
+Fichier: tests/unit/test_artifacts.py
+"""
+
+import json
+import os
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from src.artifacts import is_artifact_dir, load_artifact, load_artifacts, save_artifact
+from src.linear_scorer import LinearScorer
+
+CORPUS = [
+    "you are a wonderful person",
+    "this comment is stupid and you are stupid",
+    "thank you for the help",
+    "stupid stupid stupid idiot",
+    "the article is well written",
+    "what a wonderful article you idiot café",
+]
+LABELS = [0, 1, 0, 1, 0, 1]
+DOCUMENTS = CORPUS + ["", "Unknown WORDS, Stupid well-written idiot!"]
+
+
+def fit_artifacts(**params):
+    vectorizer = TfidfVectorizer(**params).fit(CORPUS)
+    model = LogisticRegression(solver="liblinear", random_state=42)
+    model.fit(vectorizer.transform(CORPUS), LABELS)
+    return model, vectorizer
+
+
+@pytest.fixture
+def artifacts():
+    return fit_artifacts()
+
+
+class TestArtifact:
+    """Tests pour save_artifact / load_artifact"""
+
+    @pytest.mark.unit
+    def test_arrays_are_memory_mapped(self, tmp_path, artifacts):
+        """Les tableaux doivent être ouverts en mmap, sans dict de vocabulaire"""
+        path = save_artifact(*artifacts, tmp_path / "scorer")
+        model, vectorizer = load_artifact(path)
+
+        assert is_artifact_dir(path)
+        assert isinstance(model.coef_, np.memmap)
+        assert not isinstance(vectorizer.vocabulary_, dict)
+
+    @pytest.mark.unit
+    def test_vocabulary_lookup(self, tmp_path, artifacts):
+        """Le vocabulaire projeté doit se comporter comme vocabulary_"""
+        _, original = artifacts
+        _, vectorizer = load_artifact(save_artifact(*artifacts, tmp_path / "scorer"))
+        vocabulary = vectorizer.vocabulary_
+
+        assert len(vocabulary) == len(original.vocabulary_)
+        assert dict(vocabulary.items()) == original.vocabulary_
+        assert vocabulary["café"] == original.vocabulary_["café"]
+        assert "missing" not in vocabulary
+        assert vocabulary.get("missing") is None
+        with pytest.raises(KeyError):
+            vocabulary["missing"]
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"sublinear_tf": True, "norm": "l1"},
+            {"use_idf": False},
+            {"stop_words": "english"},
+        ],
+    )
+    def test_identical_predictions(self, tmp_path, params):
+        """Transformation et probabilités identiques aux objets sklearn"""
+        model, vectorizer = fit_artifacts(**params)
+        mapped_model, mapped_vectorizer = load_artifact(
+            save_artifact(model, vectorizer, tmp_path / "scorer")
+        )
+        expected = vectorizer.transform(DOCUMENTS).tocsr()
+        actual = mapped_vectorizer.transform(DOCUMENTS)
+
+        assert np.array_equal(actual.indices, expected.indices)
+        assert np.array_equal(actual.data, expected.data)
+        assert np.array_equal(
+            mapped_model.predict_proba(actual), model.predict_proba(expected)
+        )
+        assert np.array_equal(mapped_model.predict(actual), model.predict(expected))
+
+        tokens = [document.split() for document in DOCUMENTS]
+        assert np.array_equal(
+            LinearScorer.from_model(mapped_model, mapped_vectorizer).predict_proba(
+                tokens
+            ),
+            LinearScorer.from_model(model, vectorizer).predict_proba(tokens),
+        )
+
+    @pytest.mark.unit
+    def test_rejects_unknown_version(self, tmp_path, artifacts):
+        """Une version de format inconnue doit lever ValueError"""
+        path = save_artifact(*artifacts, tmp_path / "scorer")
+        meta = json.loads((path / "meta.json").read_text())
+        meta["format_version"] = 99
+        (path / "meta.json").write_text(json.dumps(meta))
+
+        with pytest.raises(ValueError):
+            load_artifact(path)
+
+    @pytest.mark.unit
+    def test_rejects_unsupported_vectorizer(self, tmp_path):
+        """Les n-grammes ne sont pas supportés par le format"""
+        with pytest.raises(ValueError):
+            save_artifact(*fit_artifacts(ngram_range=(1, 2)), tmp_path / "scorer")
+
+    @pytest.mark.unit
+    def test_stale_artifact_is_ignored(self, tmp_path, artifacts):
+        """Si les fichiers joblib ont changé depuis l'export, ils sont chargés"""
+        model_path = tmp_path / "model.joblib"
+        vectorizer_path = tmp_path / "vectorizer.joblib"
+        joblib.dump(artifacts[0], model_path)
+        joblib.dump(artifacts[1], vectorizer_path)
+        path = save_artifact(
+            *artifacts, tmp_path / "scorer", sources=(model_path, vectorizer_path)
+        )
+        assert is_artifact_dir(path)
+
+        # Réentraînement sans nouvel artefact
+        retrained = fit_artifacts(sublinear_tf=True)
+        joblib.dump(retrained[1], vectorizer_path)
+
+        assert not is_artifact_dir(path)
+
+    @pytest.mark.unit
+    def test_freshness_check_uses_file_stamps(self, tmp_path, artifacts):
+        """La fraîcheur est vérifiée par taille et mtime, sans relire les joblib"""
+        model_path = tmp_path / "model.joblib"
+        joblib.dump(artifacts[0], model_path)
+        path = save_artifact(*artifacts, tmp_path / "scorer", sources=(model_path,))
+        meta = json.loads((path / "meta.json").read_text())
+        st = os.stat(model_path)
+
+        assert meta["sources"] == {
+            "model.joblib": {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        }
+        os.utime(model_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1))
+        assert not is_artifact_dir(path)
+
+    @pytest.mark.unit
+    def test_config_skips_stale_artifact(self, tmp_path, artifacts, monkeypatch):
+        """La configuration ne retourne l'artefact que s'il est à jour"""
+        from src.config import config
+
+        monkeypatch.setattr(type(config), "MODELS_DIR", tmp_path)
+        monkeypatch.setattr(type(config), "MODEL_ARTIFACT_FORMAT", "mmap")
+        model_path = tmp_path / "model.joblib"
+        vectorizer_path = tmp_path / "vectorizer.joblib"
+        joblib.dump(artifacts[0], model_path)
+        joblib.dump(artifacts[1], vectorizer_path)
+        save_artifact(
+            *artifacts, tmp_path / "scorer", sources=(model_path, vectorizer_path)
+        )
+
+        assert config.get_model_path() == tmp_path / "scorer"
+
+        joblib.dump(fit_artifacts(sublinear_tf=True)[0], model_path)
+
+        assert config.get_model_path() == model_path
+        assert config.get_vectorizer_path() == vectorizer_path
+
+    @pytest.mark.unit
+    def test_load_artifacts_falls_back_to_joblib(self, tmp_path, artifacts):
+        """Sans artefact binaire, les fichiers joblib sont chargés"""
+        model_path = tmp_path / "model.joblib"
+        vectorizer_path = tmp_path / "vectorizer.joblib"
+        joblib.dump(artifacts[0], model_path)
+        joblib.dump(artifacts[1], vectorizer_path)
+
+        model, vectorizer = load_artifacts(model_path, vectorizer_path)
+
+        assert isinstance(model, LogisticRegression)
+        assert isinstance(vectorizer, TfidfVectorizer)
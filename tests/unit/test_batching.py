@@ -0,0 +1,130 @@
+"""
+Tests unitaires pour le micro-batching des requêtes de scoring
+Fichier: tests/unit/test_batching.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.batching import MicroBatcher
+
+
+def _submit_concurrently(batcher, items):
+    """Soumet chaque élément depuis un thread séparé et collecte les résultats"""
+    results = {}
+
+    def worker(item):
+        results[item] = batcher.submit(item)
+
+    threads = [threading.Thread(target=worker, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+class TestMicroBatcher:
+    """Tests pour MicroBatcher"""
+
+    @pytest.mark.unit
+    def test_each_caller_gets_its_own_result(self):
+        """Chaque appelant doit recevoir le résultat de son propre élément"""
+        batcher = MicroBatcher(lambda items: [i * 10 for i in items], 8, 20)
+
+        results = _submit_concurrently(batcher, list(range(20)))
+
+        for item, (result, delay_ms) in results.items():
+            assert result == item * 10
+            assert delay_ms >= 0
+
+    @pytest.mark.unit
+    def test_concurrent_calls_are_coalesced(self):
+        """Les appels concurrents doivent être regroupés en lots"""
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=50)
+        _submit_concurrently(batcher, list(range(16)))
+
+        assert sum(batch_sizes) == 16
+        assert len(batch_sizes) < 16
+        assert max(batch_sizes) <= 16
+
+    @pytest.mark.unit
+    def test_max_batch_size_is_respected(self):
+        """Un lot ne doit jamais dépasser max_batch_size"""
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=3, max_wait_ms=50)
+        _submit_concurrently(batcher, list(range(10)))
+
+        assert max(batch_sizes) <= 3
+
+    @pytest.mark.unit
+    def test_async_calls_are_coalesced_without_threads(self):
+        """Les appels depuis la boucle d'événements forment un seul lot"""
+        batch_sizes = []
+
+        def batch_fn(items):
+            batch_sizes.append(len(items))
+            return [i * 10 for i in items]
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=16, max_wait_ms=200)
+
+        async def submit_all():
+            return await asyncio.gather(*(batcher.submit_async(i) for i in range(16)))
+
+        results = asyncio.run(submit_all())
+
+        assert [result for result, _ in results] == [i * 10 for i in range(16)]
+        assert batch_sizes == [16]
+
+    @pytest.mark.unit
+    def test_async_errors_are_propagated(self):
+        """Une erreur du lot est relevée dans la coroutine appelante"""
+
+        def batch_fn(items):
+            raise RuntimeError("modèle indisponible")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit_async("texte"))
+
+    @pytest.mark.unit
+    def test_single_call_waits_at_most_max_wait(self):
+        """Un appel isolé ne doit pas attendre beaucoup plus que max_wait_ms"""
+        batcher = MicroBatcher(lambda items: items, max_batch_size=32, max_wait_ms=5)
+
+        result, delay_ms = batcher.submit("seul")
+
+        assert result == "seul"
+        assert delay_ms < 1000
+
+    @pytest.mark.unit
+    def test_errors_are_propagated_to_callers(self):
+        """Une erreur du lot doit être relevée chez chaque appelant"""
+
+        def batch_fn(items):
+            raise RuntimeError("modèle indisponible")
+
+        batcher = MicroBatcher(batch_fn, max_batch_size=4, max_wait_ms=1)
+
+        with pytest.raises(RuntimeError):
+            batcher.submit("texte")
+
+    @pytest.mark.unit
+    def test_invalid_batch_size(self):
+        """max_batch_size doit être strictement positif"""
+        with pytest.raises(ValueError):
+            MicroBatcher(lambda items: items, max_batch_size=0)
@@ -0,0 +1,186 @@
+"""
+Tests unitaires pour le journal des commentaires
+Fichier: tests/unit/test_comment_log.py
+"""
+
+import time
+
+import pandas as pd
+import pytest
+
+from src.comment_log import COLUMNS, CommentLog, read_snapshot
+
+
+def make_record(user_id, text, toxicity=10.0):
+    return {
+        "user_id": user_id,
+        "comment_text": text,
+        "toxicity_score": toxicity,
+        "created_at": "2024-01-01T00:00:00",
+    }
+
+
+@pytest.fixture
+def log(tmp_path):
+    log = CommentLog(tmp_path / "prod.csv", tmp_path / "prod.log.jsonl")
+    yield log
+    log.close()
+
+
+class TestCommentLog:
+    """Tests pour CommentLog"""
+
+    @pytest.mark.unit
+    def test_empty_store_has_prod_csv_schema(self, log):
+        """Sans fichiers, le DataFrame est vide avec les colonnes de prod.csv"""
+        df = log.load_dataframe()
+        assert list(df.columns) == COLUMNS
+        assert len(df) == 0
+        assert log.next_id() == 1
+
+    @pytest.mark.unit
+    def test_append_assigns_ids_without_touching_snapshot(self, log):
+        """Les ajouts vont dans le journal ; les IDs se suivent"""
+        first = log.append(make_record(1, "hello"))
+        second = log.append(make_record(2, "world"))
+
+        assert (first["id"], second["id"]) == (1, 2)
+        assert not log.snapshot_path.exists()
+        assert log.log_records == 2
+        df = log.load_dataframe()
+        assert df["comment_text"].tolist() == ["hello", "world"]
+        assert df["id"].dtype == int
+
+    @pytest.mark.unit
+    def test_ids_continue_after_existing_snapshot(self, tmp_path):
+        """Les IDs reprennent après le plus grand ID de prod.csv"""
+        snapshot = pd.DataFrame([{"id": 41, **make_record(1, "old")}])[COLUMNS]
+        snapshot.to_csv(tmp_path / "prod.csv", index=False)
+        log = CommentLog(tmp_path / "prod.csv", tmp_path / "prod.log.jsonl")
+        try:
+            assert log.append(make_record(1, "new"))["id"] == 42
+            assert log.load_dataframe()["comment_text"].tolist() == ["old", "new"]
+        finally:
+            log.close()
+
+    @pytest.mark.unit
+    def test_compact_moves_log_into_snapshot(self, log):
+        """La compaction écrit prod.csv et vide le journal"""
+        log.append(make_record(1, "a"))
+        log.append(make_record(1, "b"))
+        before = log.load_dataframe()
+
+        assert log.compact() == 2
+        assert not log.log_path.exists()
+        assert log.log_records == 0
+        pd.testing.assert_frame_equal(read_snapshot(log.snapshot_path), before)
+        assert log.append(make_record(1, "c"))["id"] == 3
+        assert log.compact() == 1
+        assert log.compact() == 0
+        assert read_snapshot(log.snapshot_path)["comment_text"].tolist() == [
+            "a",
+            "b",
+            "c",
+        ]
+
+    @pytest.mark.unit
+    def test_interrupted_compaction_does_not_duplicate(self, log, monkeypatch):
+        """Un arrêt entre l'écriture de prod.csv et le vidage du journal"""
+        log.append(make_record(1, "a"))
+        log.append(make_record(1, "b"))
+
+        def crash():
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(log, "_truncate_log", crash)
+        with pytest.raises(KeyboardInterrupt):
+            log.compact()
+        monkeypatch.undo()
+
+        # Le journal contient encore les lignes déjà écrites dans prod.csv
+        assert log.log_path.exists()
+        assert log.load_dataframe()["comment_text"].tolist() == ["a", "b"]
+        log.append(make_record(1, "c"))
+        assert log.load_dataframe()["comment_text"].tolist() == ["a", "b", "c"]
+        assert log.compact() == 1
+        assert read_snapshot(log.snapshot_path)["id"].tolist() == [1, 2, 3]
+
+    @pytest.mark.unit
+    def test_iter_records_streams_snapshot_and_log(self, log):
+        """Le parcours par tranches n'est pas affecté par une compaction en cours"""
+        for text in "abcde":
+            log.append(make_record(1, text))
+        log.compact()
+        log.append(make_record(2, "f"))
+
+        records = log.iter_records(chunk_size=2)
+        first = next(records)
+        # "f" passe dans un nouveau prod.csv ; "g" dans un nouveau journal
+        log.compact()
+        log.append(make_record(2, "g"))
+        rest = list(records)
+
+        assert [r["comment_text"] for r in [first] + rest] == list("abcdef")
+        assert [r["id"] for r in [first] + rest] == [1, 2, 3, 4, 5, 6]
+        assert isinstance(rest[-1]["toxicity_score"], float)
+
+    @pytest.mark.unit
+    def test_truncated_last_line_is_ignored(self, log):
+        """Une ligne interrompue par un arrêt brutal est ignorée puis supprimée"""
+        log.append(make_record(1, "complete"))
+        log.close()
+        with open(log.log_path, "a", encoding="utf-8") as f:
+            f.write('{"id": 2, "user_id"')
+
+        assert len(log.load_dataframe()) == 1
+        log.append(make_record(1, "after"))
+        assert log.load_dataframe()["comment_text"].tolist() == ["complete", "after"]
+
+    @pytest.mark.unit
+    def test_replace_rewrites_everything(self, log):
+        """replace remplace instantané et journal"""
+        log.append(make_record(1, "a"))
+        df = log.load_dataframe()
+        df["toxicity_score"] = [99.0]
+        log.replace(df)
+
+        assert log.log_records == 0
+        assert log.load_dataframe()["toxicity_score"].tolist() == [99.0]
+
+    @pytest.mark.unit
+    def test_fsync_batching(self, tmp_path, monkeypatch):
+        """fsync n'est appelé qu'une fois par groupe de fsync_every ajouts"""
+        calls = []
+        monkeypatch.setattr("src.comment_log.os.fsync", calls.append)
+        log = CommentLog(
+            tmp_path / "prod.csv",
+            tmp_path / "prod.log.jsonl",
+            fsync_every=3,
+            fsync_interval=3600,
+        )
+        for i in range(7):
+            log.append(make_record(1, str(i)))
+        assert len(calls) == 2
+        log.close()
+        assert len(calls) == 3
+
+    @pytest.mark.unit
+    def test_fsync_interval_without_new_appends(self, tmp_path, monkeypatch):
+        """Un ajout isolé est synchronisé après fsync_interval, sans autre ajout"""
+        calls = []
+        monkeypatch.setattr("src.comment_log.os.fsync", calls.append)
+        log = CommentLog(
+            tmp_path / "prod.csv",
+            tmp_path / "prod.log.jsonl",
+            fsync_every=100,
+            fsync_interval=0.05,
+        )
+        log._mark_synced()
+        log.append(make_record(1, "seul"))
+        assert calls == []
+
+        deadline = time.monotonic() + 5
+        while not calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(calls) == 1
+        log.close()
@@ -0,0 +1,56 @@
+"""
+Tests unitaires pour l'anonymisation et le nettoyage des commentaires de app1
+Fichier: tests/unit/test_comment_preprocessing.py
+"""
+
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from src.comment_preprocessing import CommentCleaner, mask_regex_pii
+from src.lemmatizer import LemmaTable
+
+
+class SuffixLemmatizer:
+    """Lemmatiseur factice : retire un 's' final"""
+
+    def lemmatize(self, word):
+        return word[:-1] if word.endswith("s") else word
+
+
+@pytest.fixture
+def lemma_table_path(tmp_path):
+    vectorizer = SimpleNamespace(vocabulary_={"cat": 0, "dog": 1})
+    path = tmp_path / "lemma_table.joblib"
+    LemmaTable.build(["cats", "dogs"], vectorizer, SuffixLemmatizer()).save(path)
+    return path
+
+
+class TestCommentCleaner:
+    """Tests pour CommentCleaner"""
+
+    @pytest.mark.unit
+    def test_pickled_by_path_only(self, lemma_table_path):
+        """Un worker reçoit le chemin de la table et la recharge à l'usage"""
+        cleaner = CommentCleaner(lemma_table_path)
+        cleaner.load()
+
+        copy = pickle.loads(pickle.dumps(cleaner))
+
+        assert copy._lemmatizer is None
+        assert copy("The cats and DOGS!") == cleaner("The cats and DOGS!")
+        # Modules de src/ importés en absolu : comparaison par nom de classe
+        assert type(copy._lemmatizer).__name__ == "LemmaTable"
+
+    @pytest.mark.unit
+    def test_missing_table_falls_back(self, tmp_path):
+        """Sans table de lemmes, le lemmatiseur partagé est utilisé"""
+        cleaner = CommentCleaner(tmp_path / "absent.joblib")
+
+        assert type(cleaner.lemmatizer).__name__ == "CachedLemmatizer"
+
+    @pytest.mark.unit
+    def test_regex_pii_masked(self):
+        """Les e-mails sont masqués par les expressions de app1"""
+        assert "<EMAIL>" in mask_regex_pii("write to john@example.com")
@@ -0,0 +1,183 @@
+"""
+Tests unitaires pour les backends de stockage des commentaires
+Fichier: tests/unit/test_comment_store.py
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.comment_log import COLUMNS
+from src.comment_store import (
+    CsvCommentStore,
+    SqliteCommentStore,
+    UserAggregateIndex,
+    UserAggregates,
+    open_comment_store,
+    sqlite_path,
+)
+
+CREATED_AT = "2024-01-01T00:00:00"
+
+
+@pytest.fixture(params=["sqlite", "csv"])
+def store(request, tmp_path):
+    url = f"sqlite:///{tmp_path / 'comments.db'}" if request.param == "sqlite" else None
+    store = open_comment_store(url, tmp_path / "prod.csv", tmp_path / "prod.log.jsonl")
+    yield store
+    store.close()
+
+
+class TestCommentStore:
+    """Opérations communes aux backends SQLite et CSV"""
+
+    @pytest.mark.unit
+    def test_insert_assigns_increasing_ids(self, store):
+        """Chaque commentaire reçoit un id croissant"""
+        first = store.insert(1, "hello", 10, CREATED_AT)
+        second = store.insert(2, "world", 20, CREATED_AT)
+        assert second["id"] == first["id"] + 1
+        assert store.count() == 2
+
+    @pytest.mark.unit
+    def test_user_aggregates(self, store):
+        """Nombre de commentaires et toxicité moyenne d'un utilisateur"""
+        store.insert(1, "a", 10, CREATED_AT)
+        store.insert(1, "b", 30, CREATED_AT)
+        store.insert(2, "c", 90, CREATED_AT)
+
+        aggregates = store.user_aggregates(1)
+        assert aggregates.comment_count == 2
+        assert aggregates.average_toxicity == 20.0
+        assert store.user_aggregates(3) == UserAggregates(3, 0, 0.0)
+
+    @pytest.mark.unit
+    def test_iterate_and_update_scores(self, store):
+        """Parcours complet puis réécriture des scores"""
+        for i in range(5):
+            store.insert(1, f"comment {i}", 0, CREATED_AT)
+
+        comments = list(store.iter_comments())
+        assert [c["comment_text"] for c in comments] == [
+            f"comment {i}" for i in range(5)
+        ]
+        store.update_toxicity_scores((c["id"], 50) for c in comments)
+
+        assert store.user_aggregates(1).average_toxicity == 50.0
+
+    @pytest.mark.unit
+    def test_load_dataframe_schema(self, store):
+        """Le DataFrame a les colonnes et types de prod.csv"""
+        store.insert(1, "hello", 10, CREATED_AT)
+        df = store.load_dataframe()
+        assert list(df.columns) == COLUMNS
+        assert df["user_id"].dtype == int
+        assert df["toxicity_score"].dtype == float
+
+
+class TestOpenCommentStore:
+    """Tests pour le choix du backend d'après DATABASE_URL"""
+
+    @pytest.mark.unit
+    def test_backend_selection(self, tmp_path):
+        """Sans URL : CSV ; sqlite:/// : SQLite ; autre schéma : erreur"""
+        csv, log = tmp_path / "prod.csv", tmp_path / "prod.log.jsonl"
+        assert isinstance(open_comment_store(None, csv, log), CsvCommentStore)
+        with open_comment_store("sqlite:///:memory:", csv, log) as store:
+            assert isinstance(store, SqliteCommentStore)
+            store.insert(1, "hello", 10, CREATED_AT)
+            assert store.count() == 1
+        with pytest.raises(ValueError):
+            open_comment_store("postgresql://localhost/db", csv, log)
+
+    @pytest.mark.unit
+    def test_sqlite_path(self):
+        """Extraction du chemin d'une URL SQLite"""
+        assert sqlite_path("sqlite:///:memory:") == ":memory:"
+        assert sqlite_path("sqlite:////data/comments.db") == "/data/comments.db"
+        assert sqlite_path("postgresql://localhost/db") is None
+
+    @pytest.mark.unit
+    def test_sqlite_uses_wal_and_indexes(self, tmp_path):
+        """Base fichier en mode WAL avec index sur user_id et created_at"""
+        with SqliteCommentStore(tmp_path / "comments.db") as store:
+            mode = store._conn.execute("PRAGMA journal_mode").fetchone()[0]
+            indexes = {
+                row[1] for row in store._conn.execute("PRAGMA index_list(comments)")
+            }
+        assert mode == "wal"
+        assert {"comments_user_id", "comments_created_at"} <= indexes
+
+
+class TestUserAggregateIndex:
+    """Tests pour l'index des agrégats par utilisateur"""
+
+    @pytest.mark.unit
+    def test_add_and_get(self):
+        """Les ajouts mettent à jour nombre et somme"""
+        index = UserAggregateIndex()
+        index.add(1, 10)
+        index.add(1, 30)
+        assert index.get(1) == UserAggregates(1, 2, 40.0)
+        assert index.get(2) == UserAggregates(2, 0, 0.0)
+
+    @pytest.mark.unit
+    def test_rebuild_replaces_content(self):
+        """La reconstruction remplace l'index"""
+        index = UserAggregateIndex()
+        index.add(1, 10)
+        index.rebuild([(2, 3, 60.0)])
+        assert len(index) == 1
+        assert index.get(2).average_toxicity == 20.0
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("backend", ["sqlite", "csv"])
+    def test_rebuilt_from_store_on_open(self, tmp_path, backend):
+        """Un stockage rouvert reconstruit les agrégats de l'historique"""
+        url = f"sqlite:///{tmp_path / 'comments.db'}" if backend == "sqlite" else None
+        paths = (tmp_path / "prod.csv", tmp_path / "prod.log.jsonl")
+        store = open_comment_store(url, *paths)
+        store.insert(1, "a", 10, CREATED_AT)
+        store.insert(1, "b", 20, CREATED_AT)
+        store.insert(2, "c", 90, CREATED_AT)
+        store.close()
+
+        reopened = open_comment_store(url, *paths)
+        try:
+            assert reopened.user_aggregates(1) == UserAggregates(1, 2, 30.0)
+            assert reopened.user_aggregates(2) == UserAggregates(2, 1, 90.0)
+        finally:
+            reopened.close()
+
+    @pytest.mark.unit
+    def test_rebuild_with_concurrent_insert(self, tmp_path):
+        """Un ajout d'un autre processus entre les requêtes n'est ni perdu ni doublé"""
+        path = tmp_path / "comments.db"
+        store = SqliteCommentStore(path)
+        other = SqliteCommentStore(path)
+        store.insert(1, "a", 10, CREATED_AT)
+        conn = store._conn
+
+        class InsertAfterSelect:
+            """Connexion qui insère via `other` après chaque SELECT lu"""
+
+            def execute(self, sql, *args):
+                cursor = conn.execute(sql, *args)
+                if not sql.startswith("SELECT"):
+                    return cursor
+                rows = cursor.fetchall()
+                other.insert(1, "concurrent", 30, CREATED_AT)
+                return SimpleNamespace(fetchall=lambda: rows, fetchone=lambda: rows[0])
+
+        store._conn = InsertAfterSelect()
+        try:
+            store.rebuild_aggregates()
+        finally:
+            store._conn = conn
+        try:
+            # 1 commentaire initial + 1 ajout après chacune des deux requêtes
+            assert store.count() == 3
+            assert store.user_aggregates(1) == UserAggregates(1, 3, 70.0)
+        finally:
+            other.close()
+            store.close()
@@ -0,0 +1,172 @@
+"""
+Tests unitaires pour l'écrivain unique des commentaires et tests de charge
+des écritures concurrentes (plusieurs threads et plusieurs processus)
+Fichier: tests/unit/test_comment_writer.py
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.comment_store import open_comment_store
+from src.comment_writer import CommentWriter
+
+CREATED_AT = "2024-01-01T00:00:00"
+
+PROCESSES = 4
+THREADS_PER_PROCESS = 8
+COMMENTS_PER_THREAD = 50
+
+
+def store_url(backend, tmp_path):
+    return f"sqlite:///{tmp_path / 'comments.db'}" if backend == "sqlite" else None
+
+
+def open_store(backend, tmp_path):
+    return open_comment_store(
+        store_url(backend, tmp_path),
+        tmp_path / "prod.csv",
+        tmp_path / "prod.log.jsonl",
+        compact_every=500,
+    )
+
+
+def submit_from_process(backend, tmp_path, worker):
+    """Un « worker gunicorn » : son stockage, son écrivain, ses threads."""
+    store = open_store(backend, tmp_path)
+    writer = CommentWriter(store, max_batch_size=64)
+
+    def submit_many(thread):
+        for i in range(COMMENTS_PER_THREAD):
+            writer.submit(thread % 3, f"{worker}-{thread}-{i}", 10, CREATED_AT)
+
+    with ThreadPoolExecutor(THREADS_PER_PROCESS) as pool:
+        list(pool.map(submit_many, range(THREADS_PER_PROCESS)))
+    writer.close()
+    store.close()
+
+
+class FailingStore:
+    def insert_many(self, rows):
+        raise OSError("disque plein")
+
+
+class TestCommentWriter:
+    """Tests pour CommentWriter"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("backend", ["sqlite", "csv"])
+    def test_submit_returns_record(self, tmp_path, backend):
+        """submit retourne l'enregistrement écrit avec son id"""
+        store = open_store(backend, tmp_path)
+        writer = CommentWriter(store)
+        try:
+            record = writer.submit(1, "hello", 10, CREATED_AT)
+            assert record["id"] == 1
+            assert record["comment_text"] == "hello"
+            assert store.user_aggregates(1).comment_count == 1
+        finally:
+            writer.close()
+            store.close()
+
+    @pytest.mark.unit
+    def test_concurrent_submits_are_grouped(self, tmp_path):
+        """Des soumissions concurrentes sont écrites en moins de lots"""
+        store = open_store("csv", tmp_path)
+        writer = CommentWriter(store)
+        barrier = threading.Barrier(16)
+
+        def submit(i):
+            barrier.wait()
+            return writer.submit(1, str(i), 10, CREATED_AT)
+
+        try:
+            with ThreadPoolExecutor(16) as pool:
+                records = list(pool.map(submit, range(16)))
+            assert sorted(r["id"] for r in records) == list(range(1, 17))
+            assert writer.stats()["written"] == 16
+            assert writer.stats()["batches"] <= 16
+        finally:
+            writer.close()
+            store.close()
+
+    @pytest.mark.unit
+    def test_store_error_is_raised_to_callers(self):
+        """Une erreur du stockage est remontée à chaque appelant du lot"""
+        writer = CommentWriter(FailingStore())
+        try:
+            with pytest.raises(OSError, match="disque plein"):
+                writer.submit(1, "hello", 10, CREATED_AT)
+        finally:
+            writer.close()
+
+    @pytest.mark.unit
+    def test_invalid_batch_size(self):
+        """max_batch_size doit être positif"""
+        with pytest.raises(ValueError):
+            CommentWriter(FailingStore(), max_batch_size=0)
+
+
+class TestConcurrentSubmitStress:
+    """Soumissions concurrentes depuis plusieurs processus : ni perte ni doublon"""
+
+    @pytest.mark.unit
+    @pytest.mark.slow
+    @pytest.mark.parametrize("backend", ["sqlite", "csv"])
+    def test_no_lost_or_duplicate_rows(self, tmp_path, backend):
+        """Tous les commentaires sont écrits une fois, avec des IDs uniques"""
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(
+                target=submit_from_process, args=(backend, tmp_path, worker)
+            )
+            for worker in range(PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=120)
+            assert process.exitcode == 0
+
+        total = PROCESSES * THREADS_PER_PROCESS * COMMENTS_PER_THREAD
+        store = open_store(backend, tmp_path)
+        try:
+            df = store.load_dataframe()
+            assert len(df) == total
+            assert df["id"].is_unique
+            assert sorted(df["id"]) == list(range(1, total + 1))
+            expected = {
+                f"{worker}-{thread}-{i}"
+                for worker in range(PROCESSES)
+                for thread in range(THREADS_PER_PROCESS)
+                for i in range(COMMENTS_PER_THREAD)
+            }
+            assert set(df["comment_text"]) == expected
+            counts = df.groupby("user_id").size().to_dict()
+            assert {u: store.user_aggregates(u).comment_count for u in counts} == counts
+        finally:
+            store.close()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("backend", ["sqlite", "csv"])
+    def test_aggregates_see_other_processes(self, tmp_path, backend):
+        """Les agrégats d'un processus intègrent les écritures des autres"""
+        reader = open_store(backend, tmp_path)
+        writer_store = open_store(backend, tmp_path)
+        try:
+            assert reader.user_aggregates(1).comment_count == 0
+            writer_store.insert(1, "a", 10, CREATED_AT)
+            writer_store.insert(1, "b", 30, CREATED_AT)
+            assert reader.user_aggregates(1).average_toxicity == 20.0
+
+            writer_store.update_toxicity_scores([(1, 50), (2, 50)])
+            assert reader.user_aggregates(1).average_toxicity == 50.0
+
+            writer_store.compact()
+            writer_store.insert(1, "c", 50, CREATED_AT)
+            assert reader.user_aggregates(1).comment_count == 3
+        finally:
+            reader.close()
+            writer_store.close()
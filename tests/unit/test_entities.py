@@ -0,0 +1,140 @@
+"""
+Tests unitaires pour le remplacement des entités nommées
+Fichier: tests/unit/test_entities.py
+
+Le remplacement en une passe doit produire exactement le même résultat que
+les substitutions successives historiques de mask_named_entities.
+"""
+
+import random
+import re
+
+import pytest
+from nltk import Tree
+
+from src.entities import EntityAutomaton, collect_entities, replace_entities
+
+
+def reference_replace(text, entities):
+    """Implémentation historique : une regex \\b...\\b (IGNORECASE) par entité"""
+    for ent, tag in entities:
+        pattern = re.compile(r"\b" + re.escape(ent) + r"\b", flags=re.IGNORECASE)
+        text = pattern.sub(tag, text)
+    return text
+
+
+class TestEntityAutomaton:
+    """Tests pour l'automate d'Aho-Corasick"""
+
+    @pytest.mark.unit
+    def test_finds_overlapping_occurrences(self):
+        """Toutes les occurrences, y compris chevauchantes, doivent être trouvées"""
+        automaton = EntityAutomaton(["new york", "york", "new"])
+        matches = automaton.find_all("new york times in new york")
+
+        assert sorted(matches) == [
+            (0, 3, 2),
+            (0, 8, 0),
+            (4, 8, 1),
+            (18, 21, 2),
+            (18, 26, 0),
+            (22, 26, 1),
+        ]
+
+    @pytest.mark.unit
+    def test_empty_automaton(self):
+        """Un automate sans chaîne ne trouve rien"""
+        assert EntityAutomaton([]).find_all("some text") == []
+
+
+class TestReplaceEntities:
+    """Équivalence avec les substitutions successives"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "text,entities",
+        [
+            (
+                "John Smith met john in Paris",
+                [("John Smith", "<PERSON>"), ("John", "<PERSON>")],
+            ),
+            (
+                "John Smith met john in Paris",
+                [("John", "<PERSON>"), ("John Smith", "<PERSON>")],
+            ),
+            ("New York and York", [("York", "<GPE>"), ("New York", "<GPE>")]),
+            ("Johnny is not John", [("John", "<PERSON>")]),
+            ("the U.S. and U.S.A", [("U.S.", "<GPE>")]),
+            (
+                "Person met Person",
+                [("Person", "<PERSON>"), ("Person", "<ORGANIZATION>")],
+            ),
+            (
+                "<EMAIL> from Google",
+                [("EMAIL", "<ORGANIZATION>"), ("Google", "<ORGANIZATION>")],
+            ),
+            ("Zoë met Zoë", [("Zoë", "<PERSON>")]),
+            ("no entity here", []),
+        ],
+    )
+    def test_equivalent_on_edge_cases(self, text, entities):
+        """Doit gérer l'ordre, les chevauchements et les balises comme la référence"""
+        assert replace_entities(text, entities) == reference_replace(text, entities)
+
+    @pytest.mark.unit
+    def test_equivalent_on_random_texts(self):
+        """Doit être identique à la référence sur des textes aléatoires"""
+        rng = random.Random(3)
+        fragments = [
+            "John",
+            "john",
+            " ",
+            "Smith",
+            "New",
+            "York",
+            ".",
+            "U.S.",
+            "-",
+            "a",
+            "_",
+            "Person",
+            "<",
+            ">",
+            "é",
+        ]
+        tags = ["<PERSON>", "<GPE>", "<ORGANIZATION>"]
+        for _ in range(3000):
+            text = "".join(rng.choice(fragments) for _ in range(rng.randint(0, 15)))
+            entities = []
+            for _ in range(rng.randint(0, 4)):
+                if text and rng.random() < 0.5:
+                    start = rng.randint(0, len(text) - 1)
+                    ent = text[start : start + rng.randint(1, 8)]
+                else:
+                    ent = rng.choice(fragments[:8]) + rng.choice(["", " ", "Smith"])
+                entities.append((ent, rng.choice(tags)))
+
+            assert replace_entities(text, entities) == reference_replace(text, entities)
+
+
+class TestCollectEntities:
+    """Tests pour l'extraction des entités d'un arbre ne_chunk"""
+
+    @pytest.mark.unit
+    def test_keeps_only_requested_labels_in_order(self):
+        """Seuls les labels demandés sont retenus, dans l'ordre de l'arbre"""
+        tree = Tree(
+            "S",
+            [
+                Tree("PERSON", [("John", "NNP"), ("Smith", "NNP")]),
+                ("lives", "VBZ"),
+                ("in", "IN"),
+                Tree("GPE", [("Paris", "NNP")]),
+                Tree("FACILITY", [("Hall", "NNP")]),
+            ],
+        )
+
+        assert collect_entities(tree, ["PERSON", "GPE"]) == [
+            ("John Smith", "PERSON"),
+            ("Paris", "GPE"),
+        ]
@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour l'exécuteur borné du scoring
+Fichier: tests/unit/test_executor.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.executor import BoundedExecutor, ExecutorFull
+
+
+class TestBoundedExecutor:
+    """Tests pour BoundedExecutor"""
+
+    @pytest.mark.unit
+    def test_runs_function(self):
+        """Le résultat de la fonction est retourné à l'appelant"""
+        executor = BoundedExecutor(workers=2, max_queue=2)
+        try:
+            assert asyncio.run(executor.run(pow, 2, 10)) == 1024
+            assert executor.stats()["completed"] == 1
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.unit
+    def test_rejects_when_full(self):
+        """Au-delà de workers + max_queue tâches, ExecutorFull est levée sans attendre"""
+        executor = BoundedExecutor(workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def scenario():
+            running = asyncio.ensure_future(executor.run(release.wait, 5))
+            queued = asyncio.ensure_future(executor.run(release.wait, 5))
+            await asyncio.sleep(0.05)
+            assert executor.in_flight == 2
+            assert executor.queue_depth == 1
+            with pytest.raises(ExecutorFull):
+                await executor.run(release.wait, 5)
+            release.set()
+            await asyncio.gather(running, queued)
+
+        try:
+            asyncio.run(scenario())
+            stats = executor.stats()
+            assert stats["rejected"] == 1
+            assert stats["in_flight"] == 0
+            assert stats["queue_depth"] == 0
+        finally:
+            release.set()
+            executor.shutdown()
+
+    @pytest.mark.unit
+    def test_errors_release_the_slot(self):
+        """Une tâche en erreur libère sa place"""
+        executor = BoundedExecutor(workers=1, max_queue=0)
+        try:
+            with pytest.raises(ZeroDivisionError):
+                asyncio.run(executor.run(divmod, 1, 0))
+            assert asyncio.run(executor.run(divmod, 7, 2)) == (3, 1)
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "kwargs", [{"kind": "greenlet"}, {"workers": 0}, {"max_queue": -1}]
+    )
+    def test_invalid_configuration(self, kwargs):
+        """Une configuration invalide doit lever ValueError"""
+        with pytest.raises(ValueError):
+            BoundedExecutor(**kwargs)
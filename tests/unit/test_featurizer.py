@@ -0,0 +1,94 @@
+"""
+Tests unitaires pour la vectorisation TF-IDF directe
+Fichier: tests/unit/test_featurizer.py
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.featurizer import TfidfFeaturizer
+
+CORPUS = [
+    "you are a wonderful person",
+    "this comment is stupid and you are stupid",
+    "thank you for the help",
+    "stupid stupid stupid idiot",
+    "the article is well written",
+    "what a wonderful article thank you",
+]
+
+TOKEN_LISTS = [text.split() for text in CORPUS] + [
+    [],
+    ["unknown", "words", "only"],
+    # Tokens que l'analyseur de sklearn redécoupe ou met en minuscules
+    ["Stupid", "well-written", "x", "ARTICLE", "42", "thank"],
+]
+
+
+def assert_identical(expected, actual):
+    expected = expected.tocsr()
+    assert actual.shape == expected.shape
+    assert np.array_equal(actual.indptr, expected.indptr)
+    assert np.array_equal(actual.indices, expected.indices)
+    assert np.array_equal(actual.data, expected.data)
+
+
+class TestTfidfFeaturizer:
+    """Tests pour TfidfFeaturizer"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "params",
+        [
+            {},
+            {"sublinear_tf": True},
+            {"binary": True},
+            {"norm": "l1"},
+            {"norm": None},
+            {"use_idf": False},
+            {"smooth_idf": False, "max_df": 0.5},
+            {"lowercase": False},
+            {"stop_words": "english"},
+        ],
+    )
+    def test_identical_to_vectorizer_transform(self, params):
+        """Le résultat doit être identique bit à bit à vectorizer.transform"""
+        vectorizer = TfidfVectorizer(**params).fit(CORPUS)
+        featurizer = TfidfFeaturizer(vectorizer)
+
+        assert featurizer.fused
+        assert_identical(
+            vectorizer.transform([" ".join(tokens) for tokens in TOKEN_LISTS]),
+            featurizer.transform(TOKEN_LISTS),
+        )
+
+    @pytest.mark.unit
+    def test_unsupported_options_delegate_to_vectorizer(self):
+        """Les n-grammes ne sont pas reproduits : délégation à sklearn"""
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(CORPUS)
+        featurizer = TfidfFeaturizer(vectorizer)
+
+        assert not featurizer.fused
+        assert_identical(
+            vectorizer.transform([" ".join(tokens) for tokens in TOKEN_LISTS]),
+            featurizer.transform(TOKEN_LISTS),
+        )
+
+    @pytest.mark.unit
+    def test_same_predictions(self):
+        """Les probabilités du modèle sont inchangées"""
+        from sklearn.linear_model import LogisticRegression
+
+        vectorizer = TfidfVectorizer().fit(CORPUS)
+        model = LogisticRegression().fit(
+            vectorizer.transform(CORPUS), [0, 1, 0, 1, 0, 0]
+        )
+        featurizer = TfidfFeaturizer(vectorizer)
+
+        expected = model.predict_proba(
+            vectorizer.transform([" ".join(tokens) for tokens in TOKEN_LISTS])
+        )
+        assert np.array_equal(
+            model.predict_proba(featurizer.transform(TOKEN_LISTS)), expected
+        )
@@ -0,0 +1,234 @@
+"""
+Tests unitaires pour le lemmatiseur mémoïsé
+Fichier: tests/unit/test_lemmatizer.py
+"""
+
+from types import SimpleNamespace
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from src import lemmatizer as lemmatizer_module
+from src.artifacts import save_artifact
+from src.lemmatizer import (
+    CachedLemmatizer,
+    LemmaTable,
+    cached_lemmatizer,
+    load_serving_lemmatizer,
+    warm_lemmatizer,
+)
+
+
+class CountingLemmatizer:
+    """Lemmatiseur factice qui compte les appels (retire un 's' final)"""
+
+    def __init__(self):
+        self.calls = 0
+
+    def lemmatize(self, word):
+        self.calls += 1
+        return word[:-1] if word.endswith("s") else word
+
+
+def backend_clean(tokens, stop_words):
+    """Référence : lemmatisation sans cache ni table"""
+    lemmatizer = CountingLemmatizer()
+    return [lemmatizer.lemmatize(t) for t in tokens if t not in stop_words]
+
+
+@pytest.fixture
+def backend():
+    return CountingLemmatizer()
+
+
+class TestCachedLemmatizer:
+    """Tests pour CachedLemmatizer"""
+
+    @pytest.mark.unit
+    def test_same_result_with_fewer_calls(self, backend):
+        """Le résultat est celui du lemmatiseur, calculé une fois par token"""
+        lemmatizer = CachedLemmatizer(max_size=10, lemmatizer=backend)
+        tokens = ["cats", "dogs", "cats", "cats", "bird"]
+
+        assert [lemmatizer.lemmatize(t) for t in tokens] == [
+            "cat",
+            "dog",
+            "cat",
+            "cat",
+            "bird",
+        ]
+        assert backend.calls == 3
+        stats = lemmatizer.stats()
+        assert (stats["hits"], stats["misses"]) == (2, 3)
+        assert stats["hit_rate"] == pytest.approx(0.4)
+
+    @pytest.mark.unit
+    def test_clean_tokens_filters_stop_words(self, backend):
+        """Les stop words sont retirés avant la lemmatisation"""
+        lemmatizer = CachedLemmatizer(lemmatizer=backend)
+
+        assert lemmatizer.clean_tokens(
+            ["the", "cats", "is", "here"], {"the", "is"}
+        ) == [
+            "cat",
+            "here",
+        ]
+
+    @pytest.mark.unit
+    def test_size_is_bounded(self, backend):
+        """Le cache ne dépasse pas max_size entrées"""
+        lemmatizer = CachedLemmatizer(max_size=2, lemmatizer=backend)
+        for token in ["a", "b", "c", "d"]:
+            lemmatizer.lemmatize(token)
+
+        assert lemmatizer.stats()["size"] == 2
+
+    @pytest.mark.unit
+    def test_warm(self, backend):
+        """Le préchauffage remplit le cache sans fausser les statistiques"""
+        lemmatizer = CachedLemmatizer(max_size=2, lemmatizer=backend)
+
+        assert lemmatizer.warm(["common", "medium", "rare"]) == 2
+        calls = backend.calls
+        lemmatizer.lemmatize("medium")
+        lemmatizer.lemmatize("rare")
+
+        # Les deux derniers tokens préchauffés sont en cache
+        assert backend.calls == calls
+        assert lemmatizer.stats()["hits"] == 2
+        assert lemmatizer.stats()["misses"] == 0
+
+    @pytest.mark.unit
+    def test_warm_from_vectorizer(self, backend):
+        """Le préchauffage charge le vocabulaire sans fausser les statistiques"""
+        vectorizer = SimpleNamespace(
+            vocabulary_={"rare": 0, "common": 1, "medium": 2},
+            idf_=np.array([3.0, 1.0, 2.0]),
+        )
+        lemmatizer = CachedLemmatizer(max_size=2, lemmatizer=backend)
+
+        assert lemmatizer.warm_from_vectorizer(vectorizer) == 2
+        lemmatizer.lemmatize("common")
+        lemmatizer.lemmatize("medium")
+
+        # Les deux termes les plus fréquents (idf le plus bas) sont en cache
+        assert lemmatizer.stats()["hits"] == 2
+        assert lemmatizer.stats()["misses"] == 0
+
+    @pytest.mark.unit
+    def test_warm_without_vocabulary(self, backend):
+        """Un vectoriseur non entraîné ne préchauffe rien"""
+        lemmatizer = CachedLemmatizer(lemmatizer=backend)
+        assert lemmatizer.warm_from_vectorizer(SimpleNamespace()) == 0
+
+    @pytest.mark.unit
+    def test_warm_lemmatizer_is_config_gated(self, backend, monkeypatch):
+        """Préchauffage désactivable, et inutile pour une table de lemmes"""
+        vectorizer = SimpleNamespace(vocabulary_={"cat": 0, "dog": 1})
+        lemmatizer = CachedLemmatizer(lemmatizer=backend)
+        table = LemmaTable({"cats": 0}, ["cat", "dog"], fallback=lemmatizer)
+
+        monkeypatch.setattr(lemmatizer_module.config, "LEMMATIZER_WARMUP", True)
+        assert warm_lemmatizer(table, vectorizer) is None
+        assert warm_lemmatizer(lemmatizer, None) is None
+        assert warm_lemmatizer(lemmatizer, vectorizer) == 2
+
+        lemmatizer.clear()
+        monkeypatch.setattr(lemmatizer_module.config, "LEMMATIZER_WARMUP", False)
+        assert warm_lemmatizer(lemmatizer, vectorizer) is None
+        assert lemmatizer.stats()["size"] == 0
+
+    @pytest.mark.unit
+    def test_invalid_size(self):
+        """max_size doit être strictement positif"""
+        with pytest.raises(ValueError):
+            CachedLemmatizer(max_size=0)
+
+
+@pytest.fixture
+def vectorizer():
+    return SimpleNamespace(vocabulary_={"cat": 0, "dog": 1, "bird": 2})
+
+
+class TestLemmaTable:
+    """Tests pour la table de lemmes précalculée"""
+
+    @pytest.mark.unit
+    def test_build_keeps_forms_mapping_into_vocabulary(self, backend, vectorizer):
+        """Seules les formes dont le lemme est dans le vocabulaire sont gardées"""
+        table = LemmaTable.build(
+            ["cats", "dog", "fishs", "the", "birds"], vectorizer, backend, {"the"}
+        )
+
+        assert table.forms == {"birds": 2, "cats": 0, "dog": 1}
+        assert table.feature_index("cats") == 0
+        assert table.feature_index("fishs") is None
+
+    @pytest.mark.unit
+    def test_same_result_as_lemmatizer(self, backend, vectorizer):
+        """clean_tokens donne le même résultat que le lemmatiseur seul"""
+        fallback = CachedLemmatizer(lemmatizer=CountingLemmatizer())
+        table = LemmaTable.build(
+            ["cats", "dogs"], vectorizer, backend, fallback=fallback
+        )
+        tokens = ["the", "cats", "dogs", "fishs", "cats"]
+
+        assert table.clean_tokens(tokens, {"the"}) == backend_clean(tokens, {"the"})
+        # Seule la forme inconnue passe par le lemmatiseur de secours
+        assert fallback.stats()["misses"] == 1
+        assert table.stats()["table_size"] == 2
+
+    @pytest.mark.unit
+    def test_save_and_load(self, tmp_path, backend, vectorizer):
+        """La table sauvegardée se recharge à l'identique"""
+        path = tmp_path / "lemma_table.joblib"
+        LemmaTable.build(["cats", "birds"], vectorizer, backend).save(path)
+
+        table = LemmaTable.load(path, fallback=CachedLemmatizer(lemmatizer=backend))
+
+        assert table.forms == {"birds": 2, "cats": 0}
+        assert table.lemmatize("birds") == "bird"
+
+    @pytest.mark.unit
+    def test_load_from_artifact(self, tmp_path, backend):
+        """La table de l'artefact binaire donne les mêmes lemmes que le joblib"""
+        corpus = ["the cat and bird", "a dog"]
+        vectorizer = TfidfVectorizer().fit(corpus)
+        model = LogisticRegression(solver="liblinear")
+        model.fit(vectorizer.transform(corpus), [0, 1])
+        fallback = CachedLemmatizer(lemmatizer=backend)
+        built = LemmaTable.build(
+            ["cats", "birds", "dog"], vectorizer, backend, fallback=fallback
+        )
+        path = save_artifact(
+            model, vectorizer, tmp_path / "scorer", lemma_forms=built.forms
+        )
+
+        table = LemmaTable.load(path, fallback=fallback)
+
+        assert not isinstance(table.forms, dict)
+        assert len(table) == 3
+        assert table.feature_index("cats") == built.feature_index("cats")
+        tokens = ["the", "cats", "birds", "fishs"]
+        assert table.clean_tokens(tokens, {"the"}) == built.clean_tokens(
+            tokens, {"the"}
+        )
+
+    @pytest.mark.unit
+    def test_load_rejects_unknown_version(self, tmp_path):
+        """Un format inconnu doit lever ValueError"""
+        path = tmp_path / "lemma_table.joblib"
+        joblib.dump({"version": 99, "forms": {}, "terms": []}, path)
+
+        with pytest.raises(ValueError):
+            LemmaTable.load(path)
+
+    @pytest.mark.unit
+    def test_serving_falls_back_without_table(self, tmp_path):
+        """Sans table, les APIs utilisent le lemmatiseur partagé"""
+        lemmatizer = load_serving_lemmatizer(tmp_path / "absent.joblib")
+
+        assert lemmatizer is cached_lemmatizer
@@ -0,0 +1,111 @@
+"""
+Tests unitaires pour le scoreur linéaire exporté
+Fichier: tests/unit/test_linear_scorer.py
+"""
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+
+from src.linear_scorer import LinearScorer
+
+CORPUS = [
+    "you are a wonderful person",
+    "this comment is stupid and you are stupid",
+    "thank you for the help",
+    "stupid stupid stupid idiot",
+    "the article is well written",
+    "what a wonderful article you idiot",
+]
+LABELS = [0, 1, 0, 1, 0, 1]
+
+TOKEN_LISTS = [text.split() for text in CORPUS] + [
+    [],
+    ["unknown", "words"],
+    ["Stupid", "well-written", "idiot"],
+]
+
+
+@pytest.fixture
+def artifacts():
+    vectorizer = TfidfVectorizer().fit(CORPUS)
+    model = LogisticRegression(solver="liblinear", random_state=42)
+    model.fit(vectorizer.transform(CORPUS), LABELS)
+    return model, vectorizer
+
+
+class TestLinearScorer:
+    """Tests pour LinearScorer"""
+
+    @pytest.mark.unit
+    def test_parity_with_sklearn(self, artifacts):
+        """Les probabilités doivent être identiques à model.predict_proba"""
+        model, vectorizer = artifacts
+        scorer = LinearScorer.from_model(model, vectorizer)
+
+        expected = model.predict_proba(
+            vectorizer.transform([" ".join(tokens) for tokens in TOKEN_LISTS])
+        )[:, 1]
+
+        assert np.array_equal(scorer.predict_proba(TOKEN_LISTS), expected)
+        assert [
+            scorer.predict_one(tokens) for tokens in TOKEN_LISTS
+        ] == expected.tolist()
+
+    @pytest.mark.unit
+    def test_decision_function(self, artifacts):
+        """Le score linéaire doit correspondre à model.decision_function"""
+        model, vectorizer = artifacts
+        scorer = LinearScorer.from_model(model, vectorizer)
+        X = vectorizer.transform([" ".join(tokens) for tokens in TOKEN_LISTS])
+
+        assert np.allclose(
+            scorer.decision_function(TOKEN_LISTS), model.decision_function(X)
+        )
+
+    @pytest.mark.unit
+    def test_rejects_multiclass_model(self, artifacts):
+        """Un modèle multiclasse ne peut pas être exporté"""
+        _, vectorizer = artifacts
+        model = LogisticRegression().fit(
+            vectorizer.transform(CORPUS), [0, 1, 2, 0, 1, 2]
+        )
+
+        with pytest.raises(ValueError):
+            LinearScorer.from_model(model, vectorizer)
+
+    @pytest.mark.unit
+    def test_rejects_mismatched_vectorizer(self, artifacts):
+        """Le vectoriseur doit produire les features attendues par le modèle"""
+        model, _ = artifacts
+        other = TfidfVectorizer().fit(["a completely different corpus"])
+
+        with pytest.raises(ValueError):
+            LinearScorer.from_model(model, other)
+
+    @pytest.mark.unit
+    def test_version_changes_with_parameters(self, artifacts):
+        """L'empreinte est stable pour un modèle et change avec ses coefficients"""
+        model, vectorizer = artifacts
+        scorer = LinearScorer.from_model(model, vectorizer)
+        assert scorer.version == LinearScorer.from_model(model, vectorizer).version
+
+        model.coef_ = model.coef_ * 2
+        assert LinearScorer.from_model(model, vectorizer).version != scorer.version
+
+    @pytest.mark.unit
+    def test_delegated_vectorizer(self):
+        """Un vectoriseur non reproduit (n-grammes) est délégué, avec une empreinte"""
+        vectorizer = TfidfVectorizer(ngram_range=(1, 2)).fit(CORPUS)
+        model = LogisticRegression(solver="liblinear", random_state=42)
+        model.fit(vectorizer.transform(CORPUS), LABELS)
+        scorer = LinearScorer.from_model(model, vectorizer)
+
+        assert not scorer.featurizer.fused
+        assert len(scorer.version) == 32
+        texts = [" ".join(tokens) for tokens in TOKEN_LISTS]
+        np.testing.assert_allclose(
+            scorer.predict_proba(TOKEN_LISTS),
+            model.predict_proba(vectorizer.transform(texts))[:, 1],
+        )
@@ -0,0 +1,96 @@
+"""
+Tests unitaires pour le rapport mémoire et le préchargement gunicorn
+Fichier: tests/unit/test_memory_report.py
+"""
+
+import gc
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.memory_report import (
+    MemoryUsage,
+    format_report,
+    parse_smaps_rollup,
+    read_memory_usage,
+)
+
+SMAPS_ROLLUP = """55d0c0000000-7ffd00000000 ---p 00000000 00:00 0    [rollup]
+Rss:              204800 kB
+Pss:              120000 kB
+Shared_Clean:     150000 kB
+Shared_Dirty:       4800 kB
+Private_Clean:     10000 kB
+Private_Dirty:     40000 kB
+Swap:                  0 kB
+"""
+
+
+class TestMemoryReport:
+    """Tests pour memory_report"""
+
+    @pytest.mark.unit
+    def test_parse_smaps_rollup(self):
+        """Les valeurs en kB doivent être converties en octets"""
+        fields = parse_smaps_rollup(SMAPS_ROLLUP)
+
+        assert fields["Rss"] == 204800 * 1024
+        assert fields["Shared_Dirty"] == 4800 * 1024
+        assert "55d0c0000000-7ffd00000000 ---p 00000000 00" not in fields
+
+    @pytest.mark.unit
+    @pytest.mark.skipif(
+        not os.path.exists("/proc/self/smaps_rollup"), reason="Linux uniquement"
+    )
+    def test_read_current_process(self):
+        """La mémoire du processus courant doit être lisible"""
+        usage = read_memory_usage(os.getpid())
+
+        assert usage.rss > 0
+        assert usage.shared + usage.private == usage.rss
+
+    @pytest.mark.unit
+    def test_missing_process(self):
+        """Un processus inexistant retourne None"""
+        assert read_memory_usage(-1) is None
+
+    @pytest.mark.unit
+    def test_report_totals(self):
+        """Le rapport indique la mémoire économisée (RSS - PSS)"""
+        mb = 1024 * 1024
+        report = format_report(
+            [MemoryUsage(1, 100 * mb, 60 * mb, 80 * mb, 20 * mb)] * 2
+        )
+
+        assert "RSS 200.0 Mo" in report
+        assert "économisé par le partage 80.0 Mo" in report
+
+
+class TestGunicornPreload:
+    """Tests pour les hooks de préchargement de gunicorn_conf.py"""
+
+    @pytest.mark.unit
+    def test_pre_fork_freezes_gc(self):
+        """pre_fork doit geler les objets existants avant le fork"""
+        from src import gunicorn_conf
+
+        try:
+            gunicorn_conf.pre_fork(MagicMock(), MagicMock())
+            assert gunicorn_conf.preload_app
+            assert gc.get_freeze_count() > 0
+        finally:
+            gc.unfreeze()
+
+    @pytest.mark.unit
+    def test_when_ready_warms_up_app(self, monkeypatch):
+        """when_ready doit préchauffer le module de l'application"""
+        from src import gunicorn_conf
+
+        app_module = SimpleNamespace(warm_up=MagicMock())
+        monkeypatch.setitem(sys.modules, "app", app_module)
+        gunicorn_conf.when_ready(MagicMock())
+
+        app_module.warm_up.assert_called_once()
@@ -0,0 +1,70 @@
+"""
+Tests unitaires pour la détection du remplacement des fichiers du modèle
+Fichier: tests/unit/test_model_watch.py
+"""
+
+import os
+
+import pytest
+
+from src.model_watch import ModelFileWatcher
+
+
+def touch(path, content: bytes):
+    """Réécrit un fichier avec une date de modification forcément différente"""
+    previous = os.stat(path).st_mtime_ns if path.exists() else 0
+    path.write_bytes(content)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, max(st.st_mtime_ns, previous + 1)))
+
+
+class TestModelFileWatcher:
+    """Tests pour ModelFileWatcher"""
+
+    @pytest.mark.unit
+    def test_detects_replaced_file_once(self, tmp_path):
+        """Un fichier réécrit est signalé une seule fois"""
+        model = tmp_path / "model.joblib"
+        touch(model, b"v1")
+        watcher = ModelFileWatcher(lambda: [model], interval=1e-9)
+
+        assert not watcher.changed()
+        touch(model, b"v2")
+        assert watcher.changed()
+        assert not watcher.changed()
+
+    @pytest.mark.unit
+    def test_artifact_dir_uses_meta(self, tmp_path):
+        """Pour un artefact binaire, c'est meta.json qui est surveillé"""
+        artifact = tmp_path / "scorer"
+        artifact.mkdir()
+        touch(artifact / "meta.json", b"{}")
+        watcher = ModelFileWatcher(lambda: [artifact], interval=1e-9)
+
+        touch(artifact / "meta.json", b'{"format_version": 1}')
+        assert watcher.changed()
+
+    @pytest.mark.unit
+    def test_path_switch_is_a_change(self, tmp_path):
+        """Passer de l'artefact aux fichiers joblib est un changement"""
+        joblib_path = tmp_path / "model.joblib"
+        touch(joblib_path, b"v1")
+        paths = [tmp_path / "absent"]
+        watcher = ModelFileWatcher(lambda: paths, interval=1e-9)
+
+        paths[0] = joblib_path
+        assert watcher.changed()
+
+    @pytest.mark.unit
+    def test_throttled_and_disabled(self, tmp_path):
+        """Pas de vérification avant `interval`, ni avec interval <= 0"""
+        model = tmp_path / "model.joblib"
+        touch(model, b"v1")
+        throttled = ModelFileWatcher(lambda: [model], interval=3600)
+        disabled = ModelFileWatcher(lambda: [model], interval=0)
+
+        touch(model, b"v2")
+        assert not throttled.changed()
+        assert not disabled.changed()
+        throttled.reset()
+        assert not throttled.changed()
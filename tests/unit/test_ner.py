@@ -0,0 +1,220 @@
+"""
+Tests unitaires pour les backends de détection d'entités nommées
+Fichier: tests/unit/test_ner.py
+"""
+
+from unittest.mock import patch
+
+import pytest
+from nltk import Tree
+
+from src.ner import (
+    GazetteerEntityMasker,
+    NamedEntityMasker,
+    NLTKEntityMasker,
+    get_named_entity_masker,
+    load_gazetteer,
+)
+
+
+@pytest.fixture
+def gazetteer_masker():
+    return GazetteerEntityMasker()
+
+
+class TestNLTKEntityMasker:
+    """Tests pour le backend NLTK (pipeline mocké)"""
+
+    @pytest.mark.unit
+    @patch("src.ner.word_tokenize")
+    @patch("src.ner.pos_tag")
+    @patch("src.ner.ne_chunk")
+    def test_masks_entities_from_tree(self, mock_ne_chunk, mock_pos_tag, mock_tokenize):
+        """Doit masquer les entités retournées par ne_chunk"""
+        mock_ne_chunk.return_value = Tree(
+            "S",
+            [
+                ("My", "PRP$"),
+                ("name", "NN"),
+                ("is", "VBZ"),
+                Tree("PERSON", [("John", "NNP"), ("Smith", "NNP")]),
+            ],
+        )
+
+        masked, entities = NLTKEntityMasker().mask("My name is John Smith")
+
+        assert masked == "My name is <PERSON>"
+        assert entities == [("John Smith", "PERSON")]
+
+    @pytest.mark.unit
+    @patch("src.ner.word_tokenize", side_effect=LookupError("punkt"))
+    def test_nltk_errors_leave_text_unchanged(self, mock_tokenize):
+        """Une erreur NLTK ne doit pas masquer le texte"""
+        text = "My name is John Smith"
+        assert NLTKEntityMasker().mask(text) == (text, [])
+
+
+class TestGazetteerEntityMasker:
+    """Tests pour le backend gazetteer/majuscules"""
+
+    @pytest.mark.unit
+    def test_masks_names_and_places(self, gazetteer_masker):
+        """Doit masquer les noms propres et les lieux connus"""
+        masked, entities = gazetteer_masker.mask(
+            "My name is John Smith and I live in Paris."
+        )
+
+        assert masked == "My name is <PERSON> and I live in <GPE>."
+        assert entities == [("John Smith", "PERSON"), ("Paris", "GPE")]
+
+    @pytest.mark.unit
+    def test_labels_from_titles_and_suffixes(self, gazetteer_masker):
+        """Les titres et suffixes d'organisation déterminent le label"""
+        masked, _ = gazetteer_masker.mask(
+            "I asked Dr. Watson about Acme Corp yesterday"
+        )
+
+        assert masked == "I asked Dr. <PERSON> about <ORGANIZATION> yesterday"
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "This is a simple sentence with no names",
+            "YOU ARE AN IDIOT AND EVERYONE KNOWS IT",
+            "Obviously you are wrong.",
+        ],
+    )
+    def test_ignores_sentence_starts_and_shouting(self, gazetteer_masker, text):
+        """Les débuts de phrase et le texte en majuscules ne sont pas masqués"""
+        assert gazetteer_masker.mask(text) == (text, [])
+
+    @pytest.mark.unit
+    def test_restricted_labels(self):
+        """Seuls les labels demandés sont masqués"""
+        masker = GazetteerEntityMasker(labels=["GPE"])
+        masked, entities = masker.mask("I told John about London")
+
+        assert masked == "I told John about <GPE>"
+        assert entities == [("London", "GPE")]
+
+    @pytest.mark.unit
+    def test_load_gazetteer(self, tmp_path):
+        """Doit charger un fichier « nom<TAB>LABEL »"""
+        path = tmp_path / "gazetteer.tsv"
+        path.write_text(
+            "# commentaire\nAcme\tORGANIZATION\n\nLyon\tGPE\n", encoding="utf-8"
+        )
+
+        assert load_gazetteer(path) == {"acme": "ORGANIZATION", "lyon": "GPE"}
+
+
+class TestBatchMasking:
+    """Tests pour l'anonymisation par lots"""
+
+    @pytest.mark.unit
+    @patch("src.ner.pos_tag_sents")
+    @patch("src.ner.ne_chunk_sents")
+    def test_nltk_batch_calls_tagger_and_chunker_once(
+        self, mock_chunk_sents, mock_tag_sents
+    ):
+        """Le tagger et le chunker ne doivent être appelés qu'une fois par lot"""
+        mock_tag_sents.side_effect = lambda sents: [
+            [(t, "NNP") for t in s] for s in sents
+        ]
+        mock_chunk_sents.side_effect = lambda sents, binary: [
+            Tree("S", [Tree("PERSON", [s[0]])] + s[1:]) for s in sents
+        ]
+        texts = ["John is here", "Mary left", "Paul"]
+
+        results = NLTKEntityMasker().mask_batch(texts)
+
+        assert mock_tag_sents.call_count == 1
+        assert mock_chunk_sents.call_count == 1
+        assert results == [
+            ("<PERSON> is here", [("John", "PERSON")]),
+            ("<PERSON> left", [("Mary", "PERSON")]),
+            ("<PERSON>", [("Paul", "PERSON")]),
+        ]
+
+    @pytest.mark.unit
+    @patch("src.ner.pos_tag_sents", side_effect=LookupError("tagger"))
+    def test_nltk_batch_falls_back_per_text(self, mock_tag_sents):
+        """Une erreur sur le lot doit retomber sur le traitement par texte"""
+        masker = NLTKEntityMasker()
+        texts = ["John is here", "Mary left"]
+
+        with patch.object(masker, "find_entities", return_value=[]) as mock_find:
+            assert masker.mask_batch(texts) == [(text, []) for text in texts]
+            assert mock_find.call_count == 2
+
+    @pytest.mark.unit
+    def test_batch_matches_single_text(self, gazetteer_masker):
+        """mask_batch doit donner le même résultat que mask sur chaque texte"""
+        texts = [
+            "My name is John Smith and I live in Paris.",
+            "",
+            "nothing to see here",
+            "Ask Dr. Watson at Google",
+        ]
+
+        assert gazetteer_masker.mask_batch(texts) == [
+            gazetteer_masker.mask(text) for text in texts
+        ]
+
+    @pytest.mark.unit
+    def test_train_anonymize_texts(self, monkeypatch, gazetteer_masker):
+        """anonymize_texts doit être équivalent à anonymize_text par ligne"""
+        import src.train as train
+
+        monkeypatch.setattr(train, "ner_masker", gazetteer_masker)
+        texts = [
+            "Email john@example.com to John Smith",
+            None,
+            "I live in London, call 555-123-4567",
+            "plain text",
+        ]
+
+        assert train.anonymize_texts(texts, batch_size=2) == [
+            train.anonymize_text(text) for text in texts
+        ]
+
+
+class TestBackendSelection:
+    """Tests pour la sélection du backend"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "backend,expected",
+        [
+            ("nltk", NLTKEntityMasker),
+            ("gazetteer", GazetteerEntityMasker),
+            ("NLTK", NLTKEntityMasker),
+        ],
+    )
+    def test_get_named_entity_masker(self, backend, expected):
+        """Doit construire le backend demandé"""
+        masker = get_named_entity_masker(backend)
+
+        assert isinstance(masker, expected)
+        assert isinstance(masker, NamedEntityMasker)
+
+    @pytest.mark.unit
+    def test_base_class_is_abstract(self):
+        """L'interface ne peut pas être instanciée sans find_entities"""
+        with pytest.raises(TypeError):
+            NamedEntityMasker()
+
+    @pytest.mark.unit
+    def test_unknown_backend(self):
+        """Un backend inconnu doit lever ValueError"""
+        with pytest.raises(ValueError):
+            get_named_entity_masker("spacy")
+
+    @pytest.mark.unit
+    def test_app_uses_configured_backend(self):
+        """L'API doit utiliser le backend de la configuration"""
+        from src.app import ner_masker
+        from src.config import config
+
+        assert ner_masker.name == config.NER_BACKEND.lower()
@@ -0,0 +1,219 @@
+"""
+Tests unitaires pour le moteur de masquage des PII
+Fichier: tests/unit/test_pii.py
+
+Le moteur doit produire exactement le même résultat que l'ancienne
+implémentation de mask_regex_pii (six re.sub successifs), en temps
+linéaire sur les entrées pathologiques.
+"""
+
+import random
+import re
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.config import config
+from src.pii import AddressScanner, PhoneScanner, PIIMasker
+
+SAMPLE_CSV = (
+    Path(__file__).resolve().parent.parent.parent
+    / "data"
+    / "cleaned_training_sample.csv"
+)
+
+
+def reference_mask_regex_pii(text):
+    """Implémentation historique de mask_regex_pii (référence)"""
+    s = text
+    s = config.EMAIL_RE.sub("<EMAIL>", s)
+    s = config.CREDIT_RE.sub("<CREDIT_CARD>", s)
+    s = config.PHONE_RE.sub(
+        lambda m: (
+            "<PHONE>" if len(re.sub(r"[^\d]", "", m.group(0))) >= 6 else m.group(0)
+        ),
+        s,
+    )
+    s = config.DATE_RE.sub("<DATE>", s)
+    s = config.AGE_RE.sub("<AGE>", s)
+    s = config.ADDRESS_RE.sub("<ADDRESS>", s)
+    return s
+
+
+@pytest.fixture(scope="module")
+def masker():
+    return PIIMasker()
+
+
+class TestPIIMaskerEquivalence:
+    """Équivalence avec les re.sub successifs"""
+
+    @pytest.mark.unit
+    def test_equivalent_on_training_sample(self, masker):
+        """Doit être identique à la référence sur data/cleaned_training_sample.csv"""
+        df = pd.read_csv(SAMPLE_CSV)
+        texts = df["anonymized_comment"].dropna().tolist()
+
+        mismatches = [t for t in texts if masker.mask(t) != reference_mask_regex_pii(t)]
+
+        assert len(texts) > 0
+        assert mismatches == []
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "",
+            "no pii at all",
+            "Email john@example.com and also john@example.com again",
+            "The edit of 1 Feb 2012 07:36 is titled",
+            "posted in article 09:01 27 May 2007 by User",
+            "ticket number 2015010610010681. This template",
+            "Call me at 555-1234 or email john@example.com",
+            "My credit card is 1234-5678-9012-3456",
+            "I was born on 15/03/1990 and I am 25 years old",
+            "I live at 123 Main Street, age: 42",
+            "code 12 34 and      spaces",
+            "john@x.com.5 Main St",
+            "12/05/2020123456789",
+        ],
+    )
+    def test_equivalent_on_edge_cases(self, masker, text):
+        """Doit gérer les conflits de priorité comme la référence"""
+        assert masker.mask(text) == reference_mask_regex_pii(text)
+
+
+class TestPIIMasker:
+    """Comportement du moteur"""
+
+    @pytest.mark.unit
+    def test_text_without_candidates_is_returned_unchanged(self, masker):
+        """Un texte sans chiffre ni '@' doit être retourné tel quel"""
+        text = "This is a regular comment with no personal information"
+        assert masker.mask(text) is text
+
+    @pytest.mark.unit
+    def test_short_digit_sequences_are_not_phones(self, masker):
+        """Une séquence de moins de 6 chiffres ne doit pas être masquée"""
+        assert "<PHONE>" not in masker.mask("There are 123 items, code: 456")
+
+    @pytest.mark.unit
+    def test_find_spans_are_sorted_and_disjoint(self, masker):
+        """Les intervalles masqués doivent être triés et disjoints"""
+        text = "john@example.com 555-123-4567 on 12/05/2020, 30 years old"
+        spans = masker.find_spans(text)
+
+        assert [tag for _, _, tag in spans] == [
+            "<EMAIL>",
+            "<PHONE>",
+            "<DATE>",
+            "<AGE>",
+        ]
+        for (_, end, _), (start, _, _) in zip(spans, spans[1:]):
+            assert end <= start
+
+
+def _random_texts(alphabet, count, max_tokens, seed):
+    """Génère des textes aléatoires reproductibles à partir de fragments"""
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, max_tokens)))
+        for _ in range(count)
+    ]
+
+
+def _span(match):
+    return None if match is None else (match.start(), match.end())
+
+
+class TestLinearScanners:
+    """Scanners sans retour arrière pour PHONE_RE et ADDRESS_RE"""
+
+    @pytest.mark.unit
+    def test_phone_scanner_matches_regex(self):
+        """PhoneScanner doit trouver les mêmes occurrences que PHONE_RE"""
+        scanner = PhoneScanner()
+        alphabet = ["1", "12", "123", "4567", " ", "  ", "-", ".", "(", ")", "+", "a"]
+        for text in _random_texts(alphabet, 5000, 25, seed=5):
+            assert _span(scanner.search(text)) == _span(config.PHONE_RE.search(text))
+            assert _span(scanner.match(text, 1)) == _span(
+                config.PHONE_RE.match(text, 1)
+            )
+
+    @pytest.mark.unit
+    def test_address_scanner_matches_regex(self):
+        """AddressScanner doit trouver les mêmes occurrences que ADDRESS_RE"""
+        scanner = AddressScanner()
+        alphabet = [
+            "1",
+            "12",
+            " ",
+            "  ",
+            " " * 30,
+            "a",
+            "word",
+            "b" * 20,
+            "St",
+            "Ave",
+            "Street",
+            "\n",
+            "x_",
+            "é",
+        ]
+        for text in _random_texts(alphabet, 5000, 25, seed=5):
+            endpos = len(text) - 1
+            assert _span(scanner.search(text)) == _span(config.ADDRESS_RE.search(text))
+            assert _span(scanner.search(text, 1, endpos)) == _span(
+                config.ADDRESS_RE.search(text, 1, endpos)
+            )
+
+    @pytest.mark.unit
+    def test_linear_masker_matches_regex_masker(self):
+        """Le masquage doit être identique avec et sans les scanners linéaires"""
+        linear = PIIMasker()
+        regex = PIIMasker(linear=False)
+        alphabet = list("0123456789 -./:()+@abStAge\n") + [
+            "john@ex.com",
+            "12/05/2020",
+            " St",
+            " years old",
+            "4532015112830366",
+        ]
+        for text in _random_texts(alphabet, 5000, 30, seed=7):
+            assert linear.mask(text) == regex.mask(text)
+
+    @pytest.mark.unit
+    def test_custom_patterns_keep_regex(self):
+        """Un motif différent de ceux de la configuration reste une regex"""
+        pattern = re.compile(r"\d{3}")
+        masker = PIIMasker([("PHONE", pattern)])
+        assert masker.rules[0].pattern is pattern
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "make_text",
+        [
+            lambda n: "1" + " " * n,
+            lambda n: "1 " * (n // 2),
+            lambda n: "12345 " + "ab " * (n // 3),
+            lambda n: "+1 (12) " * (n // 8),
+            lambda n: "1" * n,
+        ],
+    )
+    def test_bounded_time_per_character(self, masker, make_text):
+        """Le temps par caractère ne doit pas croître avec la taille"""
+
+        def cost(size):
+            text = make_text(size)
+            start = time.perf_counter()
+            masker.mask(text)
+            return (time.perf_counter() - start) / len(text)
+
+        small = min(cost(2000) for _ in range(3))
+        large = cost(40000)
+
+        # « 1 » + 2000 espaces prend plusieurs secondes avec ADDRESS_RE
+        assert large < 20e-6
+        assert large < 5 * small + 2e-6
@@ -0,0 +1,226 @@
+"""
+Tests unitaires pour le prétraitement multiprocessus
+Fichier: tests/unit/test_preprocessing.py
+"""
+
+import pytest
+
+from src.preprocessing import (
+    preprocess_chunks,
+    preprocess_texts,
+    preprocess_texts_cached,
+    resolve_workers,
+)
+from src.text_cache import PreprocessingCache
+
+
+# Fonctions de niveau module : sérialisables vers les workers
+def upper_batch(texts):
+    return [text.upper() for text in texts]
+
+
+class CountingBatch:
+    """Anonymisation factice qui compte les textes traités"""
+
+    def __init__(self):
+        self.processed = []
+
+    def __call__(self, texts):
+        self.processed.extend(texts)
+        return upper_batch(texts)
+
+
+def reverse_text(text):
+    return text[::-1]
+
+
+def reverse_text_with_forms(text):
+    return text[::-1], " ".join(sorted(set(text.split())))
+
+
+@pytest.fixture
+def texts():
+    return [f"comment {i}" for i in range(23)]
+
+
+class TestPreprocessTexts:
+    """Tests pour preprocess_texts"""
+
+    @pytest.mark.unit
+    def test_serial_output(self, texts):
+        """Le traitement en série applique les deux étapes dans l'ordre"""
+        anonymized, cleaned = preprocess_texts(
+            texts, upper_batch, reverse_text, workers=1, chunk_size=5, progress=None
+        )
+
+        assert anonymized == [text.upper() for text in texts]
+        assert cleaned == [text.upper()[::-1] for text in texts]
+
+    @pytest.mark.unit
+    def test_parallel_matches_serial_and_keeps_order(self, texts):
+        """Le résultat multiprocessus doit être identique, dans le même ordre"""
+        serial = preprocess_texts(
+            texts, upper_batch, reverse_text, workers=1, chunk_size=4, progress=None
+        )
+        parallel = preprocess_texts(
+            texts, upper_batch, reverse_text, workers=3, chunk_size=4, progress=None
+        )
+
+        assert parallel == serial
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_progress_reported_per_chunk(self, texts, workers):
+        """La progression doit être rapportée après chaque lot"""
+        calls = []
+
+        preprocess_texts(
+            texts,
+            upper_batch,
+            reverse_text,
+            workers=workers,
+            chunk_size=10,
+            progress=lambda done, total, rows: calls.append((done, total, rows)),
+        )
+
+        assert [(done, total) for done, total, _ in calls] == [(1, 3), (2, 3), (3, 3)]
+        assert calls[-1][2] == len(texts)
+
+    @pytest.mark.unit
+    def test_empty_input(self):
+        """Une entrée vide retourne deux listes vides"""
+        assert preprocess_texts([], upper_batch, reverse_text, progress=None) == (
+            [],
+            [],
+        )
+
+    @pytest.mark.unit
+    def test_invalid_chunk_size(self, texts):
+        """chunk_size doit être strictement positif"""
+        with pytest.raises(ValueError):
+            preprocess_texts(texts, upper_batch, reverse_text, chunk_size=0)
+
+    @pytest.mark.unit
+    def test_resolve_workers(self):
+        """0 ou None utilise tous les cœurs disponibles"""
+        assert resolve_workers(0) >= 1
+        assert resolve_workers(None) >= 1
+        assert resolve_workers(4) == 4
+
+
+class TestPreprocessChunks:
+    """Tests pour le prétraitement d'un flux de lots"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [1, 3])
+    def test_yields_each_chunk_in_order(self, texts, workers):
+        """Chaque lot est traité et produit dans l'ordre du flux"""
+        chunks = [texts[i : i + 4] for i in range(0, len(texts), 4)]
+
+        results = list(
+            preprocess_chunks(iter(chunks), upper_batch, reverse_text, workers=workers)
+        )
+
+        assert results == [
+            ([t.upper() for t in chunk], [t.upper()[::-1] for t in chunk])
+            for chunk in chunks
+        ]
+
+    @pytest.mark.unit
+    def test_reads_stream_lazily(self, texts):
+        """Le flux n'est lu qu'au fur et à mesure des résultats"""
+        read = []
+
+        def chunks():
+            for i in range(0, len(texts), 2):
+                read.append(i)
+                yield texts[i : i + 2]
+
+        results = preprocess_chunks(chunks(), upper_batch, reverse_text, workers=1)
+        next(results)
+
+        assert read == [0]
+
+
+class TestPreprocessTextsCached:
+    """Tests pour le prétraitement avec cache persistant"""
+
+    @pytest.mark.unit
+    def test_only_new_texts_are_processed(self, tmp_path, texts):
+        """Un second passage ne doit traiter que les textes nouveaux"""
+        expected = preprocess_texts(texts, upper_batch, reverse_text, progress=None)
+
+        with PreprocessingCache(tmp_path / "cache.sqlite") as cache:
+            first = CountingBatch()
+            result = preprocess_texts_cached(
+                texts, first, reverse_text, cache, "ns", progress=None
+            )
+            assert result == expected
+            assert len(first.processed) == len(texts)
+
+            second = CountingBatch()
+            changed = texts + ["brand new comment"]
+            result = preprocess_texts_cached(
+                changed, second, reverse_text, cache, "ns", progress=None
+            )
+
+        assert second.processed == ["brand new comment"]
+        assert result == preprocess_texts(
+            changed, upper_batch, reverse_text, progress=None
+        )
+
+    @pytest.mark.unit
+    def test_namespace_change_invalidates(self, tmp_path, texts):
+        """Une autre empreinte de prétraitement ne doit pas réutiliser le cache"""
+        with PreprocessingCache(tmp_path / "cache.sqlite") as cache:
+            preprocess_texts_cached(
+                texts, upper_batch, reverse_text, cache, "v1", progress=None
+            )
+            counting = CountingBatch()
+            preprocess_texts_cached(
+                texts, counting, reverse_text, cache, "v2", progress=None
+            )
+
+        assert len(counting.processed) == len(texts)
+
+    @pytest.mark.unit
+    def test_forms_read_back_from_cache(self, tmp_path, texts):
+        """Les formes de surface sont relues du cache sans retraiter les textes"""
+        with PreprocessingCache(tmp_path / "cache.sqlite") as cache:
+            first = preprocess_texts_cached(
+                texts,
+                upper_batch,
+                reverse_text_with_forms,
+                cache,
+                "ns",
+                with_forms=True,
+                progress=None,
+            )
+            counting = CountingBatch()
+            second = preprocess_texts_cached(
+                texts,
+                counting,
+                reverse_text_with_forms,
+                cache,
+                "ns",
+                with_forms=True,
+                progress=None,
+            )
+
+        assert counting.processed == []
+        assert second == first
+        anonymized, cleaned, forms = second
+        assert cleaned == [text.upper()[::-1] for text in texts]
+        assert forms[0] == "0 COMMENT"
+
+    @pytest.mark.unit
+    def test_duplicates_processed_once(self, tmp_path):
+        """Un texte répété n'est traité qu'une fois"""
+        counting = CountingBatch()
+        with PreprocessingCache(tmp_path / "cache.sqlite") as cache:
+            anonymized, _ = preprocess_texts_cached(
+                ["a", "b", "a"], counting, reverse_text, cache, "ns", progress=None
+            )
+
+        assert counting.processed == ["a", "b"]
+        assert anonymized == ["A", "B", "A"]
@@ -0,0 +1,160 @@
+"""
+Tests unitaires pour le rescoring par lots des commentaires
+Fichier: tests/unit/test_rescoring.py
+"""
+
+import pytest
+
+from src.comment_store import open_comment_store
+from src.rescoring import RescoringReport, iter_chunks, rescore_comments
+
+CREATED_AT = "2024-01-01T00:00:00"
+
+
+# Fonctions de niveau module : sérialisables vers les workers
+def lower_batch(texts):
+    return [text.lower() if isinstance(text, str) else "" for text in texts]
+
+
+def keep_text(text):
+    return text
+
+
+class CountingPredict:
+    """Prédiction factice : proportion de tokens "bad", un appel par lot"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, token_lists):
+        self.calls.append(len(token_lists))
+        return [
+            tokens.count("bad") / len(tokens) if tokens else 0.0
+            for tokens in token_lists
+        ]
+
+
+@pytest.fixture(params=["sqlite", "csv"])
+def store(request, tmp_path):
+    url = f"sqlite:///{tmp_path / 'comments.db'}" if request.param == "sqlite" else None
+    store = open_comment_store(url, tmp_path / "prod.csv", tmp_path / "prod.log.jsonl")
+    store.insert_many(
+        [
+            (
+                i % 3,
+                "Bad BAD" if i % 4 == 0 else "bad good" if i % 4 == 1 else "fine",
+                0,
+                CREATED_AT,
+            )
+            for i in range(11)
+        ]
+    )
+    yield store
+    store.close()
+
+
+class TestRescoreComments:
+    """Tests pour rescore_comments"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_scores_written_back(self, store, workers):
+        """Chaque commentaire reçoit 100 * probabilité, bornée entre 0 et 100"""
+        rescore_comments(
+            store,
+            lower_batch,
+            keep_text,
+            CountingPredict(),
+            workers=workers,
+            chunk_size=4,
+            progress=None,
+        )
+
+        expected = {"Bad BAD": 100.0, "bad good": 50.0, "fine": 0.0}
+        for comment in store.iter_comments():
+            assert comment["toxicity_score"] == expected[comment["comment_text"]]
+
+    @pytest.mark.unit
+    def test_one_prediction_per_chunk(self, store):
+        """Une seule prédiction par lot de chunk_size commentaires"""
+        predict = CountingPredict()
+
+        report = rescore_comments(
+            store, lower_batch, keep_text, predict, chunk_size=4, progress=None
+        )
+
+        assert predict.calls == [4, 4, 3]
+        assert (report.comments, report.chunks) == (11, 3)
+
+    @pytest.mark.unit
+    def test_aggregates_follow_new_scores(self, store):
+        """Les agrégats par utilisateur reflètent les nouveaux scores"""
+        rescore_comments(
+            store, lower_batch, keep_text, CountingPredict(), progress=None
+        )
+
+        # user 0 : commentaires 0, 3, 6, 9 -> 100 + 0 + 0 + 50
+        aggregates = store.user_aggregates(0)
+        assert aggregates.comment_count == 4
+        assert aggregates.toxicity_sum == 150.0
+
+    @pytest.mark.unit
+    def test_missing_model_gives_neutral_score(self, store):
+        """Sans probabilité (modèle non chargé), le score est neutre"""
+        rescore_comments(
+            store,
+            lower_batch,
+            keep_text,
+            lambda token_lists: [None] * len(token_lists),
+            progress=None,
+        )
+
+        assert {comment["toxicity_score"] for comment in store.iter_comments()} == {
+            50.0
+        }
+
+    @pytest.mark.unit
+    def test_progress_reported_per_chunk(self, store):
+        """La progression est rapportée après chaque lot"""
+        calls = []
+
+        rescore_comments(
+            store,
+            lower_batch,
+            keep_text,
+            CountingPredict(),
+            chunk_size=5,
+            progress=lambda chunks, comments, rate: calls.append((chunks, comments)),
+        )
+
+        assert calls == [(1, 5), (2, 10), (3, 11)]
+
+    @pytest.mark.unit
+    def test_invalid_chunk_size(self, store):
+        """chunk_size doit être strictement positif"""
+        with pytest.raises(ValueError):
+            rescore_comments(
+                store, lower_batch, keep_text, CountingPredict(), chunk_size=0
+            )
+
+
+class TestRescoringHelpers:
+    """Tests pour iter_chunks et RescoringReport"""
+
+    @pytest.mark.unit
+    def test_iter_chunks(self):
+        """Le flux est découpé en lots de taille fixe (dernier lot partiel)"""
+        assert list(iter_chunks(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
+        assert list(iter_chunks([], 2)) == []
+
+    @pytest.mark.unit
+    def test_comments_per_second(self):
+        """Débit en commentaires par seconde (0 si durée nulle)"""
+        assert (
+            RescoringReport(comments=100, chunks=1, seconds=4.0).comments_per_second
+            == 25.0
+        )
+        assert (
+            RescoringReport(comments=0, chunks=0, seconds=0.0).comments_per_second
+            == 0.0
+        )
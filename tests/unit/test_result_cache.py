@@ -0,0 +1,140 @@
+"""
+Tests unitaires pour le cache des résultats de scoring
+Fichier: tests/unit/test_result_cache.py
+"""
+
+import pytest
+
+from src.result_cache import ResultCache, make_key
+from src.scoring import ScoringResult
+
+
+class FakeClock:
+    """Horloge contrôlée par le test."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_cache(**kwargs):
+    kwargs.setdefault("sizeof", lambda value: 100)
+    return ResultCache(**kwargs)
+
+
+class TestMakeKey:
+    """Tests pour les clés du cache"""
+
+    @pytest.mark.unit
+    def test_key_depends_on_text_and_model_version(self):
+        """La clé change avec le texte et avec la version du modèle"""
+        assert make_key("v1", "hello") == make_key("v1", "hello")
+        assert make_key("v1", "hello") != make_key("v1", "hello!")
+        assert make_key("v1", "hello") != make_key("v2", "hello")
+
+
+class TestResultCache:
+    """Tests pour ResultCache"""
+
+    @pytest.mark.unit
+    def test_hit_and_miss(self):
+        """Un texte mémorisé est retrouvé ; les compteurs suivent"""
+        cache = make_cache()
+        assert cache.get("spam") is None
+        cache.put("spam", 42)
+
+        assert cache.get("spam") == 42
+        assert cache.stats.hits == 1
+        assert cache.stats.misses == 1
+        assert cache.stats.hit_rate == 0.5
+
+    @pytest.mark.unit
+    def test_entries_expire_after_ttl(self):
+        """Une entrée plus vieille que le TTL n'est plus servie"""
+        clock = FakeClock()
+        cache = make_cache(ttl=10, clock=clock)
+        cache.put("spam", 42)
+
+        clock.now = 9.9
+        assert cache.get("spam") == 42
+        clock.now = 10.0
+        assert cache.get("spam") is None
+        assert cache.stats.expirations == 1
+        assert len(cache) == 0
+        assert cache.size_bytes == 0
+
+    @pytest.mark.unit
+    def test_evicts_least_recently_used_beyond_max_bytes(self):
+        """Au-delà de max_bytes, les entrées les moins récemment lues partent"""
+        cache = make_cache(sizeof=lambda value: 1000)
+        entry_size = 1000 + 16 + 200
+        cache.max_bytes = 2 * entry_size
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.stats.evictions == 1
+        assert cache.size_bytes == 2 * entry_size
+
+    @pytest.mark.unit
+    def test_oversized_values_are_not_stored(self):
+        """Un résultat plus gros que le cache entier est ignoré"""
+        cache = make_cache(max_bytes=500, sizeof=lambda value: 1000)
+        cache.put("big", 1)
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_put_replaces_existing_entry(self):
+        """Réécrire un texte ne compte sa taille qu'une fois"""
+        cache = make_cache()
+        cache.put("spam", 1)
+        cache.put("spam", 2)
+        assert cache.get("spam") == 2
+        assert len(cache) == 1
+        assert cache.size_bytes == 100 + 16 + 200
+
+    @pytest.mark.unit
+    def test_model_change_invalidates(self):
+        """Un nouveau modèle vide le cache ; la même version le conserve"""
+        cache = make_cache(model_version="v1")
+        cache.put("spam", 42)
+
+        cache.set_model_version("v1")
+        assert cache.get("spam") == 42
+
+        cache.set_model_version("v2")
+        assert cache.get("spam") is None
+        assert cache.stats.invalidations == 1
+        assert cache.size_bytes == 0
+
+    @pytest.mark.unit
+    def test_report(self):
+        """Le rapport expose compteurs et occupation"""
+        cache = make_cache(model_version="v1")
+        cache.put("spam", 42)
+        cache.get("spam")
+        report = cache.report()
+        assert report["hits"] == 1
+        assert report["entries"] == 1
+        assert report["model_version"] == "v1"
+
+    @pytest.mark.unit
+    def test_invalid_parameters(self):
+        """Paramètres invalides refusés"""
+        with pytest.raises(ValueError):
+            ResultCache(max_bytes=0)
+        with pytest.raises(ValueError):
+            ResultCache(ttl=0)
+
+    @pytest.mark.unit
+    def test_scoring_result_size(self):
+        """La taille d'un résultat croît avec ses textes et ses tokens"""
+        small = ScoringResult(text="hi", tokens=["hi"])
+        large = ScoringResult(text="hi " * 100, tokens=["hi"] * 100)
+        assert large.nbytes > small.nbytes > 0
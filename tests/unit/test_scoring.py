@@ -0,0 +1,49 @@
+"""
+Tests unitaires pour le résultat de scoring partagé
+Fichier: tests/unit/test_scoring.py
+"""
+
+import pytest
+
+from src.scoring import NEUTRAL_SCORE, ScoringResult
+
+
+class TestScoringResult:
+    """Tests pour ScoringResult"""
+
+    @pytest.mark.unit
+    def test_unscored_result_is_neutral(self):
+        """Sans probabilité, les deux scores doivent être neutres"""
+        result = ScoringResult(text="hello")
+
+        assert not result.is_scored
+        assert result.social_score == NEUTRAL_SCORE
+        assert result.toxicity_score == NEUTRAL_SCORE
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize(
+        "prob_toxic,social,toxicity",
+        [(0.0, 100, 0), (1.0, 0, 100), (0.25, 75, 25), (0.999, 0, 99)],
+    )
+    def test_scores_from_probability(self, prob_toxic, social, toxicity):
+        """Les scores doivent suivre les formules de app.py et app1.py"""
+        result = ScoringResult(text="t", prob_toxic=prob_toxic)
+
+        assert result.is_scored
+        assert result.social_score == max(0, min(100, int(100 * (1 - prob_toxic))))
+        assert result.social_score == social
+        assert result.toxicity_score == toxicity
+
+    @pytest.mark.unit
+    def test_result_carries_pipeline_stages(self):
+        """Le résultat doit transporter chaque étape du pipeline"""
+        result = ScoringResult(
+            text="John is here",
+            anonymized_text="<PERSON> is here",
+            cleaned_text="person",
+            entities=[("John", "PERSON")],
+        )
+
+        assert result.anonymized_text == "<PERSON> is here"
+        assert result.cleaned_text == "person"
+        assert result.entities == [("John", "PERSON")]
@@ -0,0 +1,72 @@
+"""
+Tests unitaires pour le démarrage mesuré de l'API
+Fichier: tests/unit/test_startup.py
+"""
+
+import pytest
+
+from src.startup import StartupState
+
+
+class TestStartupState:
+    """Tests pour StartupState"""
+
+    @pytest.mark.unit
+    def test_ready_after_warm_up(self):
+        """L'API n'est prête qu'une fois toutes les étapes exécutées"""
+        calls = []
+        state = StartupState()
+
+        assert not state.ready
+        assert state.warm_up(
+            [("a", lambda: calls.append("a")), ("b", lambda: calls.append("b"))]
+        )
+        assert state.ready
+        assert calls == ["a", "b"]
+        assert list(state.report()["stages"]) == ["a", "b"]
+
+    @pytest.mark.unit
+    def test_failed_stage_is_not_ready(self):
+        """Une étape en échec est enregistrée et empêche l'état prêt"""
+
+        def fail():
+            raise LookupError("maxent_ne_chunker")
+
+        state = StartupState()
+
+        assert not state.warm_up([("ne_chunk", fail), ("lemmatize", lambda: None)])
+        assert "maxent_ne_chunker" in state.failed_stages()["ne_chunk"]
+        assert "lemmatize" in state.report()["stages"]
+
+    @pytest.mark.unit
+    def test_stage_records_load_errors(self):
+        """Une erreur pendant le chargement est enregistrée puis relancée"""
+        state = StartupState()
+
+        with pytest.raises(FileNotFoundError):
+            with state.stage("model"):
+                raise FileNotFoundError("model.joblib")
+        state.warm_up([])
+
+        assert not state.ready
+        assert state.stages["model"].error is not None
+
+    @pytest.mark.unit
+    def test_warm_up_runs_once(self):
+        """Le préchauffage n'est exécuté qu'une fois (maître puis worker)"""
+        calls = []
+        state = StartupState()
+        state.warm_up([("a", lambda: calls.append("a"))])
+
+        assert state.start_background([("a", lambda: calls.append("a"))]) is None
+        assert state.warm_up([("a", lambda: calls.append("a"))])
+        assert calls == ["a"]
+
+    @pytest.mark.unit
+    def test_background_warm_up(self):
+        """Le préchauffage peut tourner dans un thread de fond"""
+        state = StartupState()
+        thread = state.start_background([("a", lambda: None)])
+        thread.join(timeout=5)
+
+        assert state.ready
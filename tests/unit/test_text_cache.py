@@ -0,0 +1,112 @@
+"""
+Tests unitaires pour le cache des textes prétraités
+Fichier: tests/unit/test_text_cache.py
+"""
+
+import pytest
+
+from src.text_cache import PreprocessingCache, fingerprint, make_key
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with PreprocessingCache(tmp_path / "cache.sqlite") as cache:
+        yield cache
+
+
+class TestKeys:
+    """Tests pour les clés adressées par contenu"""
+
+    @pytest.mark.unit
+    def test_key_depends_on_text_and_namespace(self):
+        """La clé change avec le texte et avec l'empreinte du prétraitement"""
+        namespace = fingerprint("v1", "EMAIL:\\w+@\\w+")
+
+        assert make_key(namespace, "hello") == make_key(namespace, "hello")
+        assert make_key(namespace, "hello") != make_key(namespace, "hello!")
+        assert make_key(namespace, "hello") != make_key(
+            fingerprint("v2", "EMAIL:\\w+@\\w+"), "hello"
+        )
+
+    @pytest.mark.unit
+    def test_fingerprint_separates_parts(self):
+        """Les parties de l'empreinte ne doivent pas pouvoir se confondre"""
+        assert fingerprint("ab", "c") != fingerprint("a", "bc")
+
+
+class TestPreprocessingCache:
+    """Tests pour PreprocessingCache"""
+
+    @pytest.mark.unit
+    def test_roundtrip_and_stats(self, cache):
+        """Les entrées enregistrées sont relues et comptées en hits"""
+        cache.put_many([("k1", "<PERSON> said", "person said"), ("k2", "b", "b")])
+
+        found = cache.get_many(["k1", "k2", "k3"])
+
+        assert found == {"k1": ("<PERSON> said", "person said"), "k2": ("b", "b")}
+        assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+        assert cache.stats.writes == 2
+        assert cache.stats.hit_rate == pytest.approx(2 / 3)
+
+    @pytest.mark.unit
+    def test_persistent_across_instances(self, tmp_path):
+        """Le cache doit survivre à la fermeture"""
+        path = tmp_path / "cache.sqlite"
+        with PreprocessingCache(path) as cache:
+            cache.put_many([("k", "anon", "clean")])
+
+        with PreprocessingCache(path) as cache:
+            assert cache.get_many(["k"]) == {"k": ("anon", "clean")}
+
+    @pytest.mark.unit
+    def test_forms_roundtrip(self, cache):
+        """Les formes de surface sont relues avec with_forms (vides par défaut)"""
+        cache.put_many([("k1", "anon", "clean", "cleaning cleaned"), ("k2", "a", "c")])
+
+        assert cache.get_many(["k1", "k2"], with_forms=True) == {
+            "k1": ("anon", "clean", "cleaning cleaned"),
+            "k2": ("a", "c", ""),
+        }
+        assert cache.get_many(["k1"]) == {"k1": ("anon", "clean")}
+
+    @pytest.mark.unit
+    def test_cache_without_forms_column_is_migrated(self, tmp_path):
+        """Un cache créé sans la colonne des formes reste utilisable"""
+        import sqlite3
+
+        path = tmp_path / "cache.sqlite"
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE entries (key TEXT PRIMARY KEY, anonymized TEXT NOT NULL,"
+            " cleaned TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        conn.execute("INSERT INTO entries VALUES ('k', 'anon', 'clean', 13, 0)")
+        conn.commit()
+        conn.close()
+
+        with PreprocessingCache(path) as cache:
+            assert cache.get_many(["k"], with_forms=True) == {
+                "k": ("anon", "clean", "")
+            }
+            cache.put_many([("k2", "a", "c", "f")])
+            assert cache.get_many(["k2"], with_forms=True)["k2"][2] == "f"
+
+    @pytest.mark.unit
+    def test_size_bounded_eviction(self, tmp_path):
+        """Au-delà de max_bytes, les entrées les moins récemment utilisées sont évincées"""
+        with PreprocessingCache(tmp_path / "cache.sqlite", max_bytes=100) as cache:
+            cache.put_many([("old", "x" * 20, "x" * 20)])
+            cache.put_many([("new", "y" * 20, "y" * 20)])
+            cache.put_many([("newest", "z" * 20, "z" * 20)])
+
+            assert cache.size_bytes() <= 100
+            assert cache.stats.evictions >= 1
+            assert "old" not in cache.get_many(["old"])
+            assert "newest" in cache.get_many(["newest"])
+
+    @pytest.mark.unit
+    def test_invalid_max_bytes(self, tmp_path):
+        """max_bytes doit être strictement positif"""
+        with pytest.raises(ValueError):
+            PreprocessingCache(tmp_path / "cache.sqlite", max_bytes=0)
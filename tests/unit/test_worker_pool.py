@@ -0,0 +1,210 @@
+"""
+Tests unitaires pour le pool de processus de scoring
+Fichier: tests/unit/test_worker_pool.py
+"""
+
+import asyncio
+import gc
+import os
+import time
+
+import pytest
+
+from src import worker_pool
+from src.worker_pool import ProcessScoringPool
+
+
+def double(items):
+    return [item * 2 for item in items]
+
+
+def slow_double(items):
+    time.sleep(0.2)
+    return double(items)
+
+
+def fail_on_negative(items):
+    if any(item < 0 for item in items):
+        raise ValueError("valeur négative")
+    return double(items)
+
+
+def exit_on_negative(items):
+    if any(item < 0 for item in items):
+        os._exit(1)
+    return double(items)
+
+
+def failing_initializer():
+    raise OSError("modèle introuvable")
+
+
+def run_with_pool(pool, scenario):
+    """Démarre le pool dans la boucle, exécute le scénario puis arrête le pool."""
+
+    async def main():
+        pool.start()
+        try:
+            return await scenario(pool)
+        finally:
+            pool.shutdown()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        gc.unfreeze()
+
+
+class TestProcessScoringPool:
+    """Tests pour ProcessScoringPool"""
+
+    @pytest.mark.unit
+    def test_submit_returns_result_and_delay(self):
+        """Un élément est traité par un processus ; le délai de file est retourné"""
+
+        async def scenario(pool):
+            return await pool.submit(21)
+
+        result, queue_delay_ms = run_with_pool(
+            ProcessScoringPool(double, workers=1), scenario
+        )
+        assert result == 42
+        assert queue_delay_ms >= 0
+
+    @pytest.mark.unit
+    def test_submit_many_keeps_order_across_batches(self):
+        """Les résultats d'un lot réparti sur plusieurs processus gardent l'ordre"""
+        pool = ProcessScoringPool(double, workers=2, max_batch_size=4)
+
+        async def scenario(pool):
+            return await pool.submit_many(list(range(20)))
+
+        assert run_with_pool(pool, scenario) == [i * 2 for i in range(20)]
+        stats = pool.stats()
+        assert stats["completed"] == 20
+        assert stats["batches"] >= 5
+
+    @pytest.mark.unit
+    def test_pending_requests_are_micro_batched(self):
+        """Les requêtes en attente d'un processus libre partent dans un même lot"""
+        pool = ProcessScoringPool(slow_double, workers=1, max_batch_size=8)
+
+        async def scenario(pool):
+            return await asyncio.gather(*(pool.submit(i) for i in range(5)))
+
+        results = run_with_pool(pool, scenario)
+        assert [result for result, _ in results] == [0, 2, 4, 6, 8]
+        # Le premier élément occupe le processus, les quatre suivants forment un lot
+        assert pool.stats()["batches"] == 2
+
+    @pytest.mark.unit
+    def test_rejects_when_queue_full(self):
+        """Au-delà de max_queue éléments en attente, ExecutorFull est levée"""
+        pool = ProcessScoringPool(slow_double, workers=1, max_queue=1)
+
+        async def scenario(pool):
+            running = asyncio.ensure_future(pool.submit(1))
+            await asyncio.sleep(0)
+            queued = asyncio.ensure_future(pool.submit(2))
+            await asyncio.sleep(0)
+            assert pool.queue_depth == 1
+            with pytest.raises(worker_pool.ExecutorFull):
+                await pool.submit(3)
+            return await asyncio.gather(running, queued)
+
+        results = run_with_pool(pool, scenario)
+        assert [result for result, _ in results] == [2, 4]
+        assert pool.stats()["rejected"] == 1
+
+    @pytest.mark.unit
+    def test_batch_counts_against_queue_bound(self):
+        """Un lot qui dépasserait max_queue éléments en attente est refusé"""
+        pool = ProcessScoringPool(slow_double, workers=1, max_queue=2, max_batch_size=2)
+
+        async def scenario(pool):
+            running = asyncio.ensure_future(pool.submit(1))
+            await asyncio.sleep(0)
+            queued = asyncio.ensure_future(pool.submit(2))
+            await asyncio.sleep(0)
+            # 1 élément en attente + 2 soumis > max_queue
+            with pytest.raises(worker_pool.ExecutorFull):
+                await pool.submit_many([3, 4])
+            assert pool.queue_depth == 1
+            return await asyncio.gather(running, queued)
+
+        results = run_with_pool(pool, scenario)
+        assert [result for result, _ in results] == [2, 4]
+        assert pool.stats()["rejected"] == 1
+
+    @pytest.mark.unit
+    def test_large_batch_is_fed_in_chunks(self):
+        """Un lot plus grand que la file est envoyé tranche par tranche"""
+        pool = ProcessScoringPool(double, workers=1, max_queue=2, max_batch_size=2)
+
+        async def scenario(pool):
+            results = asyncio.ensure_future(pool.submit_many(list(range(10))))
+            await asyncio.sleep(0)
+            assert pool.queue_depth <= pool.max_queue
+            return await results
+
+        assert run_with_pool(pool, scenario) == [i * 2 for i in range(10)]
+        assert pool.stats()["rejected"] == 0
+
+    @pytest.mark.unit
+    def test_handler_error_fails_the_batch(self):
+        """Une exception du handler est remontée sans arrêter le processus"""
+        pool = ProcessScoringPool(fail_on_negative, workers=1)
+
+        async def scenario(pool):
+            with pytest.raises(RuntimeError, match="valeur négative"):
+                await pool.submit(-1)
+            return await pool.submit(3)
+
+        result, _ = run_with_pool(pool, scenario)
+        assert result == 6
+        assert pool.stats()["restarts"] == 0
+
+    @pytest.mark.unit
+    def test_dead_worker_is_replaced(self):
+        """Un processus mort fait échouer son lot et est remplacé"""
+        pool = ProcessScoringPool(exit_on_negative, workers=1)
+
+        async def scenario(pool):
+            with pytest.raises(RuntimeError, match="Processus de scoring arrêté"):
+                await pool.submit(-1)
+            return await pool.submit(5)
+
+        result, _ = run_with_pool(pool, scenario)
+        assert result == 10
+        assert pool.stats()["restarts"] == 1
+
+    @pytest.mark.unit
+    def test_initializer_error_fails_the_pool(self):
+        """Un initializer en échec met le pool en échec, sans relance en boucle"""
+        pool = ProcessScoringPool(double, workers=2, initializer=failing_initializer)
+
+        async def scenario(pool):
+            with pytest.raises(RuntimeError, match="modèle introuvable"):
+                await pool.submit(1)
+            with pytest.raises(RuntimeError, match="en échec"):
+                await pool.submit(2)
+            return pool.stats()
+
+        stats = run_with_pool(pool, scenario)
+        assert "OSError: modèle introuvable" in stats["failed"]
+        assert stats["restarts"] == 0
+
+    @pytest.mark.unit
+    def test_submit_before_start(self):
+        """Soumettre avant start() est une erreur"""
+        pool = ProcessScoringPool(double)
+        with pytest.raises(RuntimeError):
+            asyncio.run(pool.submit(1))
+
+    @pytest.mark.unit
+    def test_invalid_parameters(self):
+        """Paramètres invalides refusés"""
+        with pytest.raises(ValueError):
+            ProcessScoringPool(double, workers=0)
+        with pytest.raises(ValueError):
+            ProcessScoringPool(double, max_batch_size=0)